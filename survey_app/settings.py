@@ -45,6 +45,17 @@ EMAIL_HOST_USER = "info@sudraw.com"
 EMAIL_HOST_PASSWORD = "@Water4Planter@"
 DEFAULT_FROM_EMAIL = "info@sudraw.com"
 
+# Outgoing mail is queued in EmailOutbox and sent by `manage.py run_email_worker` (see surveys.email_outbox)
+EMAIL_OUTBOX = {
+    'BATCH_SIZE': 50,  # Emails claimed per batch; one SMTP connection is reused for the whole batch
+    'MAX_ATTEMPTS': 6,  # A row is marked failed after this many unsuccessful sends
+    'RETRY_BASE_SECONDS': 60,  # Backoff after the first failure; doubles with every further attempt
+    'RETRY_MAX_SECONDS': 60 * 60,  # Upper bound on the backoff
+    'POLL_INTERVAL': 5,  # Seconds the worker sleeps when the outbox is empty
+    'CLAIM_SECONDS': 5 * 60,  # A claimed row not sent within this long (worker died) is claimed again
+    'RETENTION_DAYS': 30,  # The worker deletes sent rows older than this
+}
+
 # Grappelli Configuration
 GRAPPELLI_ADMIN_TITLE = 'Sudraw Admin'
 
@@ -58,6 +69,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third-party apps
     'rest_framework',
@@ -82,6 +94,10 @@ X_FRAME_OPTIONS = 'SAMEORIGIN'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # query instrumentation wraps everything below it (no-op unless QUERY_INSTRUMENTATION['ENABLED'])
+    'surveys.middleware.QueryInstrumentationMiddleware',
+    # read-your-writes: pins a client to the primary database briefly after it writes
+    'surveys.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware should be as high as possible
     'django.middleware.common.CommonMiddleware',
@@ -136,6 +152,52 @@ DATABASES = {
     }
 }
 
+# Read replicas, e.g. DATABASE_REPLICAS="replica-1.internal,localhost:5433/sudraw_replica".
+# Each "host[:port][/name]" entry becomes a 'replica_N' alias with the primary's credentials.
+# In tests replicas mirror 'default', so two local databases work without replication.
+for _index, _replica in enumerate(filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), start=1):
+    _address, _, _name = _replica.strip().partition('/')
+    _host, _, _port = _address.partition(':')
+    DATABASES[f'replica_{_index}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'PORT': _port or DATABASES['default']['PORT'],
+        'NAME': _name or DATABASES['default']['NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['surveys.db_router.ReadReplicaRouter']
+
+READ_REPLICA = {
+    'ALIASES': None,  # None = every DATABASES alias starting with 'replica'
+    'PIN_SECONDS': 10,  # Keep a client on the primary this long after it writes
+    'PIN_COOKIE_NAME': 'primary_pin',
+}
+
+# Shared cache. Catalog/search version counters, cached pages and results must be the
+# same in every gunicorn worker and dyno, which the per-process LocMemCache is not.
+# REDIS_URL="redis://host:6379/0" selects Redis; otherwise the cache lives in a database
+# table, created once with `python manage.py createcachetable` (the Procfile release step)
+# and always read from the primary (see surveys.db_router.PRIMARY_ONLY_APPS).
+# Tests use survey_app.test_settings, which swaps in the in-memory cache.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'surveys_cache',
+            'OPTIONS': {
+                'MAX_ENTRIES': 50000,  # Pages, fragments and pools; the default of 300 would cull constantly
+            },
+        }
+    }
+
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.postgresql',
@@ -298,10 +360,24 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': (
+        'surveys.fast_json.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'surveys.fast_json.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10
 }
 
+# JSON encoding for API and AJAX responses (see surveys.fast_json)
+FAST_JSON = {
+    'BACKEND': 'auto',  # 'auto' uses orjson when installed, else the stdlib json module
+}
+
 # JWT Settings
 from datetime import timedelta
 
@@ -348,6 +424,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 SURVEY_CONFIG = {
     'DEFAULT_COOLDOWN_DAYS': 2,  # Default cooldown period in days
     'AD_FREQUENCY': 4,  # Show ad after every 4 surveys
+    'MAX_BATCH_RESPONSES': 50,  # Most responses accepted by one batch submission request
 }
 
 LUCKY_DRAW_CONFIG = {
@@ -364,6 +441,44 @@ LUCKY_DRAW_CONFIG = {
     'WINNERS_DISPLAY_COUNT': 50,  # Number of most recent winners to show on the home page
 }
 
+QUERY_INSTRUMENTATION = {
+    'ENABLED': os.environ.get('QUERY_INSTRUMENTATION', '') == '1',  # Per-request query counting/timing
+    'BUDGETS': {  # URL name -> max queries per request (views can also use @query_budget)
+        # 'surveys:home': 15,
+    },
+    'DEFAULT_BUDGET': None,  # Budget for views without one; None disables the check
+    'RAISE_ON_BUDGET': False,  # Raise instead of logging when a budget is exceeded
+    'DUPLICATE_THRESHOLD': 3,  # Same statement this many times is reported as a likely N+1
+    'SERVER_TIMING': True,  # Emit a Server-Timing header with the database stats
+}
+
+PAGE_CACHE = {
+    'ENABLED': True,  # Full-page cache for anonymous visitors on public pages
+    'TIMEOUT': 60 * 5,  # Seconds; content changes invalidate earlier through signals
+    'COUNTRY_HEADER': 'HTTP_CF_IPCOUNTRY',  # request.META key with the visitor's country code
+}
+
+CATALOG_CHANGES = {
+    'PAGE_SIZE': 1000,  # Most change-log rows returned by one delta sync request
+    'SAFETY_LAG_SECONDS': 30,  # Rows are served once this old; must exceed the longest catalog-writing transaction
+}
+
+SEARCH_RESULT_CACHE = {
+    'ENABLED': True,  # Per-worker LRU cache of search results
+    'MAX_ENTRIES': 1000,  # Least recently used entries are evicted beyond this
+    'TIMEOUT': 60 * 5,  # Seconds; catalog changes invalidate earlier
+}
+
+TYPEAHEAD = {
+    'MAX_AGE': 60 * 10,  # Seconds before a worker rebuilds its in-process index even without a version bump
+    'BACKGROUND_REBUILD': True,  # Keep serving the stale index while a thread builds its replacement
+}
+
+SURVEY_ANALYTICS = {
+    'CACHE_TIMEOUT': 60 * 10,  # Seconds a survey's results page/JSON is served from cache
+    'TOP_TEXT_ANSWERS': 10,  # Most frequent free-text / "Other" answers listed per question
+}
+
 # Email configuration for admin notifications
 ADMIN_EMAIL = 'info@sudraw.com'  # Change this to your admin email
 
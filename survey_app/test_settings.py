@@ -0,0 +1,5 @@
+"""Settings for running the test suite: ``manage.py test --settings=survey_app.test_settings``."""
+from .settings import *  # noqa: F401,F403
+
+# The suite runs in one process and counts queries, so cache reads must not hit the database
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
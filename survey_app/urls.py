@@ -62,6 +62,8 @@ router.register(r'api/surveys', api_views.SurveyViewSet, basename='survey')
 router.register(r'api/questions', api_views.QuestionViewSet, basename='question')
 router.register(r'api/responses', api_views.SurveyResponseViewSet, basename='surveyresponse')
 router.register(r'api/lucky-draw', api_views.LuckyDrawEntryViewSet, basename='luckydrawentry')
+router.register(r'api/reports/daily', api_views.DailyReportViewSet, basename='daily-report')
+router.register(r'api/catalog/changes', api_views.CatalogChangesViewSet, basename='catalog-change')
 
 urlpatterns = [
     # Serve ads.txt file for Google AdSense
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'survey_app.settings')
 
 application = get_wsgi_application()
+
+# Build the in-process search type-ahead index before serving the first request
+from surveys.typeahead import warm_index  # noqa: E402
+
+warm_index()
@@ -3,6 +3,7 @@ from django.contrib.admin import AdminSite
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User, Group
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin, GroupAdmin
+from django.core.exceptions import PermissionDenied
 from django.db.models.deletion import ProtectedError
 from django.utils.translation import gettext_lazy as _
 from django.template.response import TemplateResponse
@@ -12,16 +13,22 @@ from django import forms
 from django.db import models
 from django.forms import CheckboxSelectMultiple
 from ckeditor.widgets import CKEditorWidget
+from . import analytics, exports
+from .crosstab import CrosstabError, get_crosstab
+from .forms import CrosstabForm, ResponseExportForm
+from .paginators import EstimatedCountPaginator
 from .models import (
     SurveyCategory, Survey, Question, Choice, SurveyResponse, Answer,
     LuckyDrawEntry, UserProfile, Country, EmailVerification, MilestoneAchievement,
     Poll, PollQuestion, PollChoice, PollResponse, PollAnswer, CountryLuckyDrawConfig,
-    WalletTransaction, UserWallet, WalletWithdrawalRequest, JournalPost, JournalCategory, PrivacyPolicy, AboutUs
+    WalletTransaction, UserWallet, WalletWithdrawalRequest, JournalPost, JournalCategory, PrivacyPolicy, AboutUs,
+    DailySurveyStats, DailyPollStats, DailyLuckyDrawStats, DailyWalletStats,
 )
 from django.utils.safestring import mark_safe
 from django.urls import path
-from django.http import JsonResponse, HttpResponseRedirect
-from django.db.models import Count, Max, Q
+from django.http import Http404, JsonResponse, HttpResponseRedirect
+from django.db.models import Case, CharField, Count, F, Max, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
 
 # Custom Admin Site
 class SurveyAdminSite(AdminSite):
@@ -87,6 +94,41 @@ class SafeDeleteAdminMixin:
             messages.error(request, self._format_protected_error('selected items', e))
 
 
+
+def subquery_count(model, field, **filters):
+    """Correlated ``COUNT(*)`` of ``model`` rows whose ``field`` points at the outer row.
+
+    Unlike ``Count()`` over a join, several of these can be combined on one
+    queryset without multiplying rows.
+    """
+    rows = model.objects.filter(**{field: OuterRef('pk')}, **filters).order_by().values(field)
+    return Coalesce(Subquery(rows.annotate(total=Count('*')).values('total')[:1]), 0)
+
+
+class AnnotatedColumnsMixin:
+    """Declare computed changelist columns as queryset annotations.
+
+    ``annotated_columns`` maps annotation names to expressions; ``get_queryset``
+    applies them so the changelist costs a constant number of queries. Column
+    methods read ``obj.<name>`` and set ``admin_order_field = '<name>'`` to make
+    the column sortable.
+    """
+    annotated_columns = {}
+
+    def get_annotated_columns(self, request):
+        return self.annotated_columns
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        columns = self.get_annotated_columns(request)
+        return queryset.annotate(**columns) if columns else queryset
+
+class LargeTableAdminMixin:
+    """Changelists over tables with millions of rows: estimated counts, no full-count query."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 class ChoiceInline(admin.TabularInline):
     model = Choice
     extra = 1
@@ -125,25 +167,31 @@ class PollAnswerInline(admin.TabularInline):
         return ", ".join(choice.choice_text for choice in obj.selected_choices.all())
     get_answer_display.short_description = 'Answer'
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('question').prefetch_related('selected_choices')
+
 
-class PollAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
+class PollAdmin(SafeDeleteAdminMixin, AnnotatedColumnsMixin, admin.ModelAdmin):
     inlines = [PollQuestionInline]
     list_display = ('title', 'country', 'question_count', 'response_count', 'is_active', 'order', 'created_at')
     list_filter = ('country', 'is_active', 'created_at')
     search_fields = ('title', 'description', 'country__name')
     list_select_related = ('country',)
     fields = ('title', 'description', 'country', 'is_active', 'order')
-
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('country').prefetch_related('questions', 'responses')
+    annotated_columns = {
+        'questions_count': subquery_count(PollQuestion, 'poll'),
+        'responses_count': subquery_count(PollResponse, 'poll'),
+    }
 
     def question_count(self, obj):
-        return obj.questions.count()
+        return obj.questions_count
     question_count.short_description = 'Questions'
+    question_count.admin_order_field = 'questions_count'
 
     def response_count(self, obj):
-        return obj.responses.count()
+        return obj.responses_count
     response_count.short_description = 'Responses'
+    response_count.admin_order_field = 'responses_count'
 
 
 class PollQuestionAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
@@ -154,7 +202,7 @@ class PollQuestionAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
     list_select_related = ('poll', 'poll__country')
 
 
-class PollResponseAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
+class PollResponseAdmin(SafeDeleteAdminMixin, LargeTableAdminMixin, admin.ModelAdmin):
     inlines = [PollAnswerInline]
     list_display = ('id', 'user', 'poll', 'country', 'submitted_at')
     list_filter = ('poll', 'poll__country', 'submitted_at')
@@ -178,7 +226,7 @@ class CountryLuckyDrawConfigAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
     prize_display.short_description = 'Prize Amount'
 
 
-class WalletTransactionAdmin(admin.ModelAdmin):
+class WalletTransactionAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('profile', 'transaction_type', 'amount_display', 'description', 'balance_after_display', 'created_at')
     list_filter = ('transaction_type', 'currency_code', 'created_at')
     search_fields = ('profile__user__username', 'profile__user__email', 'description')
@@ -578,7 +626,7 @@ class CountryAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
     populate_countries.short_description = 'Populate countries from django-countries'
 
 
-class SurveyAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
+class SurveyAdmin(SafeDeleteAdminMixin, AnnotatedColumnsMixin, admin.ModelAdmin):
     change_form_template = 'admin/surveys/survey/change_form.html'
     inlines = [QuestionInline]
     list_display = ('name', 'category', 'level', 'get_country', 'question_count', 'is_active', 'created_at')
@@ -595,26 +643,25 @@ class SurveyAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
             'fields': ('name', 'description', 'category', 'level', 'is_active')
         }),
     )
+    annotated_columns = {
+        'questions_count': subquery_count(Question.surveys.through, 'survey'),
+    }
     
     def formfield_for_dbfield(self, db_field, **kwargs):
         if db_field.name == 'level':
             kwargs['widget'] = forms.Select(choices=[(i, f'Level {i}') for i in range(1, 11)])
         return super().formfield_for_dbfield(db_field, **kwargs)
     
-    def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related('questions')
-    
     def get_country(self, obj):
         return obj.category.country if obj.category and hasattr(obj.category, 'country') else None
     get_country.short_description = 'Country'
     get_country.admin_order_field = 'category__country'
     
     def question_count(self, obj):
-        count = obj.questions.count()
         return format_html('<a href="{}?survey__id__exact={}">{}</a>', 
                           reverse('admin:surveys_question_changelist'), 
                           obj.id, 
-                          count)
+                          obj.questions_count)
     question_count.short_description = 'Questions'
     question_count.admin_order_field = 'questions_count'
     
@@ -626,6 +673,16 @@ class SurveyAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
                 self.admin_site.admin_view(self.view_questions),
                 name='survey-questions',
             ),
+            path(
+                '<int:survey_id>/results/',
+                self.admin_site.admin_view(self.view_results),
+                name='survey-results',
+            ),
+            path(
+                '<int:survey_id>/crosstab/',
+                self.admin_site.admin_view(self.view_crosstab),
+                name='survey-crosstab',
+            ),
         ]
         return custom_urls + urls
 
@@ -638,6 +695,8 @@ class SurveyAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
             if query:
                 url = f"{url}?{query}"
         extra_context['question_order_url'] = url
+        extra_context['results_url'] = reverse('admin:survey-results', args=[object_id])
+        extra_context['crosstab_url'] = reverse('admin:survey-crosstab', args=[object_id])
 
         # Provide question list for inline ordering directly on the survey change form
         survey = self.get_object(request, object_id)
@@ -653,9 +712,7 @@ class SurveyAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
         order_data = request.POST.get('question_order', '')
         if order_data:
             try:
-                order_list = [int(x) for x in order_data.split(',') if x]
-                for idx, qid in enumerate(order_list, 1):
-                    Question.objects.filter(pk=qid, surveys=obj).update(order=idx)
+                obj.reorder_questions(x for x in order_data.split(',') if x)
             except ValueError:
                 pass
     
@@ -675,16 +732,7 @@ class SurveyAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
             order_data = request.POST.get('question_order', '')
             if order_data:
                 try:
-                    order_mapping = {}
-                    for idx, question_id in enumerate(order_data.split(','), 1):
-                        order_mapping[int(question_id)] = idx
-                    
-                    # Update the order for each question
-                    for question in survey.questions.all():
-                        if question.id in order_mapping:
-                            question.order = order_mapping[question.id]
-                            question.save(update_fields=['order'])
-                    
+                    survey.reorder_questions(order_data.split(','))
                     messages.success(request, 'Question order updated successfully.')
                 except Exception as e:
                     messages.error(request, f'Error updating question order: {str(e)}')
@@ -712,6 +760,59 @@ class SurveyAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
             context,
         )
     
+    def view_results(self, request, survey_id):
+        """
+        Per-question choice distributions, rating statistics and top text answers
+        """
+        survey = self.get_object(request, str(survey_id))
+        if survey is None:
+            raise Http404('Survey not found')
+        if not self.has_view_permission(request, survey):
+            raise PermissionDenied
+
+        context = dict(
+            self.admin_site.each_context(request),
+            title=f'Results for {survey.name}',
+            survey=survey,
+            results=analytics.get_survey_results(survey, refresh='refresh' in request.GET),
+            opts=Survey._meta,
+        )
+        return TemplateResponse(request, 'admin/surveys/survey/results.html', context)
+
+    def view_crosstab(self, request, survey_id):
+        """
+        Break respondents down by two demographic or answer dimensions
+        """
+        survey = self.get_object(request, str(survey_id))
+        if survey is None:
+            raise Http404('Survey not found')
+        if not self.has_view_permission(request, survey):
+            raise PermissionDenied
+
+        form = CrosstabForm(request.GET or None, survey=survey)
+        table = None
+        if form.is_valid():
+            try:
+                table = get_crosstab(survey, refresh='refresh' in request.GET, **form.crosstab_arguments())
+            except CrosstabError as exc:
+                form.add_error(None, str(exc))
+
+        context = dict(
+            self.admin_site.each_context(request),
+            title=f'Cross-tab for {survey.name}',
+            survey=survey,
+            form=form,
+            table=table,
+            rows=[
+                {'label': label, 'cells': list(zip(counts, shares)), 'total': total}
+                for label, counts, shares, total in zip(
+                    table['row_labels'], table['counts'], table['row_percentages'], table['row_totals'],
+                )
+            ] if table else [],
+            opts=Survey._meta,
+        )
+        return TemplateResponse(request, 'admin/surveys/survey/crosstab.html', context)
+
     def response_change(self, request, obj):
         """
         Handle the response after the 'Save' button is pressed.
@@ -739,7 +840,17 @@ class AnswerInline(admin.TabularInline):
         return ""
     get_answer_display.short_description = 'Answer'
 
-class SurveyResponseAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('question').prefetch_related('selected_choices')
+
+
+class AnswerAdmin(SafeDeleteAdminMixin, LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('id', 'question', 'response', 'text_answer', 'rating_value')
+    search_fields = ('response__user__username', 'question__question_text')
+    list_select_related = ('question', 'response__user', 'response__survey')
+    raw_id_fields = ('response', 'question')
+
+class SurveyResponseAdmin(SafeDeleteAdminMixin, LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'user', 'survey', 'completed_at', 'time_spent')
     list_filter = ('survey', 'completed_at')
     inlines = [AnswerInline]
@@ -747,6 +858,42 @@ class SurveyResponseAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
     list_select_related = ('user', 'survey')
     search_fields = ('user__username', 'survey__name')
     date_hierarchy = 'completed_at'
+    actions = ('export_answers_csv', 'export_answers_ndjson')
+
+    def get_urls(self):
+        custom_urls = [
+            path(
+                'export/',
+                self.admin_site.admin_view(self.export_view),
+                name='surveys_surveyresponse_export',
+            ),
+        ]
+        return custom_urls + super().get_urls()
+
+    def export_view(self, request):
+        """Filter form that streams every matching answer as CSV, NDJSON or Parquet."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        form = ResponseExportForm(request.GET if 'format' in request.GET else None)
+        if form.is_valid():
+            queryset = exports.export_queryset(**form.export_filters())
+            return exports.export_response(form.cleaned_data['format'], queryset)
+
+        context = dict(
+            self.admin_site.each_context(request),
+            title='Export survey answers',
+            form=form,
+            opts=self.model._meta,
+        )
+        return TemplateResponse(request, 'admin/surveys/surveyresponse/export.html', context)
+
+    def export_answers_csv(self, request, queryset):
+        return exports.export_response('csv', exports.export_queryset(responses=queryset))
+    export_answers_csv.short_description = 'Export answers of selected responses (CSV)'
+
+    def export_answers_ndjson(self, request, queryset):
+        return exports.export_response('ndjson', exports.export_queryset(responses=queryset))
+    export_answers_ndjson.short_description = 'Export answers of selected responses (NDJSON)'
     
     def time_spent(self, obj):
         # Since we don't have started_at, we can't calculate time spent
@@ -754,7 +901,7 @@ class SurveyResponseAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
         return "Not available"
     time_spent.short_description = 'Time Spent'
 
-class LuckyDrawEntryAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
+class LuckyDrawEntryAdmin(SafeDeleteAdminMixin, LargeTableAdminMixin, AnnotatedColumnsMixin, admin.ModelAdmin):
     list_display = (
         'user', 'draw_type', 'source_title', 'created_at', 'is_winner',
         'guessed_number', 'winning_number', 'prize',
@@ -770,15 +917,24 @@ class LuckyDrawEntryAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
         'guessed_number', 'winning_number', 'prize',
         'surveys_at_play', 'polls_at_play'
     )
-    list_select_related = ('user', 'survey', 'poll')
+    list_select_related = ('user',)
     list_per_page = 20
     date_hierarchy = 'created_at'
+    annotated_columns = {
+        'source_name': Coalesce(
+            Case(
+                When(draw_type=LuckyDrawEntry.DRAW_TYPE_POLL, then=F('poll__title')),
+                default=F('survey__name'),
+                output_field=CharField(),
+            ),
+            Value('-'),
+        ),
+    }
 
     def source_title(self, obj):
-        if obj.draw_type == LuckyDrawEntry.DRAW_TYPE_POLL:
-            return obj.poll.title if obj.poll else '-'
-        return obj.survey.name if obj.survey else '-'
+        return obj.source_name
     source_title.short_description = 'Poll / Survey'
+    source_title.admin_order_field = 'source_name'
     
     def has_add_permission(self, request):
         # Disable adding entries through admin since they should be created by the system
@@ -849,7 +1005,7 @@ class SurveyCategoryAdminForm(forms.ModelForm):
             'description': CKEditorWidget(),
         }
 
-class SurveyCategoryAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
+class SurveyCategoryAdmin(SafeDeleteAdminMixin, AnnotatedColumnsMixin, admin.ModelAdmin):
     form = SurveyCategoryAdminForm
     list_display = ('name', 'slug', 'country', 'parent', 'order', 'image_preview', 'survey_count', 'created_at')
     list_filter = ('country', 'parent', 'created_at')
@@ -872,12 +1028,14 @@ class SurveyCategoryAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
                 'classes': ('collapse',)
             }),
         )  
-    def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related('surveys')
-    
+    annotated_columns = {
+        'surveys_count': subquery_count(Survey, 'category'),
+    }
+
     def survey_count(self, obj):
-        return obj.surveys.count()
+        return obj.surveys_count
     survey_count.short_description = 'Surveys'
+    survey_count.admin_order_field = 'surveys_count'
     
     def image_preview(self, obj):
         if obj.image:
@@ -909,7 +1067,7 @@ class SurveyCategoryAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
         return id_list
 
 
-class JournalCategoryAdmin(admin.ModelAdmin):
+class JournalCategoryAdmin(AnnotatedColumnsMixin, admin.ModelAdmin):
     list_display = ('name', 'slug', 'order', 'image_preview', 'post_count', 'created_at')
     search_fields = ('name', 'slug')
     list_editable = ('order',)
@@ -931,12 +1089,14 @@ class JournalCategoryAdmin(admin.ModelAdmin):
         }),
     )
 
-    def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related('journal_posts')
+    annotated_columns = {
+        'posts_count': subquery_count(JournalPost, 'category'),
+    }
 
     def post_count(self, obj):
-        return obj.journal_posts.count()
+        return obj.posts_count
     post_count.short_description = 'Posts'
+    post_count.admin_order_field = 'posts_count'
 
     def image_preview(self, obj):
         if obj.image:
@@ -1112,6 +1272,29 @@ class CustomUserAdmin(SafeDeleteAdminMixin, BaseUserAdmin):
             return []
         return super().get_inline_instances(request, obj)
 
+class DailyStatsAdmin(admin.ModelAdmin):
+    """Read-only view of a daily fact table; rows are written by ``manage.py rollup_daily_stats``."""
+    date_hierarchy = 'date'
+    list_filter = ('country',)
+    ordering = ('-date',)
+    list_per_page = 50
+
+    def get_list_display(self, request):
+        return [field.name for field in self.model._meta.fields if field.name != 'id']
+
+    def get_list_select_related(self, request):
+        return [field.name for field in self.model._meta.fields if field.is_relation]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 class DefaultModelAdmin(SafeDeleteAdminMixin, admin.ModelAdmin):
     """Default admin with delete link support."""
     pass
@@ -1135,19 +1318,23 @@ survey_admin_site.register(WalletTransaction, WalletTransactionAdmin)
 survey_admin_site.register(WalletWithdrawalRequest, WalletWithdrawalRequestAdmin)
 survey_admin_site.register(SurveyResponse, SurveyResponseAdmin)
 survey_admin_site.register(EmailVerification, EmailVerificationAdmin)
-survey_admin_site.register(Answer, DefaultModelAdmin)
+survey_admin_site.register(Answer, AnswerAdmin)
 survey_admin_site.register(LuckyDrawEntry, LuckyDrawEntryAdmin)
 survey_admin_site.register(MilestoneAchievement, MilestoneAchievementAdmin)
 survey_admin_site.register(JournalCategory, JournalCategoryAdmin)
 survey_admin_site.register(JournalPost, JournalPostAdmin)
 survey_admin_site.register(PrivacyPolicy, PrivacyPolicyAdmin)
 survey_admin_site.register(AboutUs, AboutUsAdmin)
+survey_admin_site.register(DailySurveyStats, DailyStatsAdmin)
+survey_admin_site.register(DailyPollStats, DailyStatsAdmin)
+survey_admin_site.register(DailyLuckyDrawStats, DailyStatsAdmin)
+survey_admin_site.register(DailyWalletStats, DailyStatsAdmin)
 
 # Register with the default admin site (only non-auth models)
 admin.site.register(SurveyCategory, SurveyCategoryAdmin)
 admin.site.register(Survey, SurveyAdmin)
 admin.site.register(Choice, DefaultModelAdmin)
-admin.site.register(Answer, DefaultModelAdmin)
+admin.site.register(Answer, AnswerAdmin)
 admin.site.register(SurveyResponse, SurveyResponseAdmin)
 admin.site.register(Poll, PollAdmin)
 admin.site.register(PollQuestion, PollQuestionAdmin)
@@ -1164,3 +1351,7 @@ admin.site.register(JournalCategory, JournalCategoryAdmin)
 admin.site.register(JournalPost, JournalPostAdmin)
 admin.site.register(PrivacyPolicy, PrivacyPolicyAdmin)
 admin.site.register(AboutUs, AboutUsAdmin)
+admin.site.register(DailySurveyStats, DailyStatsAdmin)
+admin.site.register(DailyPollStats, DailyStatsAdmin)
+admin.site.register(DailyLuckyDrawStats, DailyStatsAdmin)
+admin.site.register(DailyWalletStats, DailyStatsAdmin)
@@ -0,0 +1,226 @@
+"""Per-question results for a survey.
+
+``get_survey_results(survey)`` returns a JSON-serializable summary: response and
+completion counts, choice distributions, rating histograms with mean and
+standard deviation, and the most frequent free-text and "Other" answers.
+
+Each figure comes from one grouped aggregate over the whole survey (answers per
+question, selections per choice through the ``Answer.selected_choices`` table,
+ratings per value). The query count therefore depends on the number of
+text-bearing questions, never on the number of answers, and the rows returned
+are already aggregates. NumPy turns the rating histograms into statistics.
+Results are cached for ``SURVEY_ANALYTICS['CACHE_TIMEOUT']`` seconds, keyed
+on the catalog version so that edits to questions or choices show up at once.
+Queries go to a read replica when one is configured.
+
+``daily_report()`` serves day-by-day activity for dashboards from the daily fact
+tables (see ``surveys.rollups``) and never scans raw responses.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Lower, Trim
+from django.utils import timezone
+
+import numpy as np
+
+from .db_router import use_read_replica
+from .models import (
+    Answer, DailyLuckyDrawStats, DailyPollStats, DailySurveyStats, DailyWalletStats,
+    SurveyResponse, WalletTransaction,
+)
+from .versioning import get_version
+
+DEFAULT_CONFIG = {
+    'CACHE_TIMEOUT': 60 * 10,
+    'TOP_TEXT_ANSWERS': 10,
+}
+
+RATING_VALUES = np.arange(1, 6)
+
+CHOICE_TYPES = ('single_choice', 'multiple_choice')
+
+
+def get_config():
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'SURVEY_ANALYTICS', {}) or {})
+    return config
+
+
+def _percent(part, whole):
+    return round(100.0 * part / whole, 1) if whole else 0.0
+
+
+def rating_summary(histogram):
+    """Mean, standard deviation and per-value shares for a ``{rating: count}`` histogram."""
+    counts = np.array([histogram.get(int(value), 0) for value in RATING_VALUES], dtype=np.int64)
+    total = int(counts.sum())
+    summary = {
+        'count': total,
+        'histogram': [
+            {'value': int(value), 'count': int(count), 'percent': _percent(int(count), total)}
+            for value, count in zip(RATING_VALUES, counts)
+        ],
+        'mean': None,
+        'stddev': None,
+    }
+    if total:
+        mean = np.average(RATING_VALUES, weights=counts)
+        summary['mean'] = round(float(mean), 2)
+        summary['stddev'] = round(float(np.sqrt(np.average((RATING_VALUES - mean) ** 2, weights=counts))), 2)
+    return summary
+
+
+def _top_texts(answers, question_id, limit):
+    rows = (
+        answers.filter(question_id=question_id)
+        .exclude(text_answer__isnull=True)
+        .exclude(text_answer='')
+        .annotate(text=Lower(Trim('text_answer')))
+        .values('text')
+        .annotate(count=Count('pk'))
+        .order_by('-count', 'text')[:limit]
+    )
+    return [{'text': row['text'], 'count': row['count']} for row in rows]
+
+
+def compute_survey_results(survey, top_texts=None):
+    if top_texts is None:
+        top_texts = get_config()['TOP_TEXT_ANSWERS']
+
+    responses = SurveyResponse.objects.filter(survey=survey).aggregate(
+        total=Count('pk'),
+        completed=Count('pk', filter=Q(completed_at__isnull=False)),
+    )
+    answers = Answer.objects.filter(response__survey=survey)
+
+    answered = {}
+    with_text = {}
+    for row in answers.values('question_id').annotate(
+        total=Count('pk'),
+        texts=Count('pk', filter=Q(text_answer__isnull=False) & ~Q(text_answer='')),
+    ).order_by():
+        answered[row['question_id']] = row['total']
+        with_text[row['question_id']] = row['texts']
+
+    selections = dict(
+        Answer.selected_choices.through.objects
+        .filter(answer__response__survey=survey)
+        .values('choice_id')
+        .annotate(count=Count('pk'))
+        .order_by()
+        .values_list('choice_id', 'count')
+    )
+
+    ratings = {}
+    for question_id, value, count in (
+        answers.filter(rating_value__isnull=False)
+        .values('question_id', 'rating_value')
+        .annotate(count=Count('pk'))
+        .order_by()
+        .values_list('question_id', 'rating_value', 'count')
+    ):
+        ratings.setdefault(question_id, {})[value] = count
+
+    questions = []
+    for question in survey.questions.order_by('order', 'id').prefetch_related('choices'):
+        total = answered.get(question.id, 0)
+        result = {
+            'id': question.id,
+            'text': question.question_text,
+            'type': question.question_type,
+            'answered': total,
+            'answer_rate': _percent(total, responses['total']),
+        }
+        if question.question_type in CHOICE_TYPES:
+            result['choices'] = [
+                {
+                    'id': choice.id,
+                    'text': choice.choice_text,
+                    'count': selections.get(choice.id, 0),
+                    'percent': _percent(selections.get(choice.id, 0), total),
+                }
+                for choice in question.choices.all()
+            ]
+            # Choice answers only carry text when the respondent picked "Other"
+            other = with_text.get(question.id, 0)
+            result['other'] = {
+                'count': other,
+                'percent': _percent(other, total),
+                'top': _top_texts(answers, question.id, top_texts) if other else [],
+            }
+        elif question.question_type == 'rating':
+            result['rating'] = rating_summary(ratings.get(question.id, {}))
+        elif question.question_type == 'text':
+            result['top_answers'] = (
+                _top_texts(answers, question.id, top_texts) if with_text.get(question.id) else []
+            )
+        questions.append(result)
+
+    return {
+        'survey': {'id': survey.id, 'name': survey.name},
+        'responses': responses['total'],
+        'completed': responses['completed'],
+        'completion_rate': _percent(responses['completed'], responses['total']),
+        'questions': questions,
+        'generated_at': timezone.now().isoformat(),
+    }
+
+
+def results_cache_key(survey_id):
+    return f'surveys:analytics:{survey_id}:v{get_version()}'
+
+
+def get_survey_results(survey, refresh=False):
+    """Cached ``compute_survey_results``; ``refresh`` recomputes and re-caches."""
+    key = results_cache_key(survey.pk)
+    results = None if refresh else cache.get(key)
+    if results is None:
+        with use_read_replica():
+            results = compute_survey_results(survey)
+        cache.set(key, results, get_config()['CACHE_TIMEOUT'])
+    return results
+
+
+def daily_report(start, end, country_id=None):
+    """Per-day completions, poll responses, lucky draw plays/wins and wallet totals from the fact tables."""
+    def facts(model):
+        rows = model.objects.filter(date__gte=start, date__lte=end)
+        if country_id:
+            rows = rows.filter(country_id=country_id)
+        return rows.values('date').order_by()
+
+    days = {}
+
+    def day(date):
+        return days.setdefault(date, {
+            'date': date.isoformat(),
+            'survey_completions': 0,
+            'poll_responses': 0,
+            'lucky_draw_plays': 0,
+            'lucky_draw_wins': 0,
+            'wallet': {},
+        })
+
+    with use_read_replica():
+        for row in facts(DailySurveyStats).annotate(total=Sum('completions')):
+            day(row['date'])['survey_completions'] = row['total']
+        for row in facts(DailyPollStats).annotate(total=Sum('responses')):
+            day(row['date'])['poll_responses'] = row['total']
+        for row in facts(DailyLuckyDrawStats).annotate(plays=Sum('plays'), wins=Sum('wins')):
+            day(row['date']).update(lucky_draw_plays=row['plays'], lucky_draw_wins=row['wins'])
+        for row in facts(DailyWalletStats).values('date', 'currency_code').annotate(
+            credits=Sum('amount', filter=Q(transaction_type=WalletTransaction.TRANSACTION_TYPE_CREDIT)),
+            debits=Sum('amount', filter=Q(transaction_type=WalletTransaction.TRANSACTION_TYPE_DEBIT)),
+        ):
+            day(row['date'])['wallet'][row['currency_code']] = {
+                'credits': f"{row['credits'] or 0:.2f}",
+                'debits': f"{row['debits'] or 0:.2f}",
+            }
+
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'country': country_id,
+        'days': [days[date] for date in sorted(days)],
+    }
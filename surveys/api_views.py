@@ -1,4 +1,5 @@
 import random
+from datetime import date, timedelta
 
 from django.conf import settings
 from rest_framework import viewsets, status, permissions, serializers
@@ -6,7 +7,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Prefetch, Q
+from django.shortcuts import get_object_or_404
 from .models import (
     SurveyCategory, Survey, Question, 
     Choice, SurveyResponse, Answer, LuckyDrawEntry
@@ -15,52 +17,117 @@ from .serializers import (
     SurveyCategorySerializer, SurveySerializer, 
     QuestionSerializer, SurveyResponseSerializer,
     AnswerSerializer, LuckyDrawEntrySerializer,
-    UserSerializer
+    UserSerializer, SurveyResponseBatchSerializer
 )
 from django.contrib.auth.models import User
+from django.utils.decorators import method_decorator
+from . import analytics, catalog_changes
+from .batch_responses import submit_responses
+from .catalog_cache import CachedSerializationMixin
+from .conditional import ConditionalGetMixin
+from .crosstab import CrosstabError, get_crosstab
+from .forms import CrosstabForm
+from .db_router import read_only_view
+from .pagination import CreatedCursorPagination
+from .sparse_fields import SparseFieldsetsViewSetMixin
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsetsViewSetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAdminUser]  # Only admin can manage users
+    pagination_class = CreatedCursorPagination
+    cursor_ordering = ('-date_joined', '-id')
 
-class SurveyCategoryViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = SurveyCategory.objects.all()
+@method_decorator(read_only_view, name='dispatch')
+class SurveyCategoryViewSet(ConditionalGetMixin, CachedSerializationMixin, SparseFieldsetsViewSetMixin,
+                            viewsets.ReadOnlyModelViewSet):
+    queryset = SurveyCategory.objects.order_by('id')
     serializer_class = SurveyCategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
-class SurveyViewSet(viewsets.ReadOnlyModelViewSet):
+@method_decorator(read_only_view, name='dispatch')
+class SurveyViewSet(ConditionalGetMixin, CachedSerializationMixin, SparseFieldsetsViewSetMixin,
+                    viewsets.ReadOnlyModelViewSet):
     serializer_class = SurveySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    expand_prefetches = {
+        'questions': Prefetch('questions', Question.objects.order_by('order', 'id').prefetch_related('choices')),
+    }
 
     def get_queryset(self):
-        queryset = Survey.objects.filter(is_active=True)
+        queryset = Survey.objects.filter(is_active=True).order_by('id')
         category = self.request.query_params.get('category', None)
         if category is not None:
             queryset = queryset.filter(category_id=category)
         return queryset
 
-class QuestionViewSet(viewsets.ReadOnlyModelViewSet):
+    def get_fragment_queryset(self):
+        return self.get_queryset().select_related('category').prefetch_related(
+            self.expand_prefetches['questions'],
+        )
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def results(self, request, pk=None):
+        """Per-question aggregates for staff; ``?refresh=1`` bypasses the cache."""
+        survey = get_object_or_404(Survey, pk=pk)
+        return Response(analytics.get_survey_results(survey, refresh='refresh' in request.query_params))
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def crosstab(self, request, pk=None):
+        """Respondent counts for two dimensions, e.g. ``?rows=answer&question=7&columns=age_band&country=India``."""
+        survey = get_object_or_404(Survey, pk=pk)
+        form = CrosstabForm(request.query_params, survey=survey)
+        if not form.is_valid():
+            return Response(form.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = get_crosstab(
+                survey, refresh='refresh' in request.query_params, **form.crosstab_arguments()
+            )
+        except CrosstabError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+@method_decorator(read_only_view, name='dispatch')
+class QuestionViewSet(SparseFieldsetsViewSetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = QuestionSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
-        queryset = Question.objects.all()
+        queryset = Question.objects.prefetch_related('choices').order_by('order', 'id')
         survey_id = self.request.query_params.get('survey', None)
         if survey_id is not None:
-            queryset = queryset.filter(survey_id=survey_id)
+            queryset = queryset.filter(surveys__id=survey_id)
         return queryset
 
-class SurveyResponseViewSet(viewsets.ModelViewSet):
+class SurveyResponseViewSet(SparseFieldsetsViewSetMixin, viewsets.ModelViewSet):
     serializer_class = SurveyResponseSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedCursorPagination
+    cursor_ordering = ('-started_at', '-id')
+    expand_prefetches = {
+        'answers': Prefetch('answers', Answer.objects.prefetch_related('selected_choices')),
+    }
 
     def get_queryset(self):
-        return SurveyResponse.objects.filter(user=self.request.user)
+        return SurveyResponse.objects.filter(user=self.request.user).prefetch_related(
+            self.expand_prefetches['answers'],
+        )
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Submit several completed responses at once; returns a result per item, in order."""
+        serializer = SurveyResponseBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = submit_responses(request.user, serializer.validated_data['responses'])
+        created = any(result['status'] == 'created' for result in results)
+        return Response(
+            {'results': results},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
     @action(detail=False, methods=['get'])
     def completed_surveys(self, request):
         current_month = timezone.now().month
@@ -78,9 +145,10 @@ class SurveyResponseViewSet(viewsets.ModelViewSet):
             'year': current_year
         })
 
-class LuckyDrawEntryViewSet(viewsets.ModelViewSet):
+class LuckyDrawEntryViewSet(SparseFieldsetsViewSetMixin, viewsets.ModelViewSet):
     serializer_class = LuckyDrawEntrySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedCursorPagination
 
     def get_queryset(self):
         return LuckyDrawEntry.objects.filter(user=self.request.user)
@@ -141,3 +209,57 @@ class LuckyDrawEntryViewSet(viewsets.ModelViewSet):
             'available': True,
             'number': number
         })
+
+
+class DailyReportViewSet(viewsets.ViewSet):
+    """Day-by-day activity for staff dashboards, read from the daily fact tables.
+
+    Query parameters: ``start`` and ``end`` (YYYY-MM-DD, default the last 30 days)
+    and ``country`` (id).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def list(self, request):
+        params = request.query_params
+        try:
+            end = date.fromisoformat(params['end']) if params.get('end') else timezone.localdate()
+            start = date.fromisoformat(params['start']) if params.get('start') else end - timedelta(days=29)
+            country = int(params['country']) if params.get('country') else None
+        except ValueError:
+            return Response(
+                {'detail': 'Use YYYY-MM-DD dates and a numeric country id.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if start > end:
+            return Response({'detail': 'start must be on or before end.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(analytics.daily_report(start, end, country))
+
+
+@method_decorator(read_only_view, name='dispatch')
+class CatalogChangesViewSet(viewsets.ViewSet):
+    """Catalog upserts and deletes after ``?since=<version>`` for one country.
+
+    The country is ``?country=<id>`` or, by default, the user's profile country.
+    Clients store the returned ``version`` and pass it as ``since`` next time,
+    straight away while ``has_more`` is true; ``since=0`` starts from the
+    beginning of the log. Changes younger than the safety lag are held back
+    for a later sync (see ``surveys.catalog_changes``).
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    def list(self, request):
+        params = request.query_params
+        try:
+            since = int(params.get('since') or 0)
+            country = int(params['country']) if params.get('country') else None
+        except ValueError:
+            return Response(
+                {'detail': 'since and country must be integers.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if country is None and request.user.is_authenticated:
+            profile = getattr(request.user, 'profile', None)
+            country = profile.country_id if profile else None
+        if country is None:
+            return Response({'detail': 'Pass a country id.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(catalog_changes.changes_since(max(since, 0), country))
@@ -0,0 +1,299 @@
+"""Batch submission of completed survey responses (mobile and offline clients).
+
+``submit_responses(user, items)`` takes the validated items of a batch request
+and handles them in order. Each item is checked against a compiled survey: a
+plain dict holding the survey's questions, their choices and the category's
+survey sequence. Compiled surveys are cached under the catalog version, so a
+warm batch needs no catalog queries.
+
+``completed_at`` comes from the client, so it is bounded: not in the future,
+not before the account was created, and less than one cooldown period old.
+Backdated items therefore cannot be spread over past cooldown periods to
+collect several completions of a survey at once.
+
+Cooldown and sequence locks are checked inside the write transaction, after
+the user's row is locked, against one query for the user's completions; a
+concurrent batch from the same user waits and then sees this one's
+completions. That state is updated in memory as items are accepted, so a
+client that completed level 1 and then level 2 offline can sync both in one
+request.
+
+Accepted items are written in that transaction with ``bulk_create`` for the
+responses, the answers and the selected choices; a response's ``started_at``
+is set to its ``completed_at``. Backdated completions land on past days,
+which ``surveys.rollups`` re-rolls for up to one cooldown period. ``UserSurveyProgress``, which
+also feeds the lucky draw counts, is then updated once per category and level,
+and milestones are checked once for the whole batch.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, Prefetch
+from django.utils import timezone
+
+from .milestones import check_and_award_milestones
+from .models import Answer, Question, Survey, SurveyResponse, UserSurveyProgress
+from .versioning import get_version
+
+CHOICE_TYPES = ('single_choice', 'multiple_choice')
+COMPILED_TIMEOUT = 60 * 60 * 24
+
+
+def compiled_survey_key(survey_id, version):
+    return f'surveys:compiled:{survey_id}:v{version}'
+
+
+def compile_surveys(survey_ids):
+    """Build the validation data for ``survey_ids``; unknown or inactive ids are left out."""
+    surveys = list(
+        Survey.objects.filter(pk__in=survey_ids, is_active=True).prefetch_related(
+            Prefetch('questions', Question.objects.order_by('order', 'id').prefetch_related('choices')),
+        )
+    )
+    sequences = {}
+    for survey_id, name, level, category_id in (
+        Survey.objects.filter(category_id__in={survey.category_id for survey in surveys}, is_active=True)
+        .order_by('level', 'id')
+        .values_list('id', 'name', 'level', 'category_id')
+    ):
+        sequences.setdefault(category_id, []).append((survey_id, name, level))
+
+    return {
+        survey.pk: {
+            'id': survey.pk,
+            'name': survey.name,
+            'level': survey.level,
+            'category_id': survey.category_id,
+            'sequence': sequences.get(survey.category_id, []),
+            'questions': {
+                question.pk: {
+                    'type': question.question_type,
+                    'required': question.is_required,
+                    'choices': frozenset(choice.pk for choice in question.choices.all()),
+                }
+                for question in survey.questions.all()
+            },
+        }
+        for survey in surveys
+    }
+
+
+def get_compiled_surveys(survey_ids):
+    """Cached ``compile_surveys``; invalidated by any catalog change."""
+    version = get_version()
+    keys = {survey_id: compiled_survey_key(survey_id, version) for survey_id in set(survey_ids)}
+    cached = cache.get_many(list(keys.values()))
+    compiled = {survey_id: cached[key] for survey_id, key in keys.items() if key in cached}
+
+    missing = [survey_id for survey_id in keys if survey_id not in compiled]
+    if missing:
+        built = compile_surveys(missing)
+        cache.set_many({keys[survey_id]: data for survey_id, data in built.items()}, COMPILED_TIMEOUT)
+        compiled.update(built)
+    return compiled
+
+
+def validate_answers(survey, answers):
+    """Return a list of error messages for ``answers`` against a compiled survey."""
+    errors = []
+    questions = survey['questions']
+    given = {}
+    for answer in answers:
+        question_id = answer['question_id']
+        question = questions.get(question_id)
+        if question is None:
+            errors.append(f'Question {question_id} is not part of this survey.')
+            continue
+        if question_id in given:
+            errors.append(f'Question {question_id} is answered more than once.')
+            continue
+        given[question_id] = answer
+
+        selected = answer.get('selected_choices') or []
+        rating = answer.get('rating_value')
+        if question['type'] in CHOICE_TYPES:
+            if not set(selected) <= question['choices']:
+                errors.append(f'Question {question_id}: unknown choice.')
+            if question['type'] == 'single_choice' and len(selected) > 1:
+                errors.append(f'Question {question_id}: only one choice is allowed.')
+        elif selected:
+            errors.append(f'Question {question_id}: choices are only allowed on choice questions.')
+        if question['type'] == 'rating' and rating is not None and not 1 <= rating <= 5:
+            errors.append(f'Question {question_id}: rating must be between 1 and 5.')
+
+    for question_id, question in questions.items():
+        if not question['required']:
+            continue
+        answer = given.get(question_id, {})
+        if question['type'] in CHOICE_TYPES:
+            # "Other" answers carry text instead of a selected choice
+            answered = answer.get('selected_choices') or (answer.get('text_answer') or '').strip()
+        elif question['type'] == 'rating':
+            answered = answer.get('rating_value') is not None
+        else:
+            answered = (answer.get('text_answer') or '').strip()
+        if not answered:
+            errors.append(f'Question {question_id} is required.')
+    return errors
+
+
+def completion_state(user, survey_ids):
+    """``{survey_id: {'count', 'last_at'}}`` for the user's completed responses."""
+    return {
+        row['survey_id']: {'count': row['count'], 'last_at': row['last_at']}
+        for row in SurveyResponse.objects.filter(
+            user=user, survey_id__in=survey_ids, completed_at__isnull=False,
+        ).values('survey_id').annotate(count=Count('id'), last_at=Max('completed_at')).order_by()
+    }
+
+
+def lock_message(survey, state, completed_at, cooldown_days):
+    """Same rules as ``Survey.get_sequence_lock_info`` and the cooldown check, evaluated in memory."""
+    current = state.get(survey['id'], {})
+    current_count = current.get('count', 0)
+    for survey_id, name, level in survey['sequence']:
+        if survey_id == survey['id']:
+            break
+        previous = state.get(survey_id, {})
+        if previous.get('count', 0) <= current_count:
+            if current_count > 0:
+                return f"Retake '{name}' (Level {level}) first"
+            return f"Complete '{name}' (Level {level}) to unlock"
+        last_at = previous.get('last_at')
+        if last_at and completed_at >= last_at + timedelta(days=cooldown_days):
+            return f"Retake '{name}' (Level {level}) first to continue"
+
+    last_at = current.get('last_at')
+    if last_at and completed_at < last_at + timedelta(days=cooldown_days):
+        return f"You've already completed the survey '{survey['name']}' within the cooldown period."
+    return None
+
+
+def _build_answers(response, answers):
+    built = []
+    for answer in answers:
+        text = (answer.get('text_answer') or '').strip()
+        built.append((
+            Answer(
+                response=response,
+                question_id=answer['question_id'],
+                text_answer=text or None,
+                rating_value=answer.get('rating_value'),
+            ),
+            answer.get('selected_choices') or [],
+        ))
+    return built
+
+
+def _update_progress(user, completions, now):
+    """Add ``completions`` (``Counter`` of ``(category_id, level)``) to the user's progress rows."""
+    existing = {
+        (progress.category_id, progress.level): progress
+        for progress in UserSurveyProgress.objects.select_for_update().filter(
+            user=user, category_id__in={category_id for category_id, _ in completions},
+        )
+    }
+    changed, created = [], []
+    for (category_id, level), count in completions.items():
+        progress = existing.get((category_id, level))
+        if progress is None:
+            created.append(UserSurveyProgress(
+                user=user, category_id=category_id, level=level, completed_count=count,
+            ))
+        else:
+            progress.completed_count += count
+            progress.last_completed = now
+            changed.append(progress)
+    UserSurveyProgress.objects.bulk_update(changed, ['completed_count', 'last_completed'])
+    UserSurveyProgress.objects.bulk_create(created)
+
+
+def submit_responses(user, items):
+    """Validate and store a batch; returns one result dict per item, in order."""
+    now = timezone.now()
+    cooldown_days = getattr(settings, 'SURVEY_CONFIG', {}).get('DEFAULT_COOLDOWN_DAYS', 60)
+    oldest = now - timedelta(days=cooldown_days)
+    compiled = get_compiled_surveys(item['survey_id'] for item in items)
+    tracked = {
+        survey_id
+        for survey in compiled.values()
+        for survey_id, _, _ in survey['sequence']
+    }
+
+    results = []
+    valid = []
+    for index, item in enumerate(items):
+        result = {'index': index}
+        if item.get('client_id'):
+            result['client_id'] = item['client_id']
+        results.append(result)
+
+        survey = compiled.get(item['survey_id'])
+        completed_at = item.get('completed_at') or now
+        if survey is None:
+            errors = ['Survey not found or inactive.']
+        elif completed_at > now:
+            errors = ['completed_at cannot be in the future.']
+        elif completed_at < user.date_joined:
+            errors = ['completed_at cannot be before the account was created.']
+        elif completed_at <= oldest:
+            errors = [f'completed_at must be within the last {cooldown_days} days.']
+        else:
+            errors = validate_answers(survey, item['answers'])
+        if errors:
+            result.update(status='rejected', errors=errors)
+            continue
+        valid.append((result, survey, completed_at, item['answers']))
+
+    if not valid:
+        return results
+
+    with transaction.atomic():
+        # Serializes batches from the same user, so the state read below can't go stale before the writes
+        get_user_model().objects.select_for_update().filter(pk=user.pk).values_list('pk', flat=True).get()
+        state = completion_state(user, tracked)
+
+        accepted = []
+        for result, survey, completed_at, answers in valid:
+            message = lock_message(survey, state, completed_at, cooldown_days)
+            if message:
+                result.update(status='rejected', errors=[message])
+                continue
+            current = state.setdefault(survey['id'], {'count': 0, 'last_at': None})
+            current['count'] += 1
+            current['last_at'] = max(filter(None, (current['last_at'], completed_at)))
+            response = SurveyResponse(user=user, survey_id=survey['id'], completed_at=completed_at)
+            accepted.append((result, survey, response, _build_answers(response, answers)))
+
+        if not accepted:
+            return results
+
+        responses = [response for _, _, response, _ in accepted]
+        SurveyResponse.objects.bulk_create(responses)
+        # started_at is auto_now_add; the client only reports completion, so backdate the start with it
+        SurveyResponse.objects.filter(pk__in=[response.pk for response in responses]).update(
+            started_at=F('completed_at'),
+        )
+        # Answers pick up their response ids from the saved responses
+        answers = [pair for _, _, _, built in accepted for pair in built]
+        Answer.objects.bulk_create([answer for answer, _ in answers])
+        Selected = Answer.selected_choices.through
+        Selected.objects.bulk_create([
+            Selected(answer_id=answer.pk, choice_id=choice_id)
+            for answer, choice_ids in answers
+            for choice_id in choice_ids
+        ])
+        _update_progress(
+            user,
+            Counter((survey['category_id'], survey['level']) for _, survey, _, _ in accepted),
+            now,
+        )
+        for result, _, response, _ in accepted:
+            result.update(status='created', id=response.pk)
+
+    check_and_award_milestones(user)
+    return results
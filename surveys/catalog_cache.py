@@ -0,0 +1,130 @@
+"""Cached JSON fragments for the read-only catalog API.
+
+Every survey (with its category, questions and choices) and every category is
+serialized once and stored as rendered JSON bytes under a key that carries the
+catalog version. Any change to catalog content bumps that version (see
+``surveys.signals``), so all fragments are invalidated together.
+
+``CachedSerializationMixin`` builds list and detail responses from these
+fragments. A warm list page costs the page-of-ids query plus, when combined with
+``ConditionalGetMixin``, the validator query, whose row count is reused as the
+pagination count. Misses are fetched in one batch with the viewset's
+``get_fragment_queryset()`` prefetches and written back with ``set_many``.
+"""
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.http import Http404, HttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .fast_json import FastJSONRenderer, loads
+from .sparse_fields import is_sparse
+from .versioning import CATALOG, get_version
+
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+
+
+def fragment_key(model, pk, version):
+    return f'surveys:catalog:{model._meta.model_name}:{pk}:v{version}'
+
+
+def get_fragments(model, ids, serialize, fetch):
+    """Return ``{pk: json bytes}`` for ``ids``, serializing and caching the misses.
+
+    ``fetch(missing_ids)`` returns the missing objects (with whatever prefetching
+    the serializer needs); ``serialize(obj)`` returns the data to render.
+    """
+    version = get_version(CATALOG)
+    keys = {pk: fragment_key(model, pk, version) for pk in ids}
+    cached = cache.get_many(list(keys.values()))
+    fragments = {pk: cached[key] for pk, key in keys.items() if key in cached}
+
+    missing = [pk for pk in ids if pk not in fragments]
+    if missing:
+        renderer = FastJSONRenderer()
+        built = {obj.pk: renderer.render(serialize(obj)) for obj in fetch(missing)}
+        cache.set_many({keys[pk]: fragment for pk, fragment in built.items()}, FRAGMENT_TIMEOUT)
+        fragments.update(built)
+    return fragments
+
+
+class _KnownCountPaginator(Paginator):
+    """Paginator that trusts a row count computed elsewhere instead of running ``COUNT(*)``."""
+
+    def __init__(self, object_list, per_page, known_count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if known_count is not None:
+            self.__dict__['count'] = known_count
+
+
+class CachedSerializationMixin:
+    """List/retrieve read-only viewsets from cached per-object JSON fragments."""
+
+    def get_fragment_queryset(self):
+        """Queryset used to load objects whose fragments are not cached."""
+        return self.get_queryset()
+
+    def serialize_fragment(self, obj):
+        return self.get_serializer(obj).data
+
+    def _fragments(self, ids):
+        model = self.get_queryset().model
+        return get_fragments(
+            model, ids, self.serialize_fragment,
+            lambda missing: self.get_fragment_queryset().filter(pk__in=missing),
+        )
+
+    @staticmethod
+    def _join(ids, fragments):
+        return b','.join(fragments[pk] for pk in ids if pk in fragments)
+
+    def _render(self, body):
+        if isinstance(self.request.accepted_renderer, JSONRenderer):
+            return HttpResponse(body, content_type='application/json')
+        # Browsable API and other renderers get regular data
+        return Response(loads(body))
+
+    def list(self, request, *args, **kwargs):
+        if is_sparse(request):
+            # Sparse fieldsets are shaped per request and not worth caching
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        ids_queryset = queryset.values_list('pk', flat=True)
+
+        paginator = self.paginator
+        if paginator is None:
+            ids = list(ids_queryset)
+            fragments = self._fragments(ids)
+            return self._render(b'[' + self._join(ids, fragments) + b']')
+
+        known_count = getattr(self, 'conditional_total', None)
+        paginator.django_paginator_class = (
+            lambda object_list, per_page: _KnownCountPaginator(object_list, per_page, known_count)
+        )
+        ids = list(paginator.paginate_queryset(ids_queryset, request, view=self) or [])
+        fragments = self._fragments(ids)
+        envelope = FastJSONRenderer().render({
+            'count': paginator.page.paginator.count,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'results': [],
+        })
+        # Splice the cached fragments into the empty results list: b'...,"results":[]}'
+        return self._render(envelope[:-2] + self._join(ids, fragments) + b']}')
+
+    def retrieve(self, request, *args, **kwargs):
+        if is_sparse(request):
+            return super().retrieve(request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            pk = int(self.kwargs[lookup_url_kwarg])
+        except (TypeError, ValueError):
+            raise Http404
+        # ConditionalGetMixin has already counted the visible rows for this pk
+        visible = getattr(self, 'conditional_total', None)
+        if visible is None:
+            visible = self.filter_queryset(self.get_queryset()).filter(pk=pk).count()
+        fragment = self._fragments([pk]).get(pk) if visible else None
+        if fragment is None:
+            raise Http404
+        return self._render(fragment)
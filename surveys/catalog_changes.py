@@ -0,0 +1,258 @@
+"""Catalog change log for client delta sync.
+
+Every save or delete of a category, survey, question, choice, poll, poll
+question or poll choice appends ``CatalogChange`` rows: an upsert carrying the
+object's payload, or a delete. There is one row per country the object is
+visible in, found through the relations in ``COUNTRY_PATHS``. A survey question
+is visible in the countries of every survey it belongs to.
+
+When a change moves an object into or out of a country (a survey moved to a
+category in another country, a question added to or removed from a survey),
+its dependents are recorded for the countries they gained or lost. A client
+that has never seen those countries receives the questions and choices as well.
+Links that disappear only through a cascade (e.g. a deleted survey's question
+links) are not recorded separately. Clients drop questions whose surveys are
+all gone.
+
+``changes_since(since, country_id)`` is one query on the ``(country, id)``
+index. It collapses repeated changes of the same object into the latest one,
+and the ``id`` of the newest row served becomes the client's next ``since``.
+A page holds at most ``CATALOG_CHANGES['PAGE_SIZE']`` rows; ``has_more`` tells
+the client to ask again straight away.
+
+Ids come from a sequence and are assigned at insert, not at commit, so a
+transaction that commits late can make a lower id appear after a client has
+already moved past it. Rows are therefore served only once they are older
+than ``CATALOG_CHANGES['SAFETY_LAG_SECONDS']``, and a page stops at the first
+row that is still younger: every lower id was inserted earlier, and its
+transaction is assumed to have finished within the lag.
+``manage.py seed_catalog_changes`` records upserts for the whole current
+catalog, so that ``since=0`` is a full sync.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max, Prefetch
+from django.utils import timezone
+
+from .models import (
+    CatalogChange, Choice, Poll, PollChoice, PollQuestion, Question, Survey, SurveyCategory,
+)
+
+PREVIOUS_ATTR = '_catalog_countries'
+
+DEFAULT_CONFIG = {
+    'PAGE_SIZE': 1000,
+    'SAFETY_LAG_SECONDS': 30,
+}
+
+
+def get_config():
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'CATALOG_CHANGES', {}) or {})
+    return config
+
+
+def _category(obj):
+    return {
+        'id': obj.pk, 'name': obj.name, 'slug': obj.slug, 'description': obj.description,
+        'parent': obj.parent_id, 'order': obj.order,
+    }
+
+
+def _survey(obj):
+    return {
+        'id': obj.pk, 'name': obj.name, 'description': obj.description, 'is_active': obj.is_active,
+        'category': obj.category_id, 'level': obj.level,
+    }
+
+
+def _question(obj):
+    return {
+        'id': obj.pk, 'question_text': obj.question_text, 'question_type': obj.question_type,
+        'is_required': obj.is_required, 'order': obj.order,
+        'surveys': sorted(survey.pk for survey in obj.surveys.all()),
+    }
+
+
+def _choice(obj):
+    return {'id': obj.pk, 'question': obj.question_id, 'choice_text': obj.choice_text}
+
+
+def _poll(obj):
+    return {
+        'id': obj.pk, 'title': obj.title, 'description': obj.description, 'is_active': obj.is_active,
+        'order': obj.order,
+    }
+
+
+def _poll_question(obj):
+    return {
+        'id': obj.pk, 'poll': obj.poll_id, 'question_text': obj.question_text,
+        'question_type': obj.question_type, 'is_required': obj.is_required, 'order': obj.order,
+    }
+
+
+def _poll_choice(obj):
+    return {'id': obj.pk, 'question': obj.question_id, 'choice_text': obj.choice_text, 'order': obj.order}
+
+
+# model: (object type, payload, path to the country id, related managers whose visibility follows)
+TRACKED = {
+    SurveyCategory: (CatalogChange.TYPE_CATEGORY, _category, 'country_id', ('surveys',)),
+    Survey: (CatalogChange.TYPE_SURVEY, _survey, 'category__country_id', ('questions',)),
+    Question: (CatalogChange.TYPE_QUESTION, _question, 'surveys__category__country_id', ('choices',)),
+    Choice: (CatalogChange.TYPE_CHOICE, _choice, 'question__surveys__category__country_id', ()),
+    Poll: (CatalogChange.TYPE_POLL, _poll, 'country_id', ('questions',)),
+    PollQuestion: (CatalogChange.TYPE_POLL_QUESTION, _poll_question, 'poll__country_id', ('choices',)),
+    PollChoice: (CatalogChange.TYPE_POLL_CHOICE, _poll_choice, 'question__poll__country_id', ()),
+}
+COUNTRY_PATHS = {model: path for model, (_, _, path, _) in TRACKED.items()}
+
+
+def countries(instance):
+    """Ids of the countries ``instance`` is currently visible in, read from the database."""
+    if instance.pk is None:
+        return set()
+    path = COUNTRY_PATHS[type(instance)]
+    return set(
+        type(instance).objects.filter(pk=instance.pk).exclude(**{path: None})
+        .values_list(path, flat=True)
+    )
+
+
+def _rows(instance, upsert_in, delete_in):
+    object_type, payload, _, _ = TRACKED[type(instance)]
+    data = payload(instance) if upsert_in else None
+    rows = [
+        CatalogChange(country_id=country_id, object_type=object_type, object_id=instance.pk,
+                      action=CatalogChange.ACTION_UPSERT, data=data)
+        for country_id in sorted(upsert_in)
+    ]
+    rows += [
+        CatalogChange(country_id=country_id, object_type=object_type, object_id=instance.pk,
+                      action=CatalogChange.ACTION_DELETE)
+        for country_id in sorted(delete_in)
+    ]
+    return rows
+
+
+def _dependent_rows(instance, added, removed):
+    rows = []
+    if not added and not removed:
+        return rows
+    for accessor in TRACKED[type(instance)][3]:
+        for dependent in getattr(instance, accessor).all():
+            current = countries(dependent)
+            gained, lost = added & current, removed - current
+            rows += _rows(dependent, gained, lost)
+            rows += _dependent_rows(dependent, gained, lost)
+    return rows
+
+
+def remember_countries(instance):
+    """Store the countries ``instance`` is visible in before a save, delete or relation change."""
+    setattr(instance, PREVIOUS_ATTR, countries(instance))
+
+
+def record_upsert(instance):
+    """Log ``instance`` in its current countries, and deletes where it is no longer visible."""
+    previous = getattr(instance, PREVIOUS_ATTR, set())
+    current = countries(instance)
+    rows = _rows(instance, current, previous - current)
+    rows += _dependent_rows(instance, current - previous, previous - current)
+    CatalogChange.objects.bulk_create(rows)
+    setattr(instance, PREVIOUS_ATTR, current)
+
+
+def record_delete(instance):
+    CatalogChange.objects.bulk_create(_rows(instance, set(), getattr(instance, PREVIOUS_ATTR, set())))
+
+
+def record_upserts(model, ids, batch_size=500):
+    """Log upserts for ``model`` rows written without signals (``update()``, ``bulk_create()``).
+
+    Countries and question surveys are read per batch of ids, not per object.
+    """
+    path = COUNTRY_PATHS[model]
+    ids = sorted(set(ids))
+    rows = []
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start:start + batch_size]
+        visible = defaultdict(set)
+        for pk, country_id in (
+            model.objects.filter(pk__in=batch).exclude(**{path: None}).values_list('pk', path)
+        ):
+            visible[pk].add(country_id)
+        instances = model.objects.filter(pk__in=batch).order_by('pk')
+        if model is Question:
+            instances = instances.prefetch_related(Prefetch('surveys', queryset=Survey.objects.only('id')))
+        for instance in instances:
+            rows += _rows(instance, visible[instance.pk], set())
+    CatalogChange.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def record_questions(question_ids):
+    """Log upserts for questions changed with ``QuerySet.update()`` (which sends no signals)."""
+    return record_upserts(Question, question_ids)
+
+
+def latest_version():
+    return CatalogChange.objects.aggregate(latest=Max('id'))['latest'] or 0
+
+
+def changes_since(since, country_id, limit=None):
+    """
+    Upserts and deletes for ``country_id`` after version ``since``, latest change per object.
+
+    At most ``limit`` (default ``PAGE_SIZE``) log rows are read, and only rows
+    older than the safety lag; ``has_more`` is true when further rows could be
+    served right away.
+    """
+    config = get_config()
+    limit = limit or config['PAGE_SIZE']
+    settled = timezone.now() - timedelta(seconds=config['SAFETY_LAG_SECONDS'])
+    latest = {}
+    version = since
+    served = 0
+    has_more = False
+    for pk, object_type, object_id, action, data, created_at in (
+        CatalogChange.objects.filter(country_id=country_id, pk__gt=since)
+        .order_by('pk')
+        .values_list('pk', 'object_type', 'object_id', 'action', 'data', 'created_at')[:limit + 1]
+        .iterator()
+    ):
+        if created_at > settled:
+            break
+        if served == limit:
+            has_more = True
+            break
+        key = (object_type, object_id)
+        latest.pop(key, None)
+        latest[key] = (action, data)
+        version = pk
+        served += 1
+
+    upserts, deletes = [], []
+    for (object_type, object_id), (action, data) in latest.items():
+        if action == CatalogChange.ACTION_UPSERT:
+            upserts.append({'type': object_type, 'id': object_id, 'data': data})
+        else:
+            deletes.append({'type': object_type, 'id': object_id})
+    return {
+        'since': since, 'version': version, 'has_more': has_more, 'upserts': upserts, 'deletes': deletes,
+    }
+
+
+def seed(batch_size=500):
+    """Record an upsert for every catalog object in every country it is visible in."""
+    counts = {}
+    for model, (object_type, _, _, _) in TRACKED.items():
+        rows = []
+        for instance in model.objects.order_by('pk').iterator():
+            rows += _rows(instance, countries(instance), set())
+        CatalogChange.objects.bulk_create(rows, batch_size=batch_size)
+        counts[object_type] = len(rows)
+    return counts
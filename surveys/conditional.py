@@ -0,0 +1,139 @@
+"""Conditional GET (ETag / Last-Modified) support for content pages and catalog APIs.
+
+Validators are computed from cheap lookups: the ``updated_at`` of the object (or
+``Max('updated_at')`` plus a row count for lists) combined with the version
+counters from ``surveys.versioning``. The versions cover everything else a page
+shows (navigation categories, related journal categories, nested questions),
+so a 304 is only returned when nothing on the response can have changed.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+
+from .models import AboutUs, JournalPost, PrivacyPolicy
+from .page_cache import PAGES
+from .versioning import CATALOG, get_version
+
+STAMP_ATTR = '_surveys_conditional_stamp'
+
+
+def make_etag(*parts):
+    raw = ':'.join('' if part is None else str(part) for part in parts)
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def _user_key(request):
+    user = getattr(request, 'user', None)
+    return user.pk if user is not None and user.is_authenticated else 0
+
+
+def conditional_page(stamp_func):
+    """``condition()`` built from ``stamp_func(request, *args, **kwargs) -> (updated_at, extra)``.
+
+    The stamp is computed once per request and shared by the ETag and
+    Last-Modified functions. A ``None`` stamp (e.g. a missing object) disables
+    conditional handling so the view can produce its normal response. Pages
+    show the logged-in user's name, so the ETag includes the user id and
+    Last-Modified is only sent to anonymous visitors.
+    """
+    def get_stamp(request, *args, **kwargs):
+        if not hasattr(request, STAMP_ATTR):
+            setattr(request, STAMP_ATTR, stamp_func(request, *args, **kwargs))
+        return getattr(request, STAMP_ATTR)
+
+    def etag_func(request, *args, **kwargs):
+        updated_at, extra = get_stamp(request, *args, **kwargs)
+        if updated_at is None:
+            return None
+        return make_etag(_user_key(request), get_version(PAGES), updated_at.isoformat(), extra)
+
+    def last_modified_func(request, *args, **kwargs):
+        if _user_key(request):
+            return None
+        return get_stamp(request, *args, **kwargs)[0]
+
+    return condition(etag_func=etag_func, last_modified_func=last_modified_func)
+
+
+def journal_list_stamp(request, *args, **kwargs):
+    stamp = JournalPost.objects.filter(is_published=True).aggregate(
+        updated_at=Max('updated_at'),
+        total=Count('id'),
+    )
+    return stamp['updated_at'], stamp['total']
+
+
+def journal_detail_stamp(request, slug=None, **kwargs):
+    updated_at = JournalPost.objects.filter(is_published=True, slug=slug).values_list(
+        'updated_at', flat=True
+    ).first()
+    return updated_at, slug
+
+
+def privacy_policy_stamp(request, *args, **kwargs):
+    return PrivacyPolicy.objects.values_list('updated_at', flat=True).first(), None
+
+
+def about_us_stamp(request, *args, **kwargs):
+    return AboutUs.objects.values_list('updated_at', flat=True).first(), None
+
+
+class ConditionalGetMixin:
+    """Return 304 from read-only viewsets when the filtered rows are unchanged.
+
+    The validator is ``Max('updated_at')`` and ``Count('pk')`` over the filtered
+    queryset (narrowed to the requested object on ``retrieve``) plus the catalog
+    version, which changes whenever nested content such as questions changes.
+    """
+
+    conditional_updated_field = 'updated_at'
+    # Row count from the last validator query, reused by CachedSerializationMixin
+    conditional_total = None
+
+    def get_conditional_stamp(self):
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        stamp = queryset.aggregate(
+            updated_at=Max(self.conditional_updated_field),
+            total=Count('pk'),
+        )
+        self.conditional_total = stamp['total']
+        return stamp['updated_at'], stamp['total']
+
+    def get_conditional_validators(self, request):
+        updated_at, total = self.get_conditional_stamp()
+        etag = '"%s"' % make_etag(
+            get_version(CATALOG),
+            updated_at.isoformat() if updated_at else None,
+            total,
+            request.META.get('HTTP_ACCEPT', ''),
+        )
+        return etag, updated_at
+
+    def _conditional(self, request, handler, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return handler(request, *args, **kwargs)
+
+        etag, updated_at = self.get_conditional_validators(request)
+        last_modified = int(updated_at.timestamp()) if updated_at else None
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(request, super().retrieve, *args, **kwargs)
@@ -0,0 +1,211 @@
+"""Demographic cross-tabulation of survey answers.
+
+``crosstab(survey, rows, columns, question=None, filters=None)`` counts
+respondents along any two dimensions:
+
+- ``country``, ``state``, ``city``: the respondent's profile
+- ``age_band``: bucketed from ``UserProfile.date_of_birth``
+- ``month``: month the response was completed
+- ``answer``: the answer to ``question``. This is the selected choice text
+  (one row per selected choice; answers without a selected choice count as
+  "Other"), the rating value, or the normalized free-text answer.
+
+Each dimension is an SQL expression over the response, its user and profile. A
+cross-tab is one grouped ``COUNT(DISTINCT response)`` query that returns only
+the non-empty cells, which NumPy pivots into a dense matrix with totals.
+``filters`` maps dimension names to the values to keep, and ``start``/``end``
+limit the completion dates.
+
+``get_crosstab`` caches results per (survey, catalog version, dimensions, filter
+hash) for ``SURVEY_ANALYTICS['CACHE_TIMEOUT']`` seconds.
+"""
+import hashlib
+import json
+from datetime import date
+
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, F, Value, When
+from django.db.models.functions import Cast, Coalesce, Lower, Trim, TruncMonth
+from django.utils import timezone
+
+import numpy as np
+
+from .analytics import get_config
+from .db_router import use_read_replica
+from .models import Answer, SurveyResponse
+from .versioning import get_version
+
+UNKNOWN = 'Unknown'
+OTHER = 'Other'
+
+# (label, minimum age), oldest first
+AGE_BANDS = (
+    ('65+', 65),
+    ('55-64', 55),
+    ('45-54', 45),
+    ('35-44', 35),
+    ('25-34', 25),
+    ('18-24', 18),
+    ('Under 18', 0),
+)
+
+CHOICE_TYPES = ('single_choice', 'multiple_choice')
+
+
+class CrosstabError(ValueError):
+    """Invalid dimensions or filters; the message is safe to show to the user."""
+
+
+def _years_ago(today, years):
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:
+        # 29 February in a non-leap target year
+        return today.replace(year=today.year - years, day=28)
+
+
+def age_band_expression(field, today):
+    whens = [When(**{f'{field}__isnull': True}, then=Value(UNKNOWN))]
+    whens += [
+        When(**{f'{field}__lte': _years_ago(today, minimum)}, then=Value(label))
+        for label, minimum in AGE_BANDS[:-1]
+    ]
+    return Case(*whens, default=Value(AGE_BANDS[-1][0]), output_field=CharField())
+
+
+def answer_expression(question):
+    if question.question_type in CHOICE_TYPES:
+        return Coalesce(F('selected_choices__choice_text'), Value(OTHER), output_field=CharField())
+    if question.question_type == 'rating':
+        return Cast('rating_value', CharField())
+    return Lower(Trim('text_answer'))
+
+
+def _dimension(name, prefix, question, today):
+    """SQL expression for dimension ``name``; ``prefix`` leads from the base model to the response."""
+    profile = f'{prefix}user__profile__'
+    if name == 'country':
+        return Coalesce(F(f'{profile}country__name'), Value(UNKNOWN), output_field=CharField())
+    if name in ('state', 'city'):
+        return Coalesce(F(f'{profile}{name}'), Value(UNKNOWN), output_field=CharField())
+    if name == 'age_band':
+        return age_band_expression(f'{profile}date_of_birth', today)
+    if name == 'month':
+        return TruncMonth(f'{prefix}completed_at')
+    if name == 'answer':
+        if question is None:
+            raise CrosstabError('The "answer" dimension needs a question.')
+        return answer_expression(question)
+    raise CrosstabError(f'Unknown dimension "{name}".')
+
+
+DIMENSIONS = ('answer', 'country', 'state', 'city', 'age_band', 'month')
+
+
+def _label(value):
+    if value is None or value == '':
+        return UNKNOWN
+    if isinstance(value, date):
+        return value.strftime('%Y-%m')
+    return str(value)
+
+
+def _ordered_labels(name, labels, question):
+    """Natural order for a dimension's labels: age bands youngest first, choices as defined."""
+    if name == 'age_band':
+        order = [label for label, _ in reversed(AGE_BANDS)] + [UNKNOWN]
+        return [label for label in order if label in labels]
+    if name == 'answer' and question.question_type in CHOICE_TYPES:
+        order = [choice.choice_text for choice in question.choices.all()] + [OTHER]
+        known = [label for label in order if label in labels]
+        return known + sorted(labels - set(known))
+    return sorted(labels, key=lambda label: (label == UNKNOWN, label))
+
+
+def crosstab(survey, rows, columns, question=None, filters=None, start=None, end=None):
+    """Respondent counts for ``rows`` x ``columns`` as a dense matrix with totals and row shares."""
+    if rows == columns:
+        raise CrosstabError('Pick two different dimensions.')
+    filters = filters or {}
+    if 'month' in filters:
+        raise CrosstabError('Limit months with start and end instead of a filter.')
+    if question is not None and not survey.questions.filter(pk=question.pk).exists():
+        raise CrosstabError('The question does not belong to this survey.')
+
+    today = timezone.localdate()
+    if question is not None:
+        base = Answer.objects.filter(response__survey=survey, question=question)
+        prefix, counted = 'response__', 'response_id'
+    else:
+        base = SurveyResponse.objects.filter(survey=survey)
+        prefix, counted = '', 'pk'
+
+    names = {rows, columns, *filters}
+    base = base.annotate(**{
+        f'dim_{name}': _dimension(name, prefix, question, today) for name in sorted(names)
+    })
+    for name, values in filters.items():
+        base = base.filter(**{f'dim_{name}__in': list(values)})
+    if start is not None:
+        base = base.filter(**{f'{prefix}completed_at__date__gte': start})
+    if end is not None:
+        base = base.filter(**{f'{prefix}completed_at__date__lte': end})
+
+    cells = [
+        (_label(row[f'dim_{rows}']), _label(row[f'dim_{columns}']), row['count'])
+        for row in base.values(f'dim_{rows}', f'dim_{columns}')
+        .annotate(count=Count(counted, distinct=True))
+        .order_by()
+    ]
+
+    row_labels = _ordered_labels(rows, {cell[0] for cell in cells}, question)
+    column_labels = _ordered_labels(columns, {cell[1] for cell in cells}, question)
+    row_index = {label: index for index, label in enumerate(row_labels)}
+    column_index = {label: index for index, label in enumerate(column_labels)}
+
+    matrix = np.zeros((len(row_labels), len(column_labels)), dtype=np.int64)
+    for row_label, column_label, count in cells:
+        # Different raw values can share a label (e.g. NULL and '' are both "Unknown")
+        matrix[row_index[row_label], column_index[column_label]] += count
+
+    row_totals = matrix.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = np.where(row_totals[:, None] > 0, matrix * 100.0 / row_totals[:, None], 0.0)
+
+    return {
+        'survey': survey.id,
+        'question': question.id if question is not None else None,
+        'rows': rows,
+        'columns': columns,
+        'row_labels': row_labels,
+        'column_labels': column_labels,
+        'counts': matrix.tolist(),
+        'row_percentages': np.round(shares, 1).tolist(),
+        'row_totals': row_totals.tolist(),
+        'column_totals': matrix.sum(axis=0).tolist(),
+        # With multi-select answers a respondent can appear in several cells
+        'total': int(matrix.sum()),
+        'generated_at': timezone.now().isoformat(),
+    }
+
+
+def crosstab_cache_key(survey, rows, columns, question=None, filters=None, start=None, end=None):
+    spec = json.dumps({
+        'filters': {name: sorted(map(str, values)) for name, values in (filters or {}).items()},
+        'start': start.isoformat() if start else None,
+        'end': end.isoformat() if end else None,
+    }, sort_keys=True)
+    digest = hashlib.md5(spec.encode('utf-8')).hexdigest()
+    question_id = question.id if question is not None else '-'
+    return f'surveys:crosstab:{survey.id}:v{get_version()}:{question_id}:{rows}:{columns}:{digest}'
+
+
+def get_crosstab(survey, rows, columns, question=None, filters=None, start=None, end=None, refresh=False):
+    """Cached ``crosstab``; ``refresh`` recomputes and re-caches."""
+    key = crosstab_cache_key(survey, rows, columns, question, filters, start, end)
+    result = None if refresh else cache.get(key)
+    if result is None:
+        with use_read_replica():
+            result = crosstab(survey, rows, columns, question, filters, start, end)
+        cache.set(key, result, get_config()['CACHE_TIMEOUT'])
+    return result
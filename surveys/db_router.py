@@ -0,0 +1,123 @@
+"""Read-replica routing.
+
+Reads are only sent to a replica when the current code path has opted in with
+``read_only_view`` / ``use_read_replica``; everything else stays on ``default``.
+``surveys.middleware.ReplicaPinningMiddleware`` keeps a client on the primary for a short window
+after it writes (``READ_REPLICA['PIN_SECONDS']``), so a completed survey or a
+lucky-draw play is visible on the very next page even if the replica lags.
+
+Replica aliases come from ``READ_REPLICA['ALIASES']``, or default to every
+``DATABASES`` alias starting with ``replica``. With no replicas configured the
+router is a no-op.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULT_CONFIG = {
+    'ALIASES': None,
+    'PIN_SECONDS': 10,
+    'PIN_COOKIE_NAME': 'primary_pin',
+}
+
+# Sessions are written on most authenticated requests and must always be read back consistently.
+# The database cache ('django_cache') holds the version counters: a lagging replica would hide a
+# bump, and cache fills on anonymous GETs must not pin the visitor to the primary.
+PRIMARY_ONLY_APPS = {'sessions', 'django_cache'}
+
+_read_only = ContextVar('surveys_read_only', default=False)
+_request_state = ContextVar('surveys_replica_request_state', default=None)
+
+
+def get_config():
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'READ_REPLICA', {}) or {})
+    return config
+
+
+def get_replica_aliases():
+    aliases = get_config()['ALIASES']
+    if aliases is None:
+        aliases = [alias for alias in settings.DATABASES if alias.startswith('replica')]
+    return list(aliases)
+
+
+def is_pinned_to_primary():
+    state = _request_state.get()
+    return bool(state and state['pinned'])
+
+
+@contextmanager
+def track_request_writes(pinned=False):
+    """Track writes for one request; a write pins the rest of the request to the primary."""
+    state = {'pinned': pinned, 'wrote': False}
+    token = _request_state.set(state)
+    try:
+        yield state
+    finally:
+        _request_state.reset(token)
+
+
+@contextmanager
+def use_read_replica():
+    """Allow reads inside the block to be served by a replica."""
+    token = _read_only.set(True)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+def read_only_view(view_func):
+    """Route the view's GET/HEAD reads to a replica.
+
+    Template responses are rendered inside the hint so that lazy querysets and
+    context processors are routed as well.
+    """
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+        with use_read_replica():
+            response = view_func(request, *args, **kwargs)
+            if callable(getattr(response, 'render', None)) and not response.is_rendered:
+                response.render()
+        return response
+
+    return _wrapped_view
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _read_only.get() or is_pinned_to_primary():
+            return None
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        # Reads inside a transaction must see its own uncommitted writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        aliases = get_replica_aliases()
+        return random.choice(aliases) if aliases else None
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            state['pinned'] = True
+            state['wrote'] = True
+        # Explicit: objects loaded from a replica must still be saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replica_aliases():
+            return False
+        return None
@@ -0,0 +1,298 @@
+"""Bulk import of survey questions from DOCX files.
+
+Each ``.docx`` file becomes a category in the chosen country, named after the
+file (``"HL.12 - Health.docx"`` becomes ``"Health"``). Every ``Section N:``
+heading becomes a survey in that category, and the lines that follow it are read
+as questions and options:
+
+- a line ending in ``?`` or starting with one of ``QUESTION_STARTERS`` is a
+  question, typed by ``detect_question_type``;
+- a line mentioning "open text" makes the current question a text question and
+  drops its options;
+- any other line (``*`` bullets included) is an option. Options are kept for
+  single-choice questions only.
+
+Questions are matched on their text across the whole catalog (through the
+indexed ``text_hash``, so whitespace differences don't matter), so importing a
+document again links the existing questions to its surveys instead of
+duplicating them; a question's type follows its last occurrence.
+
+``parse_document()`` works purely in memory. ``import_documents()`` then
+resolves existing rows with batched ``__in`` lookups and writes the rest with
+``bulk_create``/``bulk_update``, including the question/survey through table.
+Bulk writes send no signals, so the search index, catalog change log and
+catalog version are updated explicitly. ``manage.py import_survey_docx`` is the
+entry point; it skips files whose content is unchanged since their last import
+(see ``surveys.import_manifest``).
+"""
+import os
+import re
+from django.db import transaction
+from docx import Document
+
+from . import catalog_changes, search
+from .models import Choice, Question, Survey, SurveyCategory, question_text_hash
+from .signals import bump_catalog_version
+
+SECTION_REGEX = re.compile(r"(?:\d+\.\s*)?Section\s+\d+\s*:", re.IGNORECASE)
+CATEGORY_CLEAN_REGEX = re.compile(r"^[A-Za-z\.]+\d+\s*-\s*")
+OPEN_TEXT_REGEX = re.compile(r"open\s*text", re.IGNORECASE)
+
+QUESTION_STARTERS = (
+    "On a scale of",
+    "What ",
+    "How ",
+    "Which ",
+    "Do you ",
+    "Is there ",
+    "In one word",
+)
+
+# Ids per ``__in`` lookup and rows per bulk insert
+BATCH_SIZE = 500
+
+# Bump when parsing changes, so that incremental imports re-read every file
+IMPORTER_VERSION = 1
+
+
+def extract_category_name(filename):
+    name = os.path.splitext(filename)[0]
+    return CATEGORY_CLEAN_REGEX.sub("", name).strip()
+
+
+def is_question_line(text):
+    return text.endswith("?") or text.startswith(QUESTION_STARTERS)
+
+
+def detect_question_type(text):
+    if "On a scale of 1-10" in text:
+        return "rating"
+    if "Select up to" in text or "Select primary" in text:
+        return "multiple_choice"
+    return "single_choice"
+
+
+def clean_option(text):
+    return text.lstrip("*").strip()
+
+
+def document_lines(path):
+    """Non-blank, stripped lines of the paragraphs of the DOCX file at ``path``."""
+    for paragraph in Document(path).paragraphs:
+        for line in paragraph.text.split("\n"):
+            line = line.strip()
+            if line:
+                yield line
+
+
+def parse_lines(lines):
+    """
+    Sections of one document, in order.
+
+    Each section is ``{'name': heading, 'questions': [...]}`` and each question
+    ``{'text': ..., 'type': ..., 'options': [...]}``. Lines before the first
+    section heading are ignored.
+    """
+    sections = []
+    questions = None
+    question = None
+    for text in lines:
+        if SECTION_REGEX.match(text):
+            questions = []
+            sections.append({'name': text, 'questions': questions})
+            question = None
+            continue
+        if questions is None:
+            continue
+        if OPEN_TEXT_REGEX.search(text):
+            if question is not None:
+                question['type'] = 'text'
+                question['options'] = []
+            continue
+        if not text.startswith("*") and is_question_line(text):
+            question = {'text': text, 'type': detect_question_type(text), 'options': []}
+            questions.append(question)
+            continue
+        option = clean_option(text)
+        if question is not None and option:
+            question['options'].append(option)
+
+    for section in sections:
+        for question in section['questions']:
+            if question['type'] != 'single_choice':
+                question['options'] = []
+    return sections
+
+
+def parse_document(path):
+    filename = os.path.basename(path)
+    return {
+        'file': filename,
+        'category': extract_category_name(filename),
+        'sections': parse_lines(document_lines(path)),
+    }
+
+
+def document_report(document):
+    """The per-document entry of the import report."""
+    sections = {}
+    for section in document['sections']:
+        # A repeated heading restarts its count, as the report always has
+        sections[section['name']] = len(section['questions'])
+    return {
+        'file': document['file'],
+        'category': document['category'],
+        'sections': sections,
+        'total_questions': sum(len(section['questions']) for section in document['sections']),
+        'user_confirmed': True,
+        'status': 'committed',
+    }
+
+
+def _batches(values, batch_size):
+    values = list(values)
+    for start in range(0, len(values), batch_size):
+        yield values[start:start + batch_size]
+
+
+def _existing(queryset, field, values, key, batch_size):
+    """Map ``key(row)`` to the oldest row whose ``field`` is in ``values``."""
+    found = {}
+    for batch in _batches(values, batch_size):
+        for row in queryset.filter(**{f'{field}__in': batch}).order_by('-pk'):
+            found[key(row)] = row
+    return found
+
+
+def _existing_pairs(queryset, field, values, pair, batch_size):
+    found = set()
+    for batch in _batches(values, batch_size):
+        found.update(queryset.filter(**{f'{field}__in': batch}).values_list(*pair))
+    return found
+
+
+@transaction.atomic
+def import_documents(country, documents, batch_size=BATCH_SIZE):
+    """
+    Write parsed ``documents`` into ``country``'s catalog.
+
+    Returns ``(counts, object_ids)``: the number of rows written per kind, and
+    for each document the ids of its category, surveys and questions.
+
+    Existing categories (by name in the country), surveys (by name in the
+    category), questions (by text), survey links and choices (by text within the
+    question) are reused.
+    """
+    counts = {}
+
+    # One category per document, so these are saved individually: save() assigns the unique slug
+    names = {document['category'] for document in documents}
+    categories = _existing(
+        SurveyCategory.objects.filter(country=country), 'name', names, lambda row: row.name, batch_size,
+    )
+    missing = sorted(names - categories.keys())
+    for name in missing:
+        categories[name] = SurveyCategory.objects.create(name=name, country=country, order=1)
+    counts['categories'] = len(missing)
+
+    wanted_surveys = {}
+    for document in documents:
+        category = categories[document['category']]
+        for section in document['sections']:
+            wanted_surveys.setdefault((category.pk, section['name']), category)
+    surveys = _existing(
+        Survey.objects.filter(category__in=list(categories.values())), 'name',
+        {name for _, name in wanted_surveys}, lambda row: (row.category_id, row.name), batch_size,
+    )
+    new_surveys = [
+        Survey(name=name, category=category, is_active=True)
+        for (category_id, name), category in wanted_surveys.items()
+        if (category_id, name) not in surveys
+    ]
+    Survey.objects.bulk_create(new_surveys, batch_size=batch_size)
+    surveys.update({(survey.category_id, survey.name): survey for survey in new_surveys})
+    counts['surveys'] = len(new_surveys)
+
+    # Questions match on the hash of their normalized text; a new question keeps its first spelling
+    texts, types = {}, {}
+    for document in documents:
+        for section in document['sections']:
+            for question in section['questions']:
+                key = question_text_hash(question['text'])
+                texts.setdefault(key, question['text'])
+                types[key] = question['type']
+    questions = _existing(Question.objects.all(), 'text_hash', types, lambda row: row.text_hash, batch_size)
+    retyped = [question for key, question in questions.items() if question.question_type != types[key]]
+    for question in retyped:
+        question.question_type = types[question.text_hash]
+    Question.objects.bulk_update(retyped, ['question_type'], batch_size=batch_size)
+    new_questions = [
+        Question(question_text=texts[key], text_hash=key, question_type=question_type, is_required=True)
+        for key, question_type in types.items() if key not in questions
+    ]
+    Question.objects.bulk_create(new_questions, batch_size=batch_size)
+    questions.update({question.text_hash: question for question in new_questions})
+    counts['questions'] = len(new_questions)
+    counts['retyped'] = len(retyped)
+
+    links, choices = {}, {}
+    for document in documents:
+        category = categories[document['category']]
+        for section in document['sections']:
+            survey = surveys[(category.pk, section['name'])]
+            for parsed in section['questions']:
+                question = questions[question_text_hash(parsed['text'])]
+                links[(question.pk, survey.pk)] = None
+                for option in parsed['options']:
+                    choices[(question.pk, option)] = None
+    question_ids = {question.pk for question in questions.values()}
+
+    Link = Question.surveys.through
+    linked = _existing_pairs(Link.objects.all(), 'question_id', question_ids, ('question_id', 'survey_id'), batch_size)
+    new_links = [
+        Link(question_id=question_id, survey_id=survey_id)
+        for question_id, survey_id in links if (question_id, survey_id) not in linked
+    ]
+    Link.objects.bulk_create(new_links, batch_size=batch_size)
+    counts['links'] = len(new_links)
+
+    known = _existing_pairs(
+        Choice.objects.all(), 'question_id', {question_id for question_id, _ in choices},
+        ('question_id', 'choice_text'), batch_size,
+    )
+    new_choices = [
+        Choice(question_id=question_id, choice_text=text)
+        for question_id, text in choices if (question_id, text) not in known
+    ]
+    Choice.objects.bulk_create(new_choices, batch_size=batch_size)
+    counts['choices'] = len(new_choices)
+
+    # Bulk writes send no signals: log, reindex and invalidate for everything written above
+    relinked = {link.question_id for link in new_links}
+    changed_questions = relinked | {question.pk for question in retyped + new_questions}
+    if new_surveys or changed_questions or new_choices:
+        survey_ids = [survey.pk for survey in new_surveys]
+        # Questions that gained a survey may have gained a country, and their choices with them
+        choice_ids = {choice.pk for choice in new_choices}
+        for batch in _batches(relinked, batch_size):
+            choice_ids.update(Choice.objects.filter(question_id__in=batch).values_list('pk', flat=True))
+        catalog_changes.record_upserts(Survey, survey_ids, batch_size)
+        catalog_changes.record_upserts(Question, changed_questions, batch_size)
+        catalog_changes.record_upserts(Choice, choice_ids, batch_size)
+        search.reindex_surveys(survey_ids)
+        search.reindex_questions(changed_questions)
+        bump_catalog_version(Question)
+
+    object_ids = []
+    for document in documents:
+        category = categories[document['category']]
+        document_surveys, document_questions = set(), set()
+        for section in document['sections']:
+            document_surveys.add(surveys[(category.pk, section['name'])].pk)
+            document_questions.update(
+                questions[question_text_hash(parsed['text'])].pk for parsed in section['questions']
+            )
+        object_ids.append({
+            'category': category.pk, 'surveys': sorted(document_surveys), 'questions': sorted(document_questions),
+        })
+    return counts, object_ids
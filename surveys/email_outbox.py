@@ -0,0 +1,182 @@
+"""Transactional email outbox.
+
+``queue_email()`` records a rendered message as an ``EmailOutbox`` row once the
+current transaction commits, or straight away outside a transaction. Work that
+rolls back therefore never emails anyone, and the request never talks to SMTP.
+All ``surveys.emails`` functions go through it.
+
+``manage.py run_email_worker`` drains the outbox with ``send_pending()``:
+
+- Due rows are claimed in a short transaction: ``SELECT ... FOR UPDATE SKIP
+  LOCKED`` picks them and they are marked ``sending``, so several workers can
+  run side by side without sending a message twice. The SMTP calls happen after
+  that transaction commits, so no row lock is held while the backend is slow.
+- A claim lasts ``CLAIM_SECONDS``. A worker renews the claim on the rows it
+  has not sent yet every ``CLAIM_SECONDS / 2``, so a slow SMTP server does not
+  let another worker take them over; rows still ``sending`` after their claim
+  expired (their worker died mid-batch) are claimed again.
+- Each batch opens one connection to the email backend and reuses it for every
+  message; the outcomes are written back in one more short transaction.
+- A failed send is retried with exponential backoff
+  (``RETRY_BASE_SECONDS * 2 ** (attempts - 1)``, capped at
+  ``RETRY_MAX_SECONDS``) until ``MAX_ATTEMPTS``; then the row is marked failed.
+- ``purge_sent()``, run by the worker, deletes sent rows older than
+  ``RETENTION_DAYS``.
+
+Settings live in ``EMAIL_OUTBOX``.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 6,
+    'RETRY_BASE_SECONDS': 60,
+    'RETRY_MAX_SECONDS': 60 * 60,
+    'POLL_INTERVAL': 5,
+    'CLAIM_SECONDS': 5 * 60,
+    'RETENTION_DAYS': 30,
+}
+
+
+def get_config():
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'EMAIL_OUTBOX', {}) or {})
+    return config
+
+
+def queue_email(subject, body, recipients, html_body='', from_email=None):
+    """Queue an email for the worker once the current transaction commits."""
+    message = EmailOutbox(
+        subject=subject,
+        body=body,
+        html_body=html_body or '',
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(recipients),
+    )
+    transaction.on_commit(message.save)
+    return message
+
+
+def retry_delay(attempts, config=None):
+    config = config or get_config()
+    seconds = config['RETRY_BASE_SECONDS'] * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, config['RETRY_MAX_SECONDS']))
+
+
+def _build_message(row, connection):
+    message = EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body,
+        from_email=row.from_email,
+        to=row.to,
+        connection=connection,
+    )
+    if row.html_body:
+        message.attach_alternative(row.html_body, 'text/html')
+    return message
+
+
+def _failed(row, error, now, config):
+    row.attempts += 1
+    row.last_error = str(error)
+    if row.attempts >= config['MAX_ATTEMPTS']:
+        row.status = EmailOutbox.STATUS_FAILED
+        logger.error('Giving up on outbox email %s after %s attempts: %s', row.pk, row.attempts, error)
+    else:
+        # A row re-claimed from a dead worker was loaded as 'sending'
+        row.status = EmailOutbox.STATUS_PENDING
+        row.next_attempt_at = now + retry_delay(row.attempts, config)
+
+
+def claim_due(batch_size, now, config):
+    """Mark up to ``batch_size`` due rows as ``sending`` and return them."""
+    with transaction.atomic():
+        rows = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status__in=[EmailOutbox.STATUS_PENDING, EmailOutbox.STATUS_SENDING], next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if rows:
+            # While claimed, next_attempt_at is the claim's expiry
+            EmailOutbox.objects.filter(pk__in=[row.pk for row in rows]).update(
+                status=EmailOutbox.STATUS_SENDING,
+                next_attempt_at=now + timedelta(seconds=config['CLAIM_SECONDS']),
+            )
+    return rows
+
+
+def renew_claim(rows, config):
+    """Push back the claim expiry of ``rows`` that this worker has not sent yet."""
+    return EmailOutbox.objects.filter(
+        pk__in=[row.pk for row in rows], status=EmailOutbox.STATUS_SENDING,
+    ).update(next_attempt_at=timezone.now() + timedelta(seconds=config['CLAIM_SECONDS']))
+
+
+def send_pending(batch_size=None):
+    """
+    Claim and send one batch of due emails; returns ``(sent, failed)`` counts.
+
+    ``failed`` counts send attempts that raised, whether or not the row will be
+    retried.
+    """
+    config = get_config()
+    batch_size = batch_size or config['BATCH_SIZE']
+    now = timezone.now()
+    sent = failed = 0
+    rows = claim_due(batch_size, now, config)
+    if not rows:
+        return sent, failed
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        logger.warning('Could not connect to the email backend: %s', exc)
+        for row in rows:
+            _failed(row, exc, now, config)
+        failed = len(rows)
+    else:
+        renew_at = time.monotonic() + config['CLAIM_SECONDS'] / 2
+        try:
+            for position, row in enumerate(rows):
+                if time.monotonic() >= renew_at:
+                    renew_claim(rows[position:], config)
+                    renew_at = time.monotonic() + config['CLAIM_SECONDS'] / 2
+                try:
+                    _build_message(row, connection).send()
+                except Exception as exc:
+                    _failed(row, exc, now, config)
+                    failed += 1
+                else:
+                    row.status = EmailOutbox.STATUS_SENT
+                    row.attempts += 1
+                    row.sent_at = timezone.now()
+                    row.last_error = ''
+                    sent += 1
+        finally:
+            connection.close()
+
+    EmailOutbox.objects.bulk_update(
+        rows, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'],
+    )
+    return sent, failed
+
+
+def purge_sent(retention_days=None):
+    """Delete sent rows older than ``retention_days`` (default ``RETENTION_DAYS``); returns the count."""
+    if retention_days is None:
+        retention_days = get_config()['RETENTION_DAYS']
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted, _ = EmailOutbox.objects.filter(status=EmailOutbox.STATUS_SENT, sent_at__lt=cutoff).delete()
+    return deleted
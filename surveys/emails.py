@@ -1,18 +1,19 @@
+"""Notification emails.
+
+Each function renders its message straight away and queues it in the
+``EmailOutbox`` once the caller's transaction commits, so no request waits on
+SMTP. ``manage.py run_email_worker`` sends the queue (see
+``surveys.email_outbox``).
+"""
 from django.template.loader import render_to_string
-from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
 
+from .email_outbox import queue_email
+
 
 def _send_html_email(subject, body, template_name, context, recipients):
-    msg = EmailMultiAlternatives(
-        subject=subject,
-        body=body,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=recipients,
-    )
     html_content = render_to_string(template_name, context)
-    msg.attach_alternative(html_content, "text/html")
-    msg.send()
+    queue_email(subject, body, recipients, html_body=html_content)
 
 def send_survey_completion_email(user, survey):
     """Send email notification when a user completes a survey"""
@@ -28,16 +29,12 @@ def send_survey_completion_email(user, survey):
     # Render HTML email
     html_content = render_to_string('emails/survey_completion.html', context)
     
-    # Create email message
-    msg = EmailMultiAlternatives(
-        subject=subject,
-        body=f'Thank you for completing the survey: {survey.name}.',
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[user.email],
+    queue_email(
+        subject,
+        f'Thank you for completing the survey: {survey.name}.',
+        [user.email],
+        html_body=html_content,
     )
-    
-    msg.attach_alternative(html_content, "text/html")
-    msg.send()
 
 def send_lucky_draw_entry_email(user, entry):
     """Send email confirmation for lucky draw entry"""
@@ -53,16 +50,12 @@ def send_lucky_draw_entry_email(user, entry):
     # Render HTML email
     html_content = render_to_string('emails/lucky_draw_entry.html', context)
     
-    # Create email message
-    msg = EmailMultiAlternatives(
-        subject=subject,
-        body=f'Your lucky draw entry has been recorded. Your number is: {entry.guessed_number}.',
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[user.email],
+    queue_email(
+        subject,
+        f'Your lucky draw entry has been recorded. Your number is: {entry.guessed_number}.',
+        [user.email],
+        html_body=html_content,
     )
-    
-    msg.attach_alternative(html_content, "text/html")
-    msg.send()
 
 def send_lucky_draw_winner_email(entry):
     """Send email to lucky draw winner"""
@@ -91,17 +84,13 @@ def send_lucky_draw_winner_email(entry):
 
     html_content = render_to_string('emails/lucky_draw_winner.html', context)
 
-    msg = EmailMultiAlternatives(
-        subject=subject,
-        body=plain_body,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[entry.user.email],
+    queue_email(
+        subject,
+        plain_body,
+        [entry.user.email],
+        html_body=html_content,
     )
 
-    msg.attach_alternative(html_content, "text/html")
-    result = msg.send()
-    print(f"Winner email sent: {result} (to {entry.user.email})")
-
 def send_lucky_draw_winner_admin_notification(entry):
     """Send email notification to admin when a user wins the lucky draw"""
     subject = f'🎉 Lucky Draw Winner Alert: {entry.user.get_full_name() or entry.user.username} won the draw {entry.created_at.strftime("%B %Y")}!'
@@ -117,17 +106,12 @@ def send_lucky_draw_winner_admin_notification(entry):
     # Render HTML email for admin
     html_content = render_to_string('emails/lucky_draw_winner_admin.html', context)
     
-    # Create email message for admin
-    msg = EmailMultiAlternatives(
-        subject=subject,
-        body=f'Lucky Draw Winner Alert: {entry.user.get_full_name() or entry.user.username} has won the lucky draw on {entry.created_at.strftime("%B %Y")}. Winning number: {entry.guessed_number}',
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[getattr(settings, 'ADMIN_EMAIL', settings.DEFAULT_FROM_EMAIL)],
+    queue_email(
+        subject,
+        f'Lucky Draw Winner Alert: {entry.user.get_full_name() or entry.user.username} has won the lucky draw on {entry.created_at.strftime("%B %Y")}. Winning number: {entry.guessed_number}',
+        [getattr(settings, 'ADMIN_EMAIL', settings.DEFAULT_FROM_EMAIL)],
+        html_body=html_content,
     )
-    
-    msg.attach_alternative(html_content, "text/html")
-    result = msg.send()
-    print(f"Admin notification email sent: {result} (to {getattr(settings, 'ADMIN_EMAIL', settings.DEFAULT_FROM_EMAIL)})")
 
 
 def send_milestone_achievement_email(user, achievement):
@@ -154,14 +138,7 @@ def send_milestone_achievement_email(user, achievement):
         f"{getattr(settings, 'SITE_NAME', 'Sudraw')} Team"
     )
 
-    msg = EmailMultiAlternatives(
-        subject=subject,
-        body=body,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[user.email],
-    )
-    msg.attach_alternative(html_content, "text/html")
-    msg.send()
+    queue_email(subject, body, [user.email], html_body=html_content)
 
 
 def send_milestone_achievement_admin_notification(user, achievement):
@@ -194,14 +171,7 @@ def send_milestone_achievement_admin_notification(user, achievement):
         f"Wallet rewards are credited automatically.\n"
     )
 
-    msg = EmailMultiAlternatives(
-        subject=subject,
-        body=body,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[admin_email],
-    )
-    msg.attach_alternative(html_content, "text/html")
-    msg.send()
+    queue_email(subject, body, [admin_email], html_body=html_content)
 
 
 def send_withdrawal_request_admin_notification(withdrawal):
@@ -275,3 +245,42 @@ def send_withdrawal_request_status_email(withdrawal):
         context,
         [recipient],
     )
+
+
+def send_email_verification_email(user, verification_url, welcome=True):
+    """Send the email verification link; ``welcome`` adds the thank-you for registering."""
+    name = user.first_name or user.username
+    subject = 'Verify Your Email - Sudraw'
+    welcome_line = 'Thank you for registering with Sudraw!\n\n' if welcome else ''
+    body = (
+        f"Hello {name},\n\n"
+        f"{welcome_line}"
+        f"Please verify your email address by clicking the link below:\n\n"
+        f"{verification_url}\n\n"
+        f"This link will expire in 24 hours.\n\n"
+        f"If you didn't create this account, please ignore this email.\n\n"
+        f"Best regards,\n"
+        f"Sudraw Team\n"
+    )
+    # Rendered from a template so the user's name is autoescaped in the HTML part
+    html_content = render_to_string('emails/email_verification.html', {
+        'name': name,
+        'verification_url': verification_url,
+        'welcome': welcome,
+        'site_name': settings.SITE_NAME,
+        'site_url': settings.SITE_URL,
+    })
+    queue_email(subject, body, [user.email], html_body=html_content)
+
+
+def send_login_otp_email(user, email, code):
+    """Send a one-time login code to ``email``."""
+    body = (
+        f"Hello {user.first_name or user.username},\n\n"
+        f"Your login code is: {code}\n\n"
+        f"This code will expire in 10 minutes.\n\n"
+        f"If you didn't request this code, please ignore this email.\n\n"
+        f"Best regards,\n"
+        f"Sudraw Team\n"
+    )
+    queue_email('Your Login Code - Sudraw', body, [email])
@@ -0,0 +1,245 @@
+"""Streaming export of survey answers.
+
+Exports produce one row per answer, i.e. per (response, question) pair, with the
+survey, category, country, respondent, question and the answer itself. Selected
+choice texts are aggregated in SQL by a correlated subquery, so rows come out of
+the database fully assembled. Rows are read with ``.iterator()``, which uses a
+server-side cursor on Postgres, and are encoded in batches. Memory use therefore
+stays flat no matter how many answers are exported.
+
+The same generators back the admin export (``StreamingHttpResponse``) and
+``manage.py export_responses``. Formats: CSV, NDJSON and Parquet. Parquet needs
+the optional ``pyarrow`` package.
+"""
+import csv
+import io
+from datetime import datetime, time, timedelta
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import router
+from django.db.models import Aggregate, OuterRef, Subquery, TextField
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .db_router import use_read_replica
+from .fast_json import dumps
+from .models import Answer
+
+# (header, lookup) for each exported column, in output order
+COLUMNS = (
+    ('response_id', 'response_id'),
+    ('survey_id', 'response__survey_id'),
+    ('survey', 'response__survey__name'),
+    ('category', 'response__survey__category__name'),
+    ('country', 'response__survey__category__country__name'),
+    ('user_id', 'response__user_id'),
+    ('username', 'response__user__username'),
+    ('started_at', 'response__started_at'),
+    ('completed_at', 'response__completed_at'),
+    ('question_id', 'question_id'),
+    ('question', 'question__question_text'),
+    ('question_type', 'question__question_type'),
+    ('text_answer', 'text_answer'),
+    ('rating', 'rating_value'),
+    ('choices', 'choices'),
+)
+HEADERS = tuple(header for header, _ in COLUMNS)
+
+CHOICE_SEPARATOR = '; '
+
+# Rows fetched per round trip and encoded per yielded chunk
+BATCH_SIZE = 2000
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+FORMAT_CHOICES = (
+    ('csv', 'CSV'),
+    ('ndjson', 'NDJSON (one JSON object per line)'),
+    ('parquet', 'Parquet'),
+)
+
+
+class ChoiceTexts(Aggregate):
+    """Concatenate choice texts: ``STRING_AGG`` on Postgres, ``GROUP_CONCAT`` on SQLite."""
+    function = 'STRING_AGG'
+    template = f"%(function)s(%(expressions)s, '{CHOICE_SEPARATOR}')"
+    output_field = TextField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function='GROUP_CONCAT', **extra_context)
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def export_queryset(survey=None, category=None, country=None, start=None, end=None, responses=None, using=None):
+    """Answer rows (tuples in ``HEADERS`` order) matching the filters.
+
+    ``start`` and ``end`` are dates, inclusive, matched against the response's
+    ``completed_at``. ``responses`` narrows the export to a ``SurveyResponse``
+    queryset, as selected in the admin.
+    """
+    filters = {}
+    if survey is not None:
+        filters['response__survey'] = survey
+    if category is not None:
+        filters['response__survey__category'] = category
+    if country is not None:
+        filters['response__survey__category__country'] = country
+    if start is not None:
+        filters['response__completed_at__gte'] = _day_start(start)
+    if end is not None:
+        filters['response__completed_at__lt'] = _day_start(end + timedelta(days=1))
+
+    if using is None:
+        with use_read_replica():
+            using = router.db_for_read(Answer)
+
+    choices = (
+        Answer.selected_choices.through.objects
+        .filter(answer_id=OuterRef('pk'))
+        .order_by()
+        .values('answer_id')
+        .annotate(texts=ChoiceTexts('choice__choice_text'))
+        .values('texts')
+    )
+    queryset = Answer.objects.using(using).filter(**filters)
+    if responses is not None:
+        queryset = queryset.filter(response__in=responses.values('pk'))
+    return (
+        queryset
+        .annotate(choices=Subquery(choices, output_field=TextField()))
+        # Answers are written response by response, so primary key order keeps them grouped
+        .order_by('pk')
+        .values_list(*(lookup for _, lookup in COLUMNS))
+    )
+
+
+def iter_batches(queryset, batch_size=BATCH_SIZE):
+    batch = []
+    for row in queryset.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def stream_csv(queryset, batch_size=BATCH_SIZE):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADERS)
+    for batch in iter_batches(queryset, batch_size):
+        writer.writerows([_text(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def stream_ndjson(queryset, batch_size=BATCH_SIZE):
+    for batch in iter_batches(queryset, batch_size):
+        lines = (
+            dumps({header: _json_value(value) for header, value in zip(HEADERS, row)})
+            for row in batch
+        )
+        yield b'\n'.join(lines) + b'\n'
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to the generator."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        # The Parquet writer records column chunk offsets from tell()
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_parquet(queryset, batch_size=BATCH_SIZE):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImproperlyConfigured('Parquet export requires the pyarrow package.')
+
+    timestamp = pa.timestamp('us', tz='UTC')
+    types = {
+        'response_id': pa.int64(), 'survey_id': pa.int64(), 'user_id': pa.int64(),
+        'question_id': pa.int64(), 'rating': pa.int16(),
+        'started_at': timestamp, 'completed_at': timestamp,
+    }
+    schema = pa.schema([(header, types.get(header, pa.string())) for header in HEADERS])
+
+    def generate():
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, schema) as writer:
+            for batch in iter_batches(queryset, batch_size):
+                columns = zip(*batch)
+                writer.write_batch(pa.record_batch(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                    schema=schema,
+                ))
+                yield sink.drain()
+        yield sink.drain()
+
+    return generate()
+
+
+STREAMERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+    'parquet': stream_parquet,
+}
+
+
+def stream_export(export_format, queryset, batch_size=BATCH_SIZE):
+    """Return an iterator of encoded chunks for ``queryset`` in ``export_format``."""
+    try:
+        streamer = STREAMERS[export_format]
+    except KeyError:
+        raise ValueError(f'Unknown export format: {export_format}')
+    return streamer(queryset, batch_size)
+
+
+def export_response(export_format, queryset, filename='survey-answers'):
+    """``StreamingHttpResponse`` that downloads ``queryset`` as ``<filename>.<format>``."""
+    response = StreamingHttpResponse(
+        stream_export(export_format, queryset),
+        content_type=CONTENT_TYPES[export_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
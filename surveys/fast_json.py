@@ -0,0 +1,119 @@
+"""Fast JSON encoding for API and AJAX responses.
+
+``dumps()`` and ``loads()`` use orjson when it is installed and the stdlib
+``json`` module otherwise. ``FAST_JSON['BACKEND']`` can pin either one, which is
+useful when comparing them. Output follows DRF's ``JSONRenderer`` with its
+default ``COMPACT_JSON``/``UNICODE_JSON``/``STRICT_JSON`` settings: compact
+separators, non-ASCII left unescaped except U+2028/U+2029 (escaped, as DRF
+does, so the JSON can be embedded in a ``<script>``), and for the plain values
+serializers produce the bytes are identical. The one difference is non-finite
+floats: DRF and the stdlib backend raise ``ValueError`` for NaN and infinity,
+while orjson writes them as ``null``. Django's own ``JsonResponse`` differs
+more (``', '``/``': '`` separators, ``ensure_ascii=True``); clients decode
+both to the same values. Other types are formatted by ``DjangoJSONEncoder``:
+dates and times, ``Decimal`` (as strings, so wallet amounts keep their
+precision), UUIDs and lazy translation strings.
+
+- ``FastJsonResponse`` takes the same arguments as ``JsonResponse``.
+- ``FastJSONRenderer`` and ``FastJSONParser`` are the DRF defaults (see
+  ``REST_FRAMEWORK``). The renderer defers to DRF's own renderer when indented
+  output is requested, e.g. by the browsable API.
+
+``manage.py benchmark_json`` compares the backends on representative payloads.
+"""
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+DEFAULT_CONFIG = {
+    'BACKEND': 'auto',  # 'auto' (orjson when installed), 'orjson' or 'json'
+}
+
+_encoder = DjangoJSONEncoder()
+
+if orjson is not None:
+    ORJSON_OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME  # formatted by DjangoJSONEncoder, as the stdlib backend does
+        | orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+
+# UTF-8 line/paragraph separators and the escapes DRF's JSONRenderer writes for them
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+def get_config():
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'FAST_JSON', {}) or {})
+    return config
+
+
+def backend():
+    """Name of the encoder in use: ``'orjson'`` or ``'json'``."""
+    choice = get_config()['BACKEND']
+    if choice == 'json' or orjson is None:
+        return 'json'
+    return 'orjson'
+
+
+def dumps(obj, backend_name=None):
+    """Serialize ``obj`` to compact UTF-8 JSON bytes."""
+    if (backend_name or backend()) == 'orjson':
+        data = orjson.dumps(obj, default=_encoder.default, option=ORJSON_OPTIONS)
+    else:
+        data = json.dumps(
+            obj, cls=DjangoJSONEncoder, separators=(',', ':'), ensure_ascii=False, allow_nan=False,
+        ).encode('utf-8')
+    # Both separators start with these bytes; skip the replaces for the usual payload without them
+    if b'\xe2\x80' in data:
+        for raw, escaped in LINE_SEPARATORS:
+            data = data.replace(raw, escaped)
+    return data
+
+
+def loads(data):
+    if backend() == 'orjson':
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode('utf-8')
+    return json.loads(data)
+
+
+class FastJsonResponse(HttpResponse):
+    """``JsonResponse`` encoded with ``dumps()``; ``safe`` works the same way."""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError('In order to allow non-dict objects to be serialized set the safe parameter to False.')
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,69 @@
+"""Random featured content for the home page without ``ORDER BY ?``.
+
+The candidate ids for each (kind, country) pair are cached as a plain list and
+sampled in Python, followed by a single ``pk__in`` fetch. The pools are keyed on
+the catalog version, so any content change (see ``surveys.signals``) makes the
+next request rebuild them.
+"""
+import random
+
+from django.core.cache import cache
+
+from .models import Poll, SurveyCategory
+from .versioning import get_version
+
+FEATURED_POOL_TIMEOUT = 60 * 60
+
+
+def _pool_key(kind, country_id):
+    return f'surveys:featured:{kind}:{country_id or "all"}:v{get_version()}'
+
+
+def _get_pool(kind, country_id, queryset):
+    key = _pool_key(kind, country_id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = list(queryset.order_by().values_list('id', flat=True).distinct())
+        cache.set(key, ids, FEATURED_POOL_TIMEOUT)
+    return ids
+
+
+def _sample(queryset, ids, limit):
+    picked = random.sample(ids, min(limit, len(ids)))
+    if not picked:
+        return []
+    objects = queryset.in_bulk(picked)
+    # in_bulk returns a dict; keep the random order and drop ids deleted since the pool was built
+    return [objects[pk] for pk in picked if pk in objects]
+
+
+def featured_category_pool(country_id=None):
+    categories = SurveyCategory.objects.filter(
+        surveys__is_active=True,
+        country__is_active=True,
+    )
+    if country_id:
+        categories = categories.filter(country_id=country_id)
+    return _get_pool('categories', country_id, categories)
+
+
+def featured_poll_pool(country_id=None):
+    polls = Poll.objects.filter(
+        is_active=True,
+        country__is_active=True,
+        questions__isnull=False,
+    )
+    if country_id:
+        polls = polls.filter(country_id=country_id)
+    return _get_pool('polls', country_id, polls)
+
+
+def get_featured_categories(country_id=None, limit=6):
+    """Return up to ``limit`` random categories with active surveys."""
+    return _sample(SurveyCategory.objects.all(), featured_category_pool(country_id), limit)
+
+
+def get_featured_polls(country_id=None, limit=5):
+    """Return up to ``limit`` random active polls that have questions."""
+    polls = Poll.objects.select_related('country').prefetch_related('questions')
+    return _sample(polls, featured_poll_pool(country_id), limit)
@@ -6,8 +6,11 @@ from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from .models import (
     Country, Choice, SurveyResponse, Answer, LuckyDrawEntry, UserProfile,
-    Question, PollResponse, PollAnswer, WalletWithdrawalRequest
+    Question, PollResponse, PollAnswer, WalletWithdrawalRequest,
+    Survey, SurveyCategory,
 )
+from .crosstab import AGE_BANDS, DIMENSIONS, UNKNOWN
+from .exports import FORMAT_CHOICES
 from django.contrib.auth.forms import UserChangeForm
 from django.contrib.auth import get_user_model
 from django.core.files.images import get_image_dimensions
@@ -716,3 +719,82 @@ class PollResponseForm(forms.Form):
                 answer.selected_choices.set([answer_value])
 
         return response
+
+
+class ResponseExportForm(forms.Form):
+    """Filters for the admin answer export (see ``surveys.exports``)."""
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, initial='csv')
+    survey = forms.ModelChoiceField(queryset=Survey.objects.select_related('category'), required=False)
+    category = forms.ModelChoiceField(queryset=SurveyCategory.objects.all(), required=False)
+    country = forms.ModelChoiceField(queryset=Country.objects.all(), required=False)
+    start = forms.DateField(required=False, label=_('Completed from'), widget=forms.DateInput(attrs={'type': 'date'}))
+    end = forms.DateField(required=False, label=_('Completed until'), widget=forms.DateInput(attrs={'type': 'date'}))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get('start'), cleaned_data.get('end')
+        if start and end and start > end:
+            raise forms.ValidationError(_('The start date must be on or before the end date.'))
+        return cleaned_data
+
+    def export_filters(self):
+        return {
+            name: self.cleaned_data[name]
+            for name in ('survey', 'category', 'country', 'start', 'end')
+        }
+
+
+class CrosstabForm(forms.Form):
+    """Dimensions and filters for ``surveys.crosstab``; used by the admin page and the JSON API."""
+    DIMENSION_CHOICES = [(name, name.replace('_', ' ').capitalize()) for name in DIMENSIONS]
+    TEXT_FILTERS = ('state', 'city', 'answer')
+
+    rows = forms.ChoiceField(choices=DIMENSION_CHOICES, initial='answer')
+    columns = forms.ChoiceField(choices=DIMENSION_CHOICES, initial='age_band')
+    question = forms.ModelChoiceField(queryset=Question.objects.none(), required=False)
+    country = forms.MultipleChoiceField(required=False)
+    age_band = forms.MultipleChoiceField(
+        required=False,
+        choices=[(label, label) for label, _ in reversed(AGE_BANDS)] + [(UNKNOWN, UNKNOWN)],
+    )
+    state = forms.CharField(required=False, help_text=_('Comma-separated'))
+    city = forms.CharField(required=False, help_text=_('Comma-separated'))
+    answer = forms.CharField(required=False, help_text=_('Comma-separated answer labels'))
+    start = forms.DateField(required=False, label=_('Completed from'), widget=forms.DateInput(attrs={'type': 'date'}))
+    end = forms.DateField(required=False, label=_('Completed until'), widget=forms.DateInput(attrs={'type': 'date'}))
+
+    def __init__(self, *args, survey, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['question'].queryset = survey.questions.order_by('order', 'id')
+        names = Country.objects.order_by('name').values_list('name', flat=True)
+        self.fields['country'].choices = [(name, name) for name in names] + [(UNKNOWN, UNKNOWN)]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        rows, columns = cleaned_data.get('rows'), cleaned_data.get('columns')
+        if rows and rows == columns:
+            raise forms.ValidationError(_('Pick two different dimensions.'))
+        if 'answer' in (rows, columns) and not cleaned_data.get('question'):
+            self.add_error('question', _('Pick the question whose answers to break down.'))
+        start, end = cleaned_data.get('start'), cleaned_data.get('end')
+        if start and end and start > end:
+            raise forms.ValidationError(_('The start date must be on or before the end date.'))
+        return cleaned_data
+
+    def crosstab_arguments(self):
+        filters = {}
+        for name in ('country', 'age_band'):
+            if self.cleaned_data[name]:
+                filters[name] = self.cleaned_data[name]
+        for name in self.TEXT_FILTERS:
+            values = [value.strip() for value in self.cleaned_data[name].split(',') if value.strip()]
+            if values:
+                filters[name] = values
+        return {
+            'rows': self.cleaned_data['rows'],
+            'columns': self.cleaned_data['columns'],
+            'question': self.cleaned_data['question'],
+            'filters': filters,
+            'start': self.cleaned_data['start'],
+            'end': self.cleaned_data['end'],
+        }
@@ -0,0 +1,70 @@
+"""Incremental imports: skip source files whose content has not changed.
+
+Each imported file gets an ``ImportManifest`` row with the SHA-256 of its
+bytes, the importer version and the ids of the rows it produced. Before
+parsing, ``split_unchanged()`` hashes the files and loads all their manifests
+in one query. Files with the same hash and importer version are dropped, so
+they are neither parsed nor written. Changed files are parsed as usual, and the
+importers write only the rows that differ from the database. ``record()``
+then stores the new hashes with one bulk update and one bulk insert.
+"""
+import hashlib
+
+from django.utils import timezone
+
+from .models import ImportManifest
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def split_unchanged(importer, version, files, force=False):
+    """
+    Split ``files`` (``{source: path}``) into changed and unchanged ones.
+
+    Returns ``(changed, unchanged)``: ``{source: (path, content_hash)}`` for the
+    files to import and the list of sources to skip. ``force`` treats every
+    file as changed.
+    """
+    hashes = {source: file_hash(path) for source, path in files.items()}
+    known = {}
+    if not force:
+        known = {
+            source: (content_hash, importer_version)
+            for source, content_hash, importer_version in ImportManifest.objects.filter(
+                importer=importer, source__in=list(files),
+            ).values_list('source', 'content_hash', 'importer_version')
+        }
+    changed, unchanged = {}, []
+    for source, path in files.items():
+        if known.get(source) == (hashes[source], version):
+            unchanged.append(source)
+        else:
+            changed[source] = (path, hashes[source])
+    return changed, unchanged
+
+
+def record(importer, version, entries):
+    """Store manifests for imported files; ``entries`` is ``{source: (content_hash, object_ids)}``."""
+    if not entries:
+        return
+    now = timezone.now()
+    existing = list(ImportManifest.objects.filter(importer=importer, source__in=list(entries)))
+    for manifest in existing:
+        manifest.content_hash, manifest.object_ids = entries[manifest.source]
+        manifest.importer_version = version
+        manifest.imported_at = now
+    ImportManifest.objects.bulk_update(existing, ['content_hash', 'object_ids', 'importer_version', 'imported_at'])
+    seen = {manifest.source for manifest in existing}
+    ImportManifest.objects.bulk_create([
+        ImportManifest(importer=importer, source=source, content_hash=content_hash, importer_version=version,
+                       object_ids=object_ids, imported_at=now)
+        for source, (content_hash, object_ids) in entries.items() if source not in seen
+    ])
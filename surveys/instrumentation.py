@@ -0,0 +1,224 @@
+"""Per-request database query instrumentation.
+
+Everything here is opt-in through ``settings.QUERY_INSTRUMENTATION``. When it is
+enabled, ``QueryInstrumentationMiddleware`` wraps every database connection with
+``connection.execute_wrapper`` for the duration of a request and records:
+
+- the number of queries and the total time spent in the database
+- fingerprints of repeated statements (the usual shape of an N+1 loop)
+- the slowest statement
+
+The numbers are reported as a ``Server-Timing`` header and a structured log line.
+
+Other subsystems report events (cache hits and misses, for example) with
+``incr(name)``. Counters are kept per process for ``get_counters()`` and, while
+a request is being recorded, also appear in that request's stats line.
+Views can declare a query budget with ``@query_budget(n)`` (functions or
+class-based views) or through ``QUERY_INSTRUMENTATION['BUDGETS']`` keyed by URL
+name. Budget overruns are logged, or raised as ``QueryBudgetExceeded`` when
+``RAISE_ON_BUDGET`` is set so that tests fail loudly.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'ENABLED': False,
+    # URL name (e.g. 'surveys:home') -> maximum number of queries for one request
+    'BUDGETS': {},
+    # Budget applied to views that declare none; None disables the check
+    'DEFAULT_BUDGET': None,
+    # Raise QueryBudgetExceeded instead of logging a warning (useful in tests)
+    'RAISE_ON_BUDGET': False,
+    # A fingerprint executed at least this many times is reported as a duplicate
+    'DUPLICATE_THRESHOLD': 3,
+    'SERVER_TIMING': True,
+    'LOG_LEVEL': logging.INFO,
+}
+
+_IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+_NUMBER_RE = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+_current_recorder = ContextVar('surveys_query_recorder', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a view runs more queries than its declared budget."""
+
+
+def incr(name, amount=1):
+    """Count an event (e.g. ``search_cache.hit``) for this process and the current request."""
+    with _counters_lock:
+        _counters[name] += amount
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.counters[name] += amount
+
+
+def get_counters():
+    with _counters_lock:
+        return dict(_counters)
+
+
+def reset_counters():
+    with _counters_lock:
+        _counters.clear()
+
+
+def get_config():
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'QUERY_INSTRUMENTATION', {}) or {})
+    return config
+
+
+def fingerprint(sql):
+    """Normalize a statement so that the same query with different parameters compares equal."""
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    return ' '.join(sql.split())
+
+
+class QueryRecorder:
+    """``execute_wrapper`` callable that accumulates statistics for every statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.slowest_duration = 0.0
+        self.slowest_sql = ''
+        self.counters = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            self.fingerprints[fingerprint(sql)] += 1
+            if elapsed >= self.slowest_duration:
+                self.slowest_duration = elapsed
+                self.slowest_sql = sql
+
+    def duplicates(self, threshold=None):
+        if threshold is None:
+            threshold = get_config()['DUPLICATE_THRESHOLD']
+        return [
+            (statement, total)
+            for statement, total in self.fingerprints.most_common()
+            if total >= threshold
+        ]
+
+    def as_dict(self, threshold=None):
+        return {
+            'queries': self.count,
+            'db_ms': round(self.duration * 1000, 2),
+            'slowest_ms': round(self.slowest_duration * 1000, 2),
+            'slowest_sql': self.slowest_sql,
+            'duplicates': [
+                {'sql': statement, 'count': total}
+                for statement, total in self.duplicates(threshold)
+            ],
+            'counters': dict(self.counters),
+        }
+
+
+@contextmanager
+def record_queries():
+    """Record queries on every configured database alias while the block runs."""
+    recorder = QueryRecorder()
+    token = _current_recorder.set(recorder)
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            yield recorder
+    finally:
+        _current_recorder.reset(token)
+
+
+def query_budget(max_queries):
+    """Declare the maximum number of queries a view may run.
+
+    Works on function views and on class-based views (decorate the class)::
+
+        @query_budget(12)
+        class HomePageView(TemplateView):
+            ...
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def get_view_budget(request, config=None):
+    config = config or get_config()
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None, None
+
+    view_name = match.view_name
+    func = match.func
+    budget = getattr(func, 'query_budget', None)
+    if budget is None:
+        budget = getattr(getattr(func, 'view_class', None), 'query_budget', None)
+    if budget is None:
+        budget = config['BUDGETS'].get(view_name, config['DEFAULT_BUDGET'])
+    return view_name, budget
+
+
+def server_timing_header(recorder, duplicates):
+    parts = [f'db;dur={recorder.duration * 1000:.2f};desc="{recorder.count} queries"']
+    if duplicates:
+        repeated = sum(total for _, total in duplicates)
+        parts.append(f'db-dup;desc="{len(duplicates)} repeated ({repeated} queries)"')
+    if recorder.count:
+        parts.append(f'db-slowest;dur={recorder.slowest_duration * 1000:.2f}')
+    return ', '.join(parts)
+
+
+def report(request, response, recorder, config=None):
+    """Attach the Server-Timing header, log the stats line and enforce the view budget."""
+    config = config or get_config()
+    view_name, budget = get_view_budget(request, config)
+    duplicates = recorder.duplicates(config['DUPLICATE_THRESHOLD'])
+
+    if config['SERVER_TIMING']:
+        response['Server-Timing'] = server_timing_header(recorder, duplicates)
+
+    stats = recorder.as_dict(config['DUPLICATE_THRESHOLD'])
+    stats.update({
+        'method': request.method,
+        'path': request.path,
+        'view': view_name,
+        'status': response.status_code,
+        'budget': budget,
+    })
+    logger.log(config['LOG_LEVEL'], 'query stats: %s', json.dumps(stats, sort_keys=True))
+
+    if budget is not None and recorder.count > budget:
+        message = (
+            f'{view_name or request.path} ran {recorder.count} queries '
+            f'(budget {budget}, {len(duplicates)} repeated statements)'
+        )
+        if config['RAISE_ON_BUDGET']:
+            raise QueryBudgetExceeded(message)
+        logger.warning('Query budget exceeded: %s', message)
@@ -0,0 +1,140 @@
+"""Parsing of journal post ``.docx`` files for ``upload_journals.py``.
+
+``parse_docx()`` turns one file into ``(title, excerpt, content_html)``:
+
+- the first paragraph becomes the title
+- heading-like paragraphs become <h2> section headings
+- normal paragraphs become <p> (bold/italic/underlined runs preserved)
+- tables become HTML <table>s
+- the excerpt is derived from the first body paragraph
+
+It touches no models, so the importer can run it in worker processes (see
+``surveys.parallel_parse``).
+"""
+import html
+
+from docx import Document
+
+EXCERPT_MAX_LEN = 300
+HEADING_MAX_WORDS = 12
+
+# Bump when parsing changes, so that incremental imports re-read every file
+IMPORTER_VERSION = 1
+
+
+def run_to_html(run):
+    text = html.escape(run.text)
+    if not text:
+        return ''
+    if run.bold:
+        text = f'<strong>{text}</strong>'
+    if run.italic:
+        text = f'<em>{text}</em>'
+    if run.underline:
+        text = f'<u>{text}</u>'
+    return text
+
+
+def paragraph_to_html(paragraph, tag='p'):
+    inner = ''.join(run_to_html(r) for r in paragraph.runs).strip()
+    if not inner:
+        return ''
+    return f'<{tag}>{inner}</{tag}>'
+
+
+def is_heading_paragraph(paragraph):
+    """
+    The source .docx files mostly use no real Word heading style at all --
+    every section title is just a short plain paragraph. Detect them by shape
+    instead: a single run, no trailing sentence punctuation, not a bullet
+    ("**Term**: description"), not a decorative/ASCII-art line, and short.
+    """
+    text = paragraph.text.strip()
+    if not text or not any(c.isalpha() for c in text):
+        return False
+
+    if paragraph.style.name.startswith('Heading'):
+        return True
+
+    runs = paragraph.runs
+    is_bullet = len(runs) >= 2 and bool(runs[0].bold)
+    has_arrow = '--->' in text
+    ends_with_sentence_punct = text.endswith(('.', '!', '?'))
+    word_count = len(text.split())
+
+    return (
+        not is_bullet
+        and not has_arrow
+        and not ends_with_sentence_punct
+        and word_count <= HEADING_MAX_WORDS
+    )
+
+
+def table_to_html(table):
+    rows_html = []
+    for i, row in enumerate(table.rows):
+        cell_tag = 'th' if i == 0 else 'td'
+        cells = ''.join(
+            f'<{cell_tag}>{html.escape(cell.text.strip())}</{cell_tag}>'
+            for cell in row.cells
+        )
+        rows_html.append(f'<tr>{cells}</tr>')
+    return '<table border="1" cellpadding="6" cellspacing="0">' + ''.join(rows_html) + '</table>'
+
+
+def iter_body_blocks(document):
+    """Yield ('paragraph', paragraph) / ('table', table) in document order."""
+    body = document.element.body
+    paragraphs = {p._p: p for p in document.paragraphs}
+    tables = {t._tbl: t for t in document.tables}
+    for child in body:
+        if child.tag.endswith('}p') and child in paragraphs:
+            yield 'paragraph', paragraphs[child]
+        elif child.tag.endswith('}tbl') and child in tables:
+            yield 'table', tables[child]
+
+
+def parse_docx(path):
+    """Return (title, excerpt, content_html) or None if the file isn't a well-formed journal post.
+
+    Every genuine journal post in this batch ends with a summary table; files
+    without one (e.g. leftover scratch/notes docs) are treated as not importable.
+    """
+    document = Document(path)
+
+    if not document.tables:
+        return None
+
+    title = None
+    excerpt = ''
+    content_parts = []
+
+    for kind, block in iter_body_blocks(document):
+        if kind == 'table':
+            content_parts.append(table_to_html(block))
+            continue
+
+        paragraph = block
+        text = paragraph.text.strip()
+        if not text:
+            continue
+
+        if title is None:
+            title = text
+            continue
+
+        if is_heading_paragraph(paragraph):
+            content_parts.append(f'<h2>{html.escape(text)}</h2>')
+            continue
+
+        piece = paragraph_to_html(paragraph, tag='p')
+        if not piece:
+            continue
+        content_parts.append(piece)
+        if not excerpt:
+            excerpt = text[:EXCERPT_MAX_LEN]
+
+    if title is None:
+        return None
+
+    return title, excerpt, '\n'.join(content_parts)
@@ -4,6 +4,7 @@ from django.contrib import messages
 from django.shortcuts import render, redirect
 from django.urls import reverse
 from django.views.generic import View
+from .fast_json import FastJsonResponse, loads
 from .models import (
     UserSurveyProgress, LuckyDrawEntry, PollResponse, CountryLuckyDrawConfig,
     SurveyResponse,
@@ -11,7 +12,6 @@ from .models import (
 from django.db.models import Sum
 import random
 from django.utils import timezone
-from django.http import JsonResponse  # Add this line
 import json
 from decimal import Decimal
 from .emails import send_lucky_draw_winner_email, send_lucky_draw_winner_admin_notification
@@ -272,14 +272,14 @@ class LuckyDrawView(View):
 
     def get_lucky_number(self, request):
         if not request.user.is_authenticated:
-            return JsonResponse({'error': 'Not authenticated'}, status=401)
+            return FastJsonResponse({'error': 'Not authenticated'}, status=401)
 
         draw_type = self.resolve_draw_type(request.user, request.GET.get('draw_type'))
         # Check if user is eligible to play
         if not self.is_eligible(request.user, draw_type):
             required_surveys = settings.LUCKY_DRAW_CONFIG.get('SURVEYS_REQUIRED', 3)
             required_polls = self.get_poll_requirement(request.user)
-            return JsonResponse({
+            return FastJsonResponse({
                 'error': f'You need to complete {required_surveys} surveys or {required_polls} polls to play the lucky draw.'
             }, status=400)
         
@@ -289,30 +289,30 @@ class LuckyDrawView(View):
             settings.LUCKY_DRAW_CONFIG['NUMBER_RANGE_END']
         )
         
-        return JsonResponse({'lucky_number': lucky_number})
+        return FastJsonResponse({'lucky_number': lucky_number})
 
     def post(self, request):
         if not request.user.is_authenticated:
-            return JsonResponse({'error': 'Not authenticated'}, status=401)
+            return FastJsonResponse({'error': 'Not authenticated'}, status=401)
             
         
         
        
         try:
-            data = json.loads(request.body)
+            data = loads(request.body)
         except json.JSONDecodeError:
-            return JsonResponse({'error': 'Invalid request'}, status=400)
+            return FastJsonResponse({'error': 'Invalid request'}, status=400)
 
         requested_draw_type = data.get('draw_type')
         if requested_draw_type and requested_draw_type not in {LuckyDrawEntry.DRAW_TYPE_SURVEY, LuckyDrawEntry.DRAW_TYPE_POLL}:
-            return JsonResponse({'error': 'Invalid lucky draw type.'}, status=400)
+            return FastJsonResponse({'error': 'Invalid lucky draw type.'}, status=400)
         draw_type = self.resolve_draw_type(request.user, requested_draw_type)
 
         # Check if user is eligible to play for the selected source.
         if not self.is_eligible(request.user, draw_type):
             required_surveys = settings.LUCKY_DRAW_CONFIG.get('SURVEYS_REQUIRED', 3)
             required_polls = self.get_poll_requirement(request.user)
-            return JsonResponse({
+            return FastJsonResponse({
                 'error': f'You need to complete {required_surveys} surveys or {required_polls} polls to play again.'
             }, status=400)
 
@@ -321,7 +321,7 @@ class LuckyDrawView(View):
         # be tampered with from the client side.
         grid = request.session.get('lucky_draw_grid')
         if not grid:
-            return JsonResponse({'error': 'Session expired. Please refresh the page.'}, status=400)
+            return FastJsonResponse({'error': 'Session expired. Please refresh the page.'}, status=400)
 
         try:
             index = int(data.get('index'))
@@ -329,7 +329,7 @@ class LuckyDrawView(View):
                 raise ValueError('Invalid index')
             number = grid[index]
         except (ValueError, TypeError):
-            return JsonResponse({'error': 'Invalid selection'}, status=400)
+            return FastJsonResponse({'error': 'Invalid selection'}, status=400)
         
         total_surveys, total_polls = self.get_completion_counts(request.user)
         eligibility = self.get_eligibility_context(request.user)
@@ -362,7 +362,7 @@ class LuckyDrawView(View):
         # Winning number comes from the session — never from the client request
         winning_number = request.session.get('lucky_draw_number')
         if winning_number is None:
-            return JsonResponse({'error': 'Session expired. Please refresh the page.'}, status=400)
+            return FastJsonResponse({'error': 'Session expired. Please refresh the page.'}, status=400)
 
         # Invalidate the session grid so this draw cannot be replayed
         request.session.pop('lucky_draw_grid', None)
@@ -405,7 +405,7 @@ class LuckyDrawView(View):
         remaining_draw_types = post_play_eligibility['eligible_draw_types']
         plays_remaining = post_play_eligibility['survey_plays_available'] + post_play_eligibility['poll_plays_available']
 
-        return JsonResponse({
+        return FastJsonResponse({
             'is_winner': is_winner,
             'guessed_number': number,
             'winning_number': winning_number,
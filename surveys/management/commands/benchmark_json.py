@@ -0,0 +1,117 @@
+import timeit
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from surveys.fast_json import dumps, orjson
+
+
+def catalog_page(surveys=10, questions=10, choices=4):
+    """A survey list page as the catalog API renders it."""
+    now = timezone.now()
+    return {
+        'count': 250, 'next': 'https://example.com/api/api/surveys/?page=2', 'previous': None,
+        'results': [
+            {
+                'id': survey, 'name': f'Survey {survey}', 'description': 'Tell us about your habits. ' * 4,
+                'is_active': True, 'level': 1,
+                'category': {'id': 3, 'name': 'Health', 'description': '<p>Health and wellbeing</p>'},
+                'questions': [
+                    {
+                        'id': survey * 100 + question, 'question_text': f'Question {question}: how often?',
+                        'question_type': 'single_choice', 'is_required': True, 'order': question,
+                        'choices': [
+                            {'id': survey * 1000 + question * 10 + choice, 'choice_text': f'Option {choice}'}
+                            for choice in range(choices)
+                        ],
+                    }
+                    for question in range(questions)
+                ],
+                'created_at': now.isoformat(), 'updated_at': now.isoformat(),
+            }
+            for survey in range(surveys)
+        ],
+    }
+
+
+def wallet_history(rows=1000):
+    """Wallet transactions with ``Decimal`` amounts and aware datetimes."""
+    now = timezone.now()
+    return [
+        {
+            'id': row, 'transaction_type': 'credit' if row % 3 else 'debit',
+            'amount': Decimal('2.00') + Decimal(row % 7) / 4, 'currency_code': 'INR',
+            'currency_symbol': '₹', 'balance_after': Decimal('1000.00') + row,
+            'description': 'Surveys Completed milestone reward', 'created_at': now - timedelta(minutes=row),
+        }
+        for row in range(rows)
+    ]
+
+
+def export_rows(rows=2000):
+    """NDJSON export lines (see ``surveys.exports``)."""
+    now = timezone.now().isoformat()
+    return [
+        {
+            'response_id': row // 10, 'survey_id': 7, 'survey': 'Health 1', 'category': 'Health',
+            'country': 'India', 'user_id': row // 10, 'username': f'user{row // 10}',
+            'started_at': now, 'completed_at': now, 'question_id': row % 10,
+            'question': 'How often do you exercise?', 'question_type': 'single_choice',
+            'text_answer': None, 'rating': None, 'choices': 'Weekly; Daily',
+        }
+        for row in range(rows)
+    ]
+
+
+PAYLOADS = {
+    'catalog_page': (catalog_page, False),
+    'wallet_history': (wallet_history, False),
+    'export_rows': (export_rows, True),  # encoded line by line
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare JSON encode time and allocations of the orjson and stdlib backends on representative payloads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=20, help='Encodes per timing run (default: 20)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timing runs; the best is reported (default: 5)')
+
+    def handle(self, *args, **options):
+        if options['number'] < 1 or options['repeat'] < 1:
+            raise CommandError('--number and --repeat must be at least 1.')
+        backends = ['json'] + (['orjson'] if orjson is not None else [])
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; only the stdlib backend is measured.'))
+
+        self.stdout.write(f"{'payload':<16}{'backend':<9}{'bytes':>10}{'ms/encode':>12}{'peak KiB':>11}")
+        for name, (build, per_item) in PAYLOADS.items():
+            payload = build()
+            timings = {}
+            for backend_name in backends:
+                if per_item:
+                    def encode():
+                        return b'\n'.join(dumps(item, backend_name) for item in payload)
+                else:
+                    def encode():
+                        return dumps(payload, backend_name)
+
+                size = len(encode())
+                best = min(timeit.repeat(encode, number=options['number'], repeat=options['repeat']))
+                timings[backend_name] = best / options['number'] * 1000
+
+                tracemalloc.start()
+                encode()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                self.stdout.write(
+                    f'{name:<16}{backend_name:<9}{size:>10}{timings[backend_name]:>12.3f}{peak / 1024:>11.1f}'
+                )
+            if len(timings) == 2:
+                self.stdout.write(self.style.SUCCESS(
+                    f"{'':<16}orjson is {timings['json'] / timings['orjson']:.1f}x faster"
+                ))
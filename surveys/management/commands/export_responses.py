@@ -0,0 +1,52 @@
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from surveys.exports import FORMAT_CHOICES, export_queryset, stream_export
+
+
+class Command(BaseCommand):
+    help = 'Stream survey answers (one row per response and question) as CSV, NDJSON or Parquet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', default='csv', choices=[value for value, _ in FORMAT_CHOICES],
+            help='Output format (default: csv). Parquet needs pyarrow.',
+        )
+        parser.add_argument('--output', '-o', help='File to write; defaults to standard output.')
+        parser.add_argument('--survey', type=int, help='Survey id')
+        parser.add_argument('--category', type=int, help='Survey category id')
+        parser.add_argument('--country', type=int, help='Country id')
+        parser.add_argument('--start', type=date.fromisoformat, help='First completion date (YYYY-MM-DD)')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last completion date (YYYY-MM-DD), inclusive')
+        parser.add_argument('--database', help='Database alias to read from (default: a read replica if configured)')
+
+    def handle(self, *args, **options):
+        if options['start'] and options['end'] and options['start'] > options['end']:
+            raise CommandError('--start must be on or before --end.')
+
+        queryset = export_queryset(
+            survey=options['survey'],
+            category=options['category'],
+            country=options['country'],
+            start=options['start'],
+            end=options['end'],
+            using=options['database'],
+        )
+        chunks = stream_export(options['format'], queryset)
+
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                total = self.write_chunks(chunks, output)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {total} bytes to {options['output']}"))
+        else:
+            self.write_chunks(chunks, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
+
+    def write_chunks(self, chunks, output):
+        total = 0
+        for chunk in chunks:
+            output.write(chunk)
+            total += len(chunk)
+        return total
@@ -0,0 +1,87 @@
+import json
+import os
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from surveys import import_manifest
+from surveys.docx_import import BATCH_SIZE, IMPORTER_VERSION, document_report, import_documents, parse_document
+from surveys.models import Country, ImportManifest
+from surveys.parallel_parse import default_jobs, format_stats, parse_files
+
+
+class Command(BaseCommand):
+    help = 'Import survey categories, sections and questions from a directory of DOCX files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('country_code', help='Code of the country the categories belong to, e.g. IN')
+        parser.add_argument('directory', help='Directory containing the .docx files')
+        parser.add_argument(
+            '--report', help='Where to write the JSON report (default: import_report_<timestamp>.json)',
+        )
+        parser.add_argument(
+            '--jobs', type=int, default=default_jobs(),
+            help='Worker processes for parsing (default: one per CPU)',
+        )
+        parser.add_argument(
+            '--force', action='store_true', help='Import every file, even those unchanged since the last import',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help=f'Rows per bulk insert and ids per lookup (default: {BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        country_code = options['country_code'].upper()
+        try:
+            country = Country.objects.get(code=country_code)
+        except Country.DoesNotExist:
+            raise CommandError(f'No country with code {country_code}.')
+        directory = os.path.abspath(options['directory'])
+        if not os.path.isdir(directory):
+            raise CommandError(f'{directory} is not a directory.')
+        if options['batch_size'] < 1 or options['jobs'] < 1:
+            raise CommandError('--batch-size and --jobs must be at least 1.')
+
+        report = {
+            'country': country_code,
+            'started_at': datetime.now(dt_timezone.utc).isoformat(),
+            'documents': [],
+        }
+        report_file = options['report'] or f"import_report_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+
+        files = sorted(name for name in os.listdir(directory) if name.lower().endswith('.docx'))
+        changed, unchanged = import_manifest.split_unchanged(
+            ImportManifest.IMPORTER_SURVEY_DOCX, IMPORTER_VERSION,
+            {f'{country_code}/{name}': os.path.join(directory, name) for name in files},
+            force=options['force'],
+        )
+        documents, stats = parse_files(
+            parse_document, [path for path, _ in changed.values()], jobs=options['jobs'],
+        )
+        self.stdout.write(format_stats(stats))
+        if unchanged:
+            self.stdout.write(f'Skipped {len(unchanged)} unchanged documents.')
+
+        with transaction.atomic():
+            counts, object_ids = import_documents(country, documents, batch_size=options['batch_size'])
+            import_manifest.record(ImportManifest.IMPORTER_SURVEY_DOCX, IMPORTER_VERSION, {
+                source: (content_hash, ids)
+                for (source, (_, content_hash)), ids in zip(changed.items(), object_ids)
+            })
+
+        records = {document['file']: document_report(document) for document in documents}
+        for name in files:
+            record = records.get(name, {'file': name, 'status': 'unchanged'})
+            report['documents'].append(record)
+            if name in records:
+                self.stdout.write(
+                    f"{record['file']}: {record['total_questions']} questions in "
+                    f"{len(record['sections'])} sections ({record['category']})"
+                )
+        with open(report_file, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+
+        self.stdout.write(', '.join(f'{count} {name}' for name, count in counts.items()) + ' written.')
+        self.stdout.write(self.style.SUCCESS(f'Import report saved to {report_file}'))
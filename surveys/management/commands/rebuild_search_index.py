@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from surveys.search import rebuild_index, uses_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the SearchEntry table (and its search vectors on Postgres) from the catalog.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk insert (default: 500)')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counts = rebuild_index(batch_size=options['batch_size'])
+
+        for object_type, count in counts.items():
+            self.stdout.write(f'{object_type:<15} {count}')
+        if not uses_search_index():
+            self.stdout.write(self.style.WARNING(
+                'Database is not PostgreSQL: entries were written without search vectors; '
+                'SearchView keeps using its icontains fallback.'
+            ))
+        self.stdout.write(self.style.SUCCESS(f'Indexed {sum(counts.values())} entries.'))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from surveys.typeahead import TypeaheadIndex, invalidate_index
+from surveys.versioning import SEARCH, get_version
+
+
+class Command(BaseCommand):
+    help = (
+        'Build the search type-ahead index, report its size and bump the search version so '
+        'every running worker rebuilds its in-process copy in the background.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--report-only', action='store_true',
+            help='Only build and measure the index; do not bump the search version.',
+        )
+
+    def handle(self, *args, **options):
+        if options['report_only']:
+            version = get_version(SEARCH)
+        else:
+            version = invalidate_index()
+
+        stats = TypeaheadIndex.build(version).stats()
+        for name in ('version', 'documents', 'partitions', 'terms', 'postings'):
+            self.stdout.write(f'{name:<12} {stats[name]}')
+        self.stdout.write(f"{'memory':<12} {stats['memory_bytes'] / 1024:.1f} KiB")
+        if not options['report_only']:
+            self.stdout.write(self.style.SUCCESS('Search version bumped; workers will rebuild their type-ahead index.'))
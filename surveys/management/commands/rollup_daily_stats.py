@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from surveys.rollups import ROLLUPS_BY_NAME, rollup_incremental, rollup_range
+
+
+class Command(BaseCommand):
+    help = (
+        'Roll raw responses, lucky draw entries and wallet transactions up into the daily '
+        'fact tables. Without dates, continues from the last day already rolled up.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat, help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--until', type=date.fromisoformat, help='Last day to rebuild, inclusive (default: --since)')
+        parser.add_argument(
+            '--only', action='append', choices=sorted(ROLLUPS_BY_NAME),
+            help='Limit to one fact table; may be repeated.',
+        )
+
+    def handle(self, *args, **options):
+        since, until = options['since'], options['until']
+        if until and not since:
+            raise CommandError('--until needs --since.')
+
+        if since:
+            until = until or since
+            if since > until:
+                raise CommandError('--since must be on or before --until.')
+            written = rollup_range(since, until, options['only'])
+        else:
+            written = rollup_incremental(options['only'])
+
+        for name, rows in written.items():
+            self.stdout.write(f'{name:<12} {rows} rows')
+        self.stdout.write(self.style.SUCCESS('Daily stats rolled up.'))
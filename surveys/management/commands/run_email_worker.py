@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from surveys.email_outbox import get_config, purge_sent, send_pending
+
+# Seconds between purges of old sent rows while the worker runs
+PURGE_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+    help = (
+        'Send queued emails from the EmailOutbox table, retrying failures with backoff, '
+        'and purge old sent emails.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Send what is due now, then exit')
+        parser.add_argument('--batch-size', type=int, help='Emails per batch (default: EMAIL_OUTBOX["BATCH_SIZE"])')
+        parser.add_argument(
+            '--interval', type=float,
+            help='Seconds to sleep when nothing is due (default: EMAIL_OUTBOX["POLL_INTERVAL"])',
+        )
+
+    def handle(self, *args, **options):
+        config = get_config()
+        batch_size = options['batch_size'] or config['BATCH_SIZE']
+        interval = options['interval'] if options['interval'] is not None else config['POLL_INTERVAL']
+        if batch_size < 1 or interval < 0:
+            raise CommandError('--batch-size must be at least 1 and --interval not negative.')
+
+        total_sent = total_failed = 0
+        next_purge = 0
+        try:
+            while True:
+                if time.monotonic() >= next_purge:
+                    purged = purge_sent()
+                    if purged:
+                        self.stdout.write(f'Purged {purged} sent emails.')
+                    next_purge = time.monotonic() + PURGE_INTERVAL
+                sent, failed = send_pending(batch_size)
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    self.stdout.write(f'Sent {sent}, failed {failed}.')
+                # A full batch means more may be waiting, so only sleep (or stop) once the outbox is drained
+                if sent + failed < batch_size:
+                    if options['once']:
+                        break
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Done: sent {total_sent}, failed {total_failed}.'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from surveys.catalog_changes import seed
+
+
+class Command(BaseCommand):
+    help = 'Record an upsert in the catalog change log for every current catalog object (makes since=0 a full sync).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk insert (default: 500)')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counts = seed(batch_size=options['batch_size'])
+
+        for object_type, count in counts.items():
+            self.stdout.write(f'{object_type:<15} {count}')
+        self.stdout.write(self.style.SUCCESS(f'Recorded {sum(counts.values())} changes.'))
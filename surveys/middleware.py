@@ -5,6 +5,9 @@ from django.http import Http404
 from django.shortcuts import redirect
 from datetime import datetime
 import logging
+import time
+
+from . import db_router, instrumentation
 
 logger = logging.getLogger(__name__)
 
@@ -77,3 +80,64 @@ class ExceptionRedirectMiddleware:
             return redirect('surveys:home')
 
         return response
+
+
+class QueryInstrumentationMiddleware:
+    """Record database queries per request and report them.
+
+    Disabled unless ``QUERY_INSTRUMENTATION['ENABLED']`` is true. When enabled, adds a
+    ``Server-Timing`` header, logs a structured stats line and enforces per-view query
+    budgets (see ``surveys.instrumentation``). Keep it near the top of MIDDLEWARE so
+    session and auth queries are counted and budget errors are not swallowed by
+    ExceptionRedirectMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = instrumentation.get_config()
+        if not config['ENABLED']:
+            return self.get_response(request)
+
+        with instrumentation.record_queries() as recorder:
+            response = self.get_response(request)
+        instrumentation.report(request, response, recorder, config)
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """Pin a client to the primary database for a short window after it writes.
+
+    Gives read-your-writes on replica-routed views (see ``surveys.db_router``). The
+    pin is a short-lived cookie holding its expiry timestamp, so checking it costs
+    no session or database access.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = db_router.get_config()
+        with db_router.track_request_writes(self.is_pinned(request, config)) as state:
+            response = self.get_response(request)
+
+        wrote = state['wrote'] or request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+        if wrote and response.status_code < 400 and db_router.get_replica_aliases():
+            pin_seconds = config['PIN_SECONDS']
+            response.set_cookie(
+                config['PIN_COOKIE_NAME'],
+                str(int(time.time() + pin_seconds)),
+                max_age=pin_seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    @staticmethod
+    def is_pinned(request, config):
+        try:
+            pinned_until = int(request.COOKIES.get(config['PIN_COOKIE_NAME'], 0))
+        except ValueError:
+            return False
+        return pinned_until > time.time()
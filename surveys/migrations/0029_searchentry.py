@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:59
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_search_vector_index(apps, schema_editor):
+    # GIN indexes are Postgres-only; SQLite test runs use the icontains fallback
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS surveys_search_vector_gin '
+        'ON surveys_searchentry USING gin (search_vector)'
+    )
+
+
+def drop_search_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS surveys_search_vector_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0028_journalcategory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_type', models.CharField(choices=[('category', 'Category'), ('survey', 'Survey'), ('question', 'Survey Question'), ('poll', 'Poll'), ('poll_question', 'Poll Question')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.TextField()),
+                ('description', models.TextField(blank=True)),
+                ('keywords', models.TextField(blank=True)),
+                ('url', models.CharField(max_length=500)),
+                ('is_public', models.BooleanField(default=False, help_text='Shown to anonymous visitors')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='surveys.country')),
+            ],
+            options={
+                'verbose_name': 'Search Entry',
+                'verbose_name_plural': 'Search Entries',
+                'indexes': [models.Index(fields=['object_type', 'object_id'], name='surveys_search_object_idx')],
+            },
+        ),
+        migrations.RunPython(create_search_vector_index, drop_search_vector_index),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0029_searchentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyWalletStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('transaction_type', models.CharField(choices=[('credit', 'Credit'), ('debit', 'Debit')], max_length=10)),
+                ('currency_code', models.CharField(max_length=10)),
+                ('transactions', models.PositiveIntegerField(default=0)),
+                ('unique_users', models.PositiveIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('country', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='surveys.country')),
+            ],
+            options={
+                'verbose_name': 'Daily Wallet Stats',
+                'verbose_name_plural': 'Daily Wallet Stats',
+                'indexes': [models.Index(fields=['date', 'country'], name='surveys_dws_date_country_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySurveyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('completions', models.PositiveIntegerField(default=0)),
+                ('unique_users', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='surveys.surveycategory')),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='surveys.country')),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='surveys.survey')),
+            ],
+            options={
+                'verbose_name': 'Daily Survey Stats',
+                'verbose_name_plural': 'Daily Survey Stats',
+                'indexes': [models.Index(fields=['date', 'country'], name='surveys_dss_date_country_idx')],
+                'unique_together': {('date', 'survey')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyPollStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('unique_users', models.PositiveIntegerField(default=0)),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='surveys.country')),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='surveys.poll')),
+            ],
+            options={
+                'verbose_name': 'Daily Poll Stats',
+                'verbose_name_plural': 'Daily Poll Stats',
+                'indexes': [models.Index(fields=['date', 'country'], name='surveys_dps_date_country_idx')],
+                'unique_together': {('date', 'poll')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyLuckyDrawStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('draw_type', models.CharField(choices=[('survey', 'Survey'), ('poll', 'Poll')], max_length=10)),
+                ('plays', models.PositiveIntegerField(default=0)),
+                ('wins', models.PositiveIntegerField(default=0)),
+                ('unique_users', models.PositiveIntegerField(default=0)),
+                ('country', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='surveys.country')),
+                ('poll', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='surveys.poll')),
+                ('survey', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='surveys.survey')),
+            ],
+            options={
+                'verbose_name': 'Daily Lucky Draw Stats',
+                'verbose_name_plural': 'Daily Lucky Draw Stats',
+                'indexes': [models.Index(fields=['date', 'country'], name='surveys_dls_date_country_idx')],
+            },
+        ),
+    ]
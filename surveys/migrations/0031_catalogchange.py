@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0030_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('object_type', models.CharField(choices=[('category', 'Category'), ('survey', 'Survey'), ('question', 'Survey Question'), ('choice', 'Survey Choice'), ('poll', 'Poll'), ('poll_question', 'Poll Question'), ('poll_choice', 'Poll Choice')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('action', models.CharField(choices=[('upsert', 'Upsert'), ('delete', 'Delete')], max_length=10)),
+                ('data', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='catalog_changes', to='surveys.country')),
+            ],
+            options={
+                'verbose_name': 'Catalog Change',
+                'verbose_name_plural': 'Catalog Changes',
+                'indexes': [models.Index(fields=['country', 'id'], name='surveys_catchange_country_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:36
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0031_catalogchange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportManifest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('importer', models.CharField(choices=[('survey_docx', 'Survey DOCX'), ('journal', 'Journal')], max_length=20)),
+                ('source', models.CharField(help_text='File name; survey imports prefix it with the country code.', max_length=255)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('importer_version', models.PositiveIntegerField()),
+                ('object_ids', models.JSONField(blank=True, default=dict)),
+                ('imported_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Import Manifest',
+                'verbose_name_plural': 'Import Manifests',
+                'unique_together': {('importer', 'source')},
+            },
+        ),
+    ]
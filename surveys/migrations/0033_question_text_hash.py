@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:38
+
+import hashlib
+import unicodedata
+
+from django.db import migrations, models
+
+
+def text_hash(text):
+    # Copy of surveys.models.question_text_hash as of this migration
+    normalized = ' '.join(unicodedata.normalize('NFC', text).split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def backfill_text_hashes(apps, schema_editor):
+    for model_name in ('Question', 'PollQuestion'):
+        model = apps.get_model('surveys', model_name)
+        batch = []
+        for question in model.objects.only('id', 'question_text').iterator(chunk_size=1000):
+            question.text_hash = text_hash(question.question_text)
+            batch.append(question)
+            if len(batch) == 1000:
+                model.objects.bulk_update(batch, ['text_hash'])
+                batch = []
+        model.objects.bulk_update(batch, ['text_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0032_importmanifest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pollquestion',
+            name='text_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='text_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_text_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('surveys', '0035_emailoutbox_sending'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='luckydrawentry',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='surveys_draw_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='surveyresponse',
+            index=models.Index(fields=['user', '-started_at', '-id'], name='surveys_resp_user_started_idx'),
+        ),
+        # auth.User is not ours to give Meta.indexes; UserViewSet pages on (-date_joined, -id)
+        migrations.RunSQL(
+            'CREATE INDEX "surveys_user_joined_idx" ON "auth_user" ("date_joined" DESC, "id" DESC)',
+            'DROP INDEX "surveys_user_joined_idx"',
+        ),
+    ]
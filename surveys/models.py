@@ -5,6 +5,7 @@ from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from ckeditor.fields import RichTextField
+from django.contrib.postgres.search import SearchVectorField
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from datetime import timedelta
@@ -12,8 +13,10 @@ from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django_countries.fields import CountryField
 from decimal import Decimal
+import hashlib
 import logging
 import re
+import unicodedata
 
 logger = logging.getLogger(__name__)
 
@@ -112,6 +115,38 @@ class Survey(models.Model):
         # Allow multiple active surveys
         super().save(*args, **kwargs)
 
+    def reorder_questions(self, question_ids):
+        """
+        Set each question's ``order`` to its 1-based position in ``question_ids``.
+
+        Runs as one ``UPDATE ... CASE WHEN`` statement; ids that are not questions
+        of this survey are ignored. ``update()`` sends no signals, so the change
+        log is written here and the catalog version is bumped once the
+        transaction commits.
+        """
+        from .catalog_changes import record_questions
+        from .signals import bump_catalog_version
+
+        positions = {}
+        for position, question_id in enumerate(question_ids, 1):
+            positions.setdefault(int(question_id), position)
+        if not positions:
+            return 0
+
+        questions = Question.objects.filter(pk__in=positions, surveys=self)
+        with transaction.atomic():
+            updated = questions.update(
+                order=models.Case(
+                    *[models.When(pk=pk, then=models.Value(position)) for pk, position in positions.items()],
+                    output_field=models.PositiveIntegerField(),
+                ),
+                updated_at=timezone.now(),
+            )
+            if updated:
+                record_questions(questions.values_list('pk', flat=True))
+                bump_catalog_version(Question)
+        return updated
+
     @property
     def cooldown_days(self):
         """Get the cooldown period from settings, with a default of 60 days."""
@@ -252,7 +287,31 @@ class Survey(models.Model):
                 )
         return False, None
 
-class Question(models.Model):
+def question_text_hash(text):
+    """SHA-256 of ``text`` after Unicode (NFC) normalization and whitespace collapsing."""
+    normalized = ' '.join(unicodedata.normalize('NFC', text).split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class QuestionTextHashMixin:
+    """
+    Keeps the indexed ``text_hash`` column in step with ``question_text``.
+
+    Questions are deduplicated by text (see ``surveys.docx_import``, which looks
+    them up with ``text_hash__in``); matching on the hash uses the index instead
+    of comparing unindexed ``TextField`` values.
+    ``bulk_create``/``update()`` callers must set ``text_hash`` themselves.
+    """
+
+    def save(self, *args, **kwargs):
+        self.text_hash = question_text_hash(self.question_text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'question_text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'text_hash'}
+        super().save(*args, **kwargs)
+
+
+class Question(QuestionTextHashMixin, models.Model):
     QUESTION_TYPES = (
         ('text', 'Text Answer'),
         ('single_choice', 'Single Choice'),
@@ -261,6 +320,7 @@ class Question(models.Model):
     )
     surveys = models.ManyToManyField(Survey, related_name='questions', blank=True)
     question_text = models.TextField()
+    text_hash = models.CharField(max_length=64, db_index=True, editable=False, blank=True)
     question_type = models.CharField(max_length=20, choices=QUESTION_TYPES)
     is_required = models.BooleanField(default=True)
     order = models.PositiveIntegerField(default=0)
@@ -317,6 +377,8 @@ class SurveyResponse(models.Model):
 
     class Meta:
         ordering = ['-started_at']
+        # Serves the API's newest-first cursor pages of a user's responses
+        indexes = [models.Index(fields=['user', '-started_at', '-id'], name='surveys_resp_user_started_idx')]
         verbose_name = 'Survey Response'
         verbose_name_plural = 'Survey Responses'
 
@@ -362,7 +424,7 @@ class Poll(models.Model):
         return False
 
 
-class PollQuestion(models.Model):
+class PollQuestion(QuestionTextHashMixin, models.Model):
     QUESTION_TYPES = (
         ('text', 'Text Answer'),
         ('single_choice', 'Single Choice'),
@@ -371,6 +433,7 @@ class PollQuestion(models.Model):
     )
     poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='questions')
     question_text = models.TextField()
+    text_hash = models.CharField(max_length=64, db_index=True, editable=False, blank=True)
     question_type = models.CharField(max_length=20, choices=QUESTION_TYPES)
     is_required = models.BooleanField(default=True)
     order = models.PositiveIntegerField(default=0)
@@ -620,6 +683,8 @@ class LuckyDrawEntry(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # Serves the API's newest-first cursor pages of a user's entries
+        indexes = [models.Index(fields=['user', '-created_at', '-id'], name='surveys_draw_user_created_idx')]
         verbose_name_plural = 'Lucky Draw Entries'
 
     def __str__(self):
@@ -1143,3 +1208,238 @@ class AboutUs(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class SearchEntry(models.Model):
+    """Denormalized search document for one category, survey, question, poll or poll question.
+
+    Rows are rebuilt by ``surveys.search`` whenever the source object changes. On
+    Postgres ``search_vector`` is filled from title (A), description (B) and
+    keywords (C) and indexed with GIN (see migration 0029).
+    """
+    TYPE_CATEGORY = 'category'
+    TYPE_SURVEY = 'survey'
+    TYPE_QUESTION = 'question'
+    TYPE_POLL = 'poll'
+    TYPE_POLL_QUESTION = 'poll_question'
+    OBJECT_TYPES = (
+        (TYPE_CATEGORY, 'Category'),
+        (TYPE_SURVEY, 'Survey'),
+        (TYPE_QUESTION, 'Survey Question'),
+        (TYPE_POLL, 'Poll'),
+        (TYPE_POLL_QUESTION, 'Poll Question'),
+    )
+
+    object_type = models.CharField(max_length=20, choices=OBJECT_TYPES)
+    object_id = models.PositiveBigIntegerField()
+    country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name='search_entries')
+    title = models.TextField()
+    description = models.TextField(blank=True)
+    keywords = models.TextField(blank=True)
+    url = models.CharField(max_length=500)
+    is_public = models.BooleanField(default=False, help_text='Shown to anonymous visitors')
+    search_vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['object_type', 'object_id'], name='surveys_search_object_idx'),
+        ]
+        verbose_name = 'Search Entry'
+        verbose_name_plural = 'Search Entries'
+
+    def __str__(self):
+        return f"{self.get_object_type_display()}: {self.title[:50]}"
+
+
+class CatalogChange(models.Model):
+    """One entry in the catalog change log used for client delta sync.
+
+    Written by ``surveys.catalog_changes`` whenever a category, survey, question,
+    choice, poll, poll question or poll choice is saved or deleted. There is one
+    row per country the object is visible in. ``id`` is the catalog version that
+    clients pass back as ``since``, and upserts carry the object's payload.
+    """
+    TYPE_CATEGORY = 'category'
+    TYPE_SURVEY = 'survey'
+    TYPE_QUESTION = 'question'
+    TYPE_CHOICE = 'choice'
+    TYPE_POLL = 'poll'
+    TYPE_POLL_QUESTION = 'poll_question'
+    TYPE_POLL_CHOICE = 'poll_choice'
+    OBJECT_TYPES = (
+        (TYPE_CATEGORY, 'Category'),
+        (TYPE_SURVEY, 'Survey'),
+        (TYPE_QUESTION, 'Survey Question'),
+        (TYPE_CHOICE, 'Survey Choice'),
+        (TYPE_POLL, 'Poll'),
+        (TYPE_POLL_QUESTION, 'Poll Question'),
+        (TYPE_POLL_CHOICE, 'Poll Choice'),
+    )
+    ACTION_UPSERT = 'upsert'
+    ACTION_DELETE = 'delete'
+    ACTIONS = (
+        (ACTION_UPSERT, 'Upsert'),
+        (ACTION_DELETE, 'Delete'),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name='catalog_changes')
+    object_type = models.CharField(max_length=20, choices=OBJECT_TYPES)
+    object_id = models.PositiveBigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    data = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['country', 'id'], name='surveys_catchange_country_idx')]
+        verbose_name = 'Catalog Change'
+        verbose_name_plural = 'Catalog Changes'
+
+    def __str__(self):
+        return f"#{self.pk} {self.action} {self.object_type} {self.object_id}"
+
+
+class DailySurveyStats(models.Model):
+    """Completed survey responses per day and survey; filled by ``surveys.rollups``."""
+    date = models.DateField()
+    country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name='+')
+    category = models.ForeignKey(SurveyCategory, on_delete=models.CASCADE, related_name='+')
+    survey = models.ForeignKey(Survey, on_delete=models.CASCADE, related_name='daily_stats')
+    completions = models.PositiveIntegerField(default=0)
+    unique_users = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('date', 'survey')
+        indexes = [models.Index(fields=['date', 'country'], name='surveys_dss_date_country_idx')]
+        verbose_name = 'Daily Survey Stats'
+        verbose_name_plural = 'Daily Survey Stats'
+
+    def __str__(self):
+        return f"{self.date} - survey {self.survey_id}: {self.completions}"
+
+
+class DailyPollStats(models.Model):
+    """Poll responses per day and poll; filled by ``surveys.rollups``."""
+    date = models.DateField()
+    country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name='+')
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='daily_stats')
+    responses = models.PositiveIntegerField(default=0)
+    unique_users = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('date', 'poll')
+        indexes = [models.Index(fields=['date', 'country'], name='surveys_dps_date_country_idx')]
+        verbose_name = 'Daily Poll Stats'
+        verbose_name_plural = 'Daily Poll Stats'
+
+    def __str__(self):
+        return f"{self.date} - poll {self.poll_id}: {self.responses}"
+
+
+class DailyLuckyDrawStats(models.Model):
+    """Lucky draw plays and wins per day and qualifying survey or poll; filled by ``surveys.rollups``."""
+    date = models.DateField()
+    country = models.ForeignKey(Country, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    draw_type = models.CharField(max_length=10, choices=LuckyDrawEntry.DRAW_TYPE_CHOICES)
+    survey = models.ForeignKey(Survey, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    plays = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    unique_users = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=['date', 'country'], name='surveys_dls_date_country_idx')]
+        verbose_name = 'Daily Lucky Draw Stats'
+        verbose_name_plural = 'Daily Lucky Draw Stats'
+
+    def __str__(self):
+        return f"{self.date} - {self.draw_type}: {self.plays} plays, {self.wins} wins"
+
+
+class DailyWalletStats(models.Model):
+    """Wallet credits and debits per day, country and currency; filled by ``surveys.rollups``."""
+    date = models.DateField()
+    country = models.ForeignKey(Country, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    transaction_type = models.CharField(max_length=10, choices=WalletTransaction.TRANSACTION_TYPE_CHOICES)
+    currency_code = models.CharField(max_length=10)
+    transactions = models.PositiveIntegerField(default=0)
+    unique_users = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=['date', 'country'], name='surveys_dws_date_country_idx')]
+        verbose_name = 'Daily Wallet Stats'
+        verbose_name_plural = 'Daily Wallet Stats'
+
+    def __str__(self):
+        return f"{self.date} - {self.transaction_type} {self.amount} {self.currency_code}"
+
+
+class ImportManifest(models.Model):
+    """Content hash of an imported source file, so unchanged files are skipped on re-import.
+
+    Written by ``surveys.import_manifest`` for ``manage.py import_survey_docx``
+    and ``upload_journals.py``. ``object_ids`` lists the rows the file produced.
+    A new ``importer_version`` makes every file count as changed again.
+    """
+    IMPORTER_SURVEY_DOCX = 'survey_docx'
+    IMPORTER_JOURNAL = 'journal'
+    IMPORTERS = (
+        (IMPORTER_SURVEY_DOCX, 'Survey DOCX'),
+        (IMPORTER_JOURNAL, 'Journal'),
+    )
+
+    importer = models.CharField(max_length=20, choices=IMPORTERS)
+    source = models.CharField(max_length=255, help_text='File name; survey imports prefix it with the country code.')
+    content_hash = models.CharField(max_length=64)
+    importer_version = models.PositiveIntegerField()
+    object_ids = models.JSONField(default=dict, blank=True)
+    imported_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('importer', 'source')
+        verbose_name = 'Import Manifest'
+        verbose_name_plural = 'Import Manifests'
+
+    def __str__(self):
+        return f"{self.importer}: {self.source}"
+
+
+class EmailOutbox(models.Model):
+    """An email waiting to be sent (or already sent) by ``manage.py run_email_worker``.
+
+    Rows are written by the ``surveys.emails`` functions once the caller's
+    transaction commits, so request handlers never wait on SMTP. See
+    ``surveys.email_outbox`` for claiming, sending and retries.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUSES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    subject = models.CharField(max_length=998)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUSES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'], name='surveys_outbox_due_idx')]
+        verbose_name = 'Email Outbox'
+        verbose_name_plural = 'Email Outbox'
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
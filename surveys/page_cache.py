@@ -0,0 +1,129 @@
+"""Full-page cache for anonymous visitors on public pages.
+
+Apply ``cache_anonymous_page`` to a view (``method_decorator(..., name='dispatch')``
+for class-based views). Anonymous GET requests without a session or messages
+cookie are answered straight from the cache, before the view or any context
+processor runs, so crawler and landing traffic does not touch the ORM.
+
+Cache keys vary only on the path (with query string) and a cheap country hint
+taken from a request header set by the CDN/proxy. Rendered responses are not
+stored when they set cookies (including a fresh CSRF token), are not 200, or
+were produced for a request that carried state. Cached pages keep their ETag and
+Last-Modified headers, so revalidation is answered from the cache as well.
+
+``invalidate_page_cache()`` bumps the ``pages`` version so every stored page is
+skipped on the next request; ``surveys.signals`` calls it on content changes.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from .versioning import bump_version, get_version
+
+PAGES = 'pages'
+
+DEFAULT_CONFIG = {
+    'ENABLED': True,
+    'TIMEOUT': 60 * 5,
+    # request.META key holding a two-letter country code (e.g. Cloudflare's CF-IPCountry)
+    'COUNTRY_HEADER': 'HTTP_CF_IPCOUNTRY',
+}
+
+CACHED_HEADERS = ('Content-Type', 'Content-Language', 'X-Frame-Options', 'ETag', 'Last-Modified')
+
+
+def get_config():
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'PAGE_CACHE', {}) or {})
+    return config
+
+
+def get_country_hint(request, config=None):
+    config = config or get_config()
+    value = request.META.get(config['COUNTRY_HEADER'], '').strip().upper()
+    return value if len(value) == 2 and value.isalpha() else 'XX'
+
+
+def page_cache_key(request, config=None):
+    path_hash = hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest()
+    return f'surveys:page:v{get_version(PAGES)}:{get_country_hint(request, config)}:{path_hash}'
+
+
+def invalidate_page_cache():
+    """Drop every cached anonymous page (they are skipped from the next request on)."""
+    return bump_version(PAGES)
+
+
+def is_cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    # A session or pending messages mean per-visitor output; never serve or store those
+    if settings.SESSION_COOKIE_NAME in request.COOKIES or 'messages' in request.COOKIES:
+        return False
+    user = getattr(request, 'user', None)
+    return not (user is not None and user.is_authenticated)
+
+
+def is_cacheable_response(request, response):
+    if response.status_code != 200 or response.streaming:
+        return False
+    if response.cookies or request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+        return False
+    return not response.has_header('Cache-Control') or 'private' not in response['Cache-Control']
+
+
+def _store(request, key, response, timeout):
+    if not is_cacheable_response(request, response):
+        return
+    cache.set(key, {
+        'content': response.content,
+        'headers': {name: response[name] for name in CACHED_HEADERS if response.has_header(name)},
+    }, timeout)
+
+
+def _cached_response(request, entry):
+    headers = entry['headers']
+    not_modified = get_conditional_response(
+        request,
+        etag=headers.get('ETag'),
+        last_modified=parse_http_date_safe(headers.get('Last-Modified', '')),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    response = HttpResponse(entry['content'])
+    for name, value in entry['headers'].items():
+        response[name] = value
+    response['X-Page-Cache'] = 'hit'
+    return response
+
+
+def cache_anonymous_page(view_func):
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        config = get_config()
+        if not config['ENABLED'] or not is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+
+        key = page_cache_key(request, config)
+        entry = cache.get(key)
+        if entry is not None:
+            return _cached_response(request, entry)
+
+        response = view_func(request, *args, **kwargs)
+        if request.method == 'GET':
+            if callable(getattr(response, 'render', None)) and not response.is_rendered:
+                response.add_post_render_callback(
+                    lambda rendered: _store(request, key, rendered, config['TIMEOUT'])
+                )
+            else:
+                _store(request, key, response, config['TIMEOUT'])
+        response['X-Page-Cache'] = 'miss'
+        return response
+
+    return _wrapped_view
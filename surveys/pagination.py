@@ -0,0 +1,21 @@
+"""Pagination classes for the REST API."""
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedCursorPagination(CursorPagination):
+    """Newest-first cursor pages on ``(created_at, id)``.
+
+    Unlike page numbers, a cursor page is a range query on an index: no
+    ``OFFSET`` scan and no ``COUNT(*)``, and rows inserted while a client pages
+    do not shift later pages. Viewsets whose model has no ``created_at`` set
+    ``cursor_ordering`` (e.g. ``('-date_joined', '-id')``). Each ordering needs
+    a matching index, led by the viewset's filter column where it has one
+    (e.g. ``(user, -started_at, -id)`` on ``SurveyResponse``).
+    """
+
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        return getattr(view, 'cursor_ordering', self.ordering)
@@ -0,0 +1,66 @@
+"""Paginators for very large tables.
+
+``EstimatedCountPaginator`` avoids exact ``COUNT(*)`` scans on Postgres. An
+unfiltered queryset is counted from the planner statistics in
+``pg_class.reltuples``, and a filtered one from the ``EXPLAIN`` row estimate,
+whenever the estimate is above ``estimate_threshold``. Below the threshold (and
+on other databases) the exact count is used, and it is cached for
+``count_cache_timeout`` seconds, because the admin asks for the same filtered
+count on every page of a changelist.
+
+Use it together with ``show_full_result_count = False`` on the ModelAdmin, so
+the changelist does not run a second, unfiltered ``COUNT(*)``.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models.query import QuerySet
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    estimate_threshold = 100_000
+    count_cache_timeout = 60
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        estimate = self.estimate_count(queryset)
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return self.cached_exact_count(queryset)
+
+    def estimate_count(self, queryset):
+        """Planner row estimate for ``queryset``, or None where no estimate is available."""
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [connection.ops.quote_name(queryset.model._meta.db_table)],
+                )
+                row = cursor.fetchone()
+                # reltuples is -1 (or 0) until the table has been vacuumed/analyzed
+                return row[0] if row and row[0] > 0 else None
+
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def cached_exact_count(self, queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        digest = hashlib.md5(f'{queryset.db}:{sql}:{params!r}'.encode('utf-8')).hexdigest()
+        key = f'surveys:count:{digest}'
+        total = cache.get(key)
+        if total is None:
+            total = queryset.count()
+            cache.set(key, total, self.count_cache_timeout)
+        return total
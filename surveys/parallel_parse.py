@@ -0,0 +1,54 @@
+"""Parse import documents in worker processes.
+
+python-docx parsing is CPU bound and dominates import time, so the importers
+(``manage.py import_survey_docx``, ``upload_journals.py``) run their parse stage
+through ``parse_files()``. It maps a module-level parse function over the paths
+in a ``ProcessPoolExecutor`` and returns the results in input order. The parse
+functions return plain dicts and tuples, which are cheap to send back. The
+database write stage stays in the calling process.
+
+Workers run ``django.setup()`` first, so parse functions may live in modules
+that import models; this matters on platforms that spawn rather than fork.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+
+
+def default_jobs():
+    return os.cpu_count() or 1
+
+
+def parse_files(parse, paths, jobs=None):
+    """
+    Return ``([parse(path) for path in paths], stats)``.
+
+    ``jobs`` is the worker count (default: one per CPU); with one job, or one
+    file, everything runs in this process. ``stats`` has the ``documents``,
+    ``jobs``, ``seconds`` and ``per_second`` of the run.
+    """
+    paths = list(paths)
+    jobs = max(1, min(jobs or default_jobs(), len(paths)))
+    started = time.perf_counter()
+    if jobs == 1:
+        results = [parse(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=django.setup) as pool:
+            # A few chunks per worker keeps them busy without one task per file
+            results = list(pool.map(parse, paths, chunksize=max(1, len(paths) // (jobs * 4))))
+    seconds = time.perf_counter() - started
+    return results, {
+        'documents': len(paths),
+        'jobs': jobs,
+        'seconds': seconds,
+        'per_second': len(paths) / seconds if seconds else 0.0,
+    }
+
+
+def format_stats(stats):
+    return (
+        f"Parsed {stats['documents']} documents in {stats['seconds']:.2f}s "
+        f"({stats['per_second']:.1f} documents/s, {stats['jobs']} worker{'s' if stats['jobs'] != 1 else ''})"
+    )
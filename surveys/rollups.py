@@ -0,0 +1,204 @@
+"""Daily fact tables for reporting.
+
+Each rollup groups one raw table by day (in ``settings.TIME_ZONE``) and key:
+
+- ``surveys``: completed ``SurveyResponse`` rows per survey, giving ``DailySurveyStats``
+- ``polls``: ``PollResponse`` rows per poll, giving ``DailyPollStats``
+- ``lucky_draws``: ``LuckyDrawEntry`` plays and wins per qualifying survey or poll,
+  giving ``DailyLuckyDrawStats``
+- ``wallet``: ``WalletTransaction`` credits and debits per country and currency,
+  giving ``DailyWalletStats``
+
+A run covers a window of whole days. For each rollup it deletes the fact rows in
+the window and refills them with a single ``INSERT INTO ... SELECT ... GROUP BY``
+built from an ORM queryset. No raw rows pass through Python, and re-running a
+window gives the same result. ``rollup_incremental()`` starts from the latest
+day already rolled up, which may have been partial, and runs through today.
+Rows can also arrive for older days: batch survey submissions carry the
+client's ``completed_at``, up to one cooldown period back (see
+``surveys.batch_responses``). The ``surveys`` rollup therefore always re-rolls
+at least that many days.
+``manage.py rollup_daily_stats`` runs it from cron.
+
+``unique_users`` counts distinct users within one day. It cannot be summed
+across days.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import (
+    DailyLuckyDrawStats, DailyPollStats, DailySurveyStats, DailyWalletStats,
+    LuckyDrawEntry, PollResponse, SurveyResponse, WalletTransaction,
+)
+
+
+class Rollup:
+    """One fact table and the grouped source query that fills it.
+
+    ``columns`` maps each name selected by the source query to the fact field it fills.
+    Every selected value must carry one of those names as its alias (plain fields
+    are selected as ``values(name=F(path))``): the ``INSERT`` column list is read
+    from the compiled ``SELECT``, so it cannot depend on the order in which
+    Django emits fields and annotations.
+    ``lookback_days``, if given, returns how many days before today source rows
+    may still be added; incremental runs re-roll that window.
+    """
+
+    def __init__(self, name, model, source_model, timestamp_field, build, columns, lookback_days=None):
+        self.name = name
+        self.model = model
+        self.source_model = source_model
+        self.timestamp_field = timestamp_field
+        self.build = build
+        self.columns = columns
+        self.lookback_days = lookback_days
+
+    def source(self, start, end):
+        rows = self.source_model.objects.filter(**{
+            f'{self.timestamp_field}__gte': start,
+            f'{self.timestamp_field}__lt': end,
+        }).annotate(day=TruncDate(self.timestamp_field))
+        return self.build(rows).order_by()
+
+    def first_day(self):
+        first = self.source_model.objects.aggregate(first=Min(self.timestamp_field))['first']
+        return timezone.localdate(first) if first else None
+
+    def last_rolled_up_day(self):
+        return self.model.objects.aggregate(last=Max('date'))['last']
+
+    def run(self, start_day, end_day):
+        """Rebuild the facts for ``start_day`` up to, but excluding, ``end_day``."""
+        start, end = _day_start(start_day), _day_start(end_day)
+        using = router.db_for_write(self.model)
+        connection = connections[using]
+        compiler = self.source(start, end).query.get_compiler(using=using)
+        sql, params = compiler.as_sql()
+        selected = [alias for _, _, alias in compiler.select]
+        if None in selected or sorted(selected) != sorted(self.columns):
+            raise ImproperlyConfigured(
+                f'Rollup {self.name!r} selects {selected}; every column of {sorted(self.columns)} '
+                f'must be selected once under its alias.'
+            )
+        fields = [self.model._meta.get_field(self.columns[name]) for name in selected]
+
+        quote = connection.ops.quote_name
+        insert = 'INSERT INTO {} ({}) {}'.format(
+            quote(self.model._meta.db_table),
+            ', '.join(quote(field.column) for field in fields),
+            sql,
+        )
+        with transaction.atomic(using=using):
+            self.model.objects.using(using).filter(date__gte=start_day, date__lt=end_day).delete()
+            with connection.cursor() as cursor:
+                cursor.execute(insert, params)
+                return cursor.rowcount
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _backdated_completion_days():
+    # Batch submissions accept completed_at up to one cooldown period in the past
+    return getattr(settings, 'SURVEY_CONFIG', {}).get('DEFAULT_COOLDOWN_DAYS', 60)
+
+
+ROLLUPS = (
+    Rollup(
+        'surveys', DailySurveyStats, SurveyResponse, 'completed_at',
+        lambda rows: rows.values(
+            'day', survey_key=F('survey_id'), category_key=F('survey__category_id'),
+            country_key=F('survey__category__country_id'),
+        ).annotate(
+            completions=Count('pk'),
+            unique_users=Count('user_id', distinct=True),
+        ),
+        {
+            'day': 'date', 'survey_key': 'survey', 'category_key': 'category', 'country_key': 'country',
+            'completions': 'completions', 'unique_users': 'unique_users',
+        },
+        lookback_days=_backdated_completion_days,
+    ),
+    Rollup(
+        'polls', DailyPollStats, PollResponse, 'submitted_at',
+        lambda rows: rows.values('day', poll_key=F('poll_id'), country_key=F('poll__country_id')).annotate(
+            responses=Count('pk'),
+            unique_users=Count('user_id', distinct=True),
+        ),
+        {
+            'day': 'date', 'poll_key': 'poll', 'country_key': 'country',
+            'responses': 'responses', 'unique_users': 'unique_users',
+        },
+    ),
+    Rollup(
+        'lucky_draws', DailyLuckyDrawStats, LuckyDrawEntry, 'created_at',
+        lambda rows: rows.annotate(
+            country_key=Coalesce('survey__category__country_id', 'poll__country_id'),
+        ).values(
+            'day', 'country_key', draw_type_key=F('draw_type'), survey_key=F('survey_id'), poll_key=F('poll_id'),
+        ).annotate(
+            plays=Count('pk'),
+            wins=Count('pk', filter=Q(is_winner=True)),
+            unique_users=Count('user_id', distinct=True),
+        ),
+        {
+            'day': 'date', 'draw_type_key': 'draw_type', 'survey_key': 'survey', 'poll_key': 'poll',
+            'country_key': 'country', 'plays': 'plays', 'wins': 'wins', 'unique_users': 'unique_users',
+        },
+    ),
+    Rollup(
+        'wallet', DailyWalletStats, WalletTransaction, 'created_at',
+        lambda rows: rows.values(
+            'day', country_key=F('profile__country_id'), transaction_type_key=F('transaction_type'),
+            currency_code_key=F('currency_code'),
+        ).annotate(
+            transactions=Count('pk'),
+            unique_users=Count('profile_id', distinct=True),
+            total=Sum('amount'),
+        ),
+        {
+            'day': 'date', 'country_key': 'country', 'transaction_type_key': 'transaction_type',
+            'currency_code_key': 'currency_code', 'transactions': 'transactions',
+            'unique_users': 'unique_users', 'total': 'amount',
+        },
+    ),
+)
+ROLLUPS_BY_NAME = {rollup.name: rollup for rollup in ROLLUPS}
+
+
+def _selected(names):
+    if not names:
+        return ROLLUPS
+    return [ROLLUPS_BY_NAME[name] for name in names]
+
+
+def rollup_range(start_day, end_day, names=None):
+    """Rebuild facts for ``start_day``..``end_day`` inclusive; returns rows written per rollup."""
+    return {
+        rollup.name: rollup.run(start_day, end_day + timedelta(days=1))
+        for rollup in _selected(names)
+    }
+
+
+def rollup_incremental(names=None, today=None):
+    """Roll up everything since the last (possibly partial) day of each fact table.
+
+    Rollups with a ``lookback_days`` window also re-roll that many days before today.
+    """
+    today = today or timezone.localdate()
+    written = {}
+    for rollup in _selected(names):
+        start_day = rollup.last_rolled_up_day()
+        if start_day is None:
+            start_day = rollup.first_day()
+        elif rollup.lookback_days:
+            start_day = min(start_day, today - timedelta(days=rollup.lookback_days()))
+        written[rollup.name] = rollup.run(start_day, today + timedelta(days=1)) if start_day else 0
+    return written
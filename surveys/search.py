@@ -0,0 +1,262 @@
+"""Full-text site search backed by ``SearchEntry`` rows.
+
+Each searchable object (category, active survey, question of an active survey,
+active poll and its questions) is flattened into one ``SearchEntry`` per
+country. Signal handlers in ``surveys.signals`` call the ``reindex_*`` functions
+when the source objects change; ``manage.py rebuild_search_index`` rebuilds
+everything.
+
+On Postgres the entries carry a weighted ``SearchVector`` with a GIN index and
+``search_entries`` returns ranked, mixed-type results in a single query. Other
+backends (the SQLite test runs) keep using the ``icontains`` queries in
+``SearchView``; ``uses_search_index()`` tells the view which path to take.
+
+Any change to the entries bumps the ``search`` version once the transaction
+commits, which is what keeps the in-process type-ahead index
+(``surveys.typeahead``) in step across workers.
+"""
+import re
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.urls import reverse
+
+from .models import Poll, PollQuestion, Question, SearchEntry, Survey, SurveyCategory
+from .versioning import SEARCH, bump_version
+
+SEARCH_CONFIG = 'english'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+TYPE_LABELS = dict(SearchEntry.OBJECT_TYPES)
+
+
+def uses_search_index():
+    return connections[router.db_for_write(SearchEntry)].vendor == 'postgresql'
+
+
+def _search_vector():
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('keywords', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def _entries_changed():
+    # Bumped after commit so other workers never rebuild from uncommitted rows
+    transaction.on_commit(lambda: bump_version(SEARCH))
+
+
+def _replace_entries(object_type, ids, entries):
+    ids = list(ids)
+    if not ids:
+        return 0
+    _entries_changed()
+    SearchEntry.objects.filter(object_type=object_type, object_id__in=ids).delete()
+    SearchEntry.objects.bulk_create(entries)
+    if entries and uses_search_index():
+        SearchEntry.objects.filter(object_type=object_type, object_id__in=ids).update(
+            search_vector=_search_vector()
+        )
+    return len(entries)
+
+
+def _category_entries(categories):
+    return [
+        SearchEntry(
+            object_type=SearchEntry.TYPE_CATEGORY,
+            object_id=category.id,
+            country_id=category.country_id,
+            title=category.name,
+            description=category.description or '',
+            url=reverse('surveys:category_detail', kwargs={'category_slug': category.slug}),
+            is_public=True,
+        )
+        for category in categories
+    ]
+
+
+def _survey_entries(surveys):
+    return [
+        SearchEntry(
+            object_type=SearchEntry.TYPE_SURVEY,
+            object_id=survey.id,
+            country_id=survey.category.country_id,
+            title=survey.name,
+            description=survey.description or f'{survey.category.name} - Level {survey.level}',
+            keywords=survey.category.name,
+            url=reverse('surveys:survey_detail', kwargs={'survey_id': survey.id}),
+        )
+        for survey in surveys
+    ]
+
+
+def _question_entries(questions):
+    entries = []
+    for question in questions:
+        # One entry per country the question is used in, pointing at its first active survey there
+        by_country = defaultdict(list)
+        for survey in question.surveys.all():
+            if survey.is_active:
+                by_country[survey.category.country_id].append(survey)
+        for country_id, surveys in by_country.items():
+            entries.append(SearchEntry(
+                object_type=SearchEntry.TYPE_QUESTION,
+                object_id=question.id,
+                country_id=country_id,
+                title=question.question_text,
+                description=surveys[0].name,
+                keywords=' '.join(survey.name for survey in surveys),
+                url=reverse('surveys:survey_detail', kwargs={'survey_id': surveys[0].id}),
+            ))
+    return entries
+
+
+def _poll_entries(polls):
+    return [
+        SearchEntry(
+            object_type=SearchEntry.TYPE_POLL,
+            object_id=poll.id,
+            country_id=poll.country_id,
+            title=poll.title,
+            description=poll.description or str(poll.country),
+            keywords=poll.country.name,
+            url=reverse('surveys:poll_detail', kwargs={'poll_id': poll.id}),
+            is_public=True,
+        )
+        for poll in polls
+    ]
+
+
+def _poll_question_entries(questions):
+    return [
+        SearchEntry(
+            object_type=SearchEntry.TYPE_POLL_QUESTION,
+            object_id=question.id,
+            country_id=question.poll.country_id,
+            title=question.question_text,
+            description=question.poll.title,
+            keywords=question.poll.title,
+            url=reverse('surveys:poll_detail', kwargs={'poll_id': question.poll_id}),
+        )
+        for question in questions
+    ]
+
+
+def reindex_questions(ids):
+    ids = list(ids)
+    questions = Question.objects.filter(pk__in=ids).prefetch_related('surveys__category')
+    return _replace_entries(SearchEntry.TYPE_QUESTION, ids, _question_entries(questions))
+
+
+def reindex_surveys(ids):
+    ids = list(ids)
+    surveys = Survey.objects.filter(pk__in=ids, is_active=True).select_related('category')
+    count = _replace_entries(SearchEntry.TYPE_SURVEY, ids, _survey_entries(surveys))
+    question_ids = Question.surveys.through.objects.filter(survey_id__in=ids).values_list(
+        'question_id', flat=True
+    )
+    return count + reindex_questions(set(question_ids))
+
+
+def reindex_categories(ids):
+    ids = list(ids)
+    categories = SurveyCategory.objects.filter(pk__in=ids)
+    count = _replace_entries(SearchEntry.TYPE_CATEGORY, ids, _category_entries(categories))
+    survey_ids = Survey.objects.filter(category_id__in=ids).values_list('id', flat=True)
+    return count + reindex_surveys(survey_ids)
+
+
+def reindex_poll_questions(ids):
+    ids = list(ids)
+    questions = PollQuestion.objects.filter(pk__in=ids, poll__is_active=True).select_related('poll')
+    return _replace_entries(SearchEntry.TYPE_POLL_QUESTION, ids, _poll_question_entries(questions))
+
+
+def reindex_polls(ids):
+    ids = list(ids)
+    polls = Poll.objects.filter(pk__in=ids, is_active=True).select_related('country')
+    count = _replace_entries(SearchEntry.TYPE_POLL, ids, _poll_entries(polls))
+    question_ids = PollQuestion.objects.filter(poll_id__in=ids).values_list('id', flat=True)
+    return count + reindex_poll_questions(question_ids)
+
+
+REINDEXERS = {
+    SurveyCategory: reindex_categories,
+    Survey: reindex_surveys,
+    Question: reindex_questions,
+    Poll: reindex_polls,
+    PollQuestion: reindex_poll_questions,
+}
+
+
+def reindex_instance(instance):
+    return REINDEXERS[type(instance)]([instance.pk])
+
+
+def rebuild_index(batch_size=500):
+    """Rebuild every entry from scratch; returns the number of entries per object type."""
+    SearchEntry.objects.all().delete()
+    sources = (
+        (SearchEntry.TYPE_CATEGORY, SurveyCategory.objects.all(), _category_entries),
+        (SearchEntry.TYPE_SURVEY, Survey.objects.filter(is_active=True).select_related('category'), _survey_entries),
+        (SearchEntry.TYPE_QUESTION, Question.objects.filter(surveys__is_active=True).distinct()
+            .prefetch_related('surveys__category'), _question_entries),
+        (SearchEntry.TYPE_POLL, Poll.objects.filter(is_active=True).select_related('country'), _poll_entries),
+        (SearchEntry.TYPE_POLL_QUESTION, PollQuestion.objects.filter(poll__is_active=True)
+            .select_related('poll'), _poll_question_entries),
+    )
+    counts = {}
+    for object_type, queryset, build in sources:
+        entries = build(queryset.order_by('pk'))
+        SearchEntry.objects.bulk_create(entries, batch_size=batch_size)
+        counts[object_type] = len(entries)
+    if uses_search_index():
+        SearchEntry.objects.update(search_vector=_search_vector())
+    _entries_changed()
+    return counts
+
+
+def build_search_query(query):
+    """Prefix-match every word of ``query`` (``surv heal`` matches "Health Survey")."""
+    tokens = TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return None
+    return SearchQuery(' & '.join(f'{token}:*' for token in tokens), search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_entries(query, country_id=None, public_only=False, limit=50):
+    """Return ranked result dicts (type/title/description/url) for ``query`` in one query."""
+    search_query = build_search_query(query)
+    if search_query is None:
+        return []
+
+    entries = SearchEntry.objects.filter(search_vector=search_query)
+    if public_only:
+        entries = entries.filter(is_public=True)
+    if country_id:
+        entries = entries.filter(country_id=country_id)
+    entries = entries.annotate(
+        rank=SearchRank(F('search_vector'), search_query),
+    ).order_by('-rank', 'object_type', 'title').values('object_type', 'title', 'description', 'url')
+
+    results = []
+    seen = set()
+    # Over-fetch so questions indexed for several countries can be collapsed without running short
+    for entry in entries[:limit * 2]:
+        key = (entry['object_type'], entry['url'], entry['title'])
+        if key in seen:
+            continue
+        seen.add(key)
+        results.append({
+            'type': TYPE_LABELS[entry['object_type']],
+            'title': entry['title'],
+            'description': entry['description'],
+            'url': entry['url'],
+        })
+        if len(results) == limit:
+            break
+    return results
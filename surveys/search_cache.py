@@ -0,0 +1,97 @@
+"""In-process LRU/TTL cache for site search results.
+
+Search traffic is dominated by a handful of queries from a handful of countries,
+so ``SearchView`` keeps recent result lists per worker, keyed by the normalized
+query, the searcher's country id and whether they are signed in. Keys also carry
+the catalog version (``surveys.versioning``), so any category, survey, question
+or poll change makes older entries unreachable; they then age out of the LRU.
+
+Hits and misses are counted through ``surveys.instrumentation.incr``.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from . import instrumentation
+from .versioning import CATALOG, get_version
+
+DEFAULT_CONFIG = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 1000,
+    'TIMEOUT': 60 * 5,
+}
+
+
+def get_config():
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'SEARCH_RESULT_CACHE', {}) or {})
+    return config
+
+
+class ResultCache:
+    """Thread-safe LRU mapping whose entries also expire after ``timeout`` seconds."""
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_config = get_config()
+result_cache = ResultCache(_config['MAX_ENTRIES'], _config['TIMEOUT'])
+
+
+def normalize_query(query):
+    return ' '.join(query.lower().split())
+
+
+def get_cached_results(query, country_id, authenticated, compute):
+    """
+    Return cached results for the search, calling ``compute(normalized_query)`` on a miss.
+
+    Results are computed from the same normalized query the entry is keyed on,
+    so every spelling that shares a key gets the same results.
+    """
+    query = normalize_query(query)
+    if not get_config()['ENABLED']:
+        return compute(query)
+
+    key = (get_version(CATALOG), query, country_id, bool(authenticated))
+    results = result_cache.get(key)
+    if results is not None:
+        instrumentation.incr('search_cache.hit')
+        return list(results)
+
+    instrumentation.incr('search_cache.miss')
+    results = compute(query)
+    result_cache.set(key, tuple(results))
+    return results
@@ -5,8 +5,9 @@ from .models import (
     SurveyCategory, Survey, Question, 
     Choice, SurveyResponse, Answer, LuckyDrawEntry
 )
+from .sparse_fields import SparseFieldsetsMixin
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name')
@@ -18,7 +19,7 @@ class ChoiceSerializer(serializers.ModelSerializer):
         fields = ('id', 'choice_text')
         read_only_fields = ('id',)
 
-class QuestionSerializer(serializers.ModelSerializer):
+class QuestionSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     choices = ChoiceSerializer(many=True, read_only=True)
     
     class Meta:
@@ -26,13 +27,13 @@ class QuestionSerializer(serializers.ModelSerializer):
         fields = ('id', 'question_text', 'question_type', 'is_required', 'order', 'choices')
         read_only_fields = ('id',)
 
-class SurveyCategorySerializer(serializers.ModelSerializer):
+class SurveyCategorySerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = SurveyCategory
         fields = ('id', 'name', 'description')
         read_only_fields = ('id',)
 
-class SurveySerializer(serializers.ModelSerializer):
+class SurveySerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     questions = QuestionSerializer(many=True, read_only=True)
     category = SurveyCategorySerializer(read_only=True)
     category_id = serializers.PrimaryKeyRelatedField(
@@ -86,7 +87,7 @@ class AnswerSerializer(serializers.ModelSerializer):
         
         return data
 
-class SurveyResponseSerializer(serializers.ModelSerializer):
+class SurveyResponseSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     answers = AnswerSerializer(many=True, required=True)
     survey_id = serializers.PrimaryKeyRelatedField(
         queryset=Survey.objects.filter(is_active=True),
@@ -116,7 +117,29 @@ class SurveyResponseSerializer(serializers.ModelSerializer):
         
         return survey_response
 
-class LuckyDrawEntrySerializer(serializers.ModelSerializer):
+class BatchAnswerSerializer(serializers.Serializer):
+    """Answer in a batch submission; checked against the compiled survey, not the database."""
+    question_id = serializers.IntegerField()
+    text_answer = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    selected_choices = serializers.ListField(child=serializers.IntegerField(), required=False)
+    rating_value = serializers.IntegerField(required=False, allow_null=True)
+
+class BatchSurveyResponseSerializer(serializers.Serializer):
+    client_id = serializers.CharField(required=False, max_length=100)
+    survey_id = serializers.IntegerField()
+    completed_at = serializers.DateTimeField(required=False)
+    answers = BatchAnswerSerializer(many=True)
+
+class SurveyResponseBatchSerializer(serializers.Serializer):
+    responses = BatchSurveyResponseSerializer(many=True, allow_empty=False)
+
+    def validate_responses(self, value):
+        limit = getattr(settings, 'SURVEY_CONFIG', {}).get('MAX_BATCH_RESPONSES', 50)
+        if len(value) > limit:
+            raise serializers.ValidationError(f"Send at most {limit} responses per batch.")
+        return value
+
+class LuckyDrawEntrySerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = LuckyDrawEntry
         fields = (
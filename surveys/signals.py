@@ -0,0 +1,155 @@
+"""Signal handlers that keep cached, derived data in step with content changes.
+
+Connected from ``SurveysConfig.ready()``. Cache handlers only bump version
+counters (see ``surveys.versioning``) and the caches rebuild lazily. They bump
+once the transaction commits: a request that saw the new version while the
+change was still uncommitted would cache old rows under the new key. Search
+handlers rewrite the affected ``SearchEntry`` rows in the same transaction, and
+change-log handlers append ``CatalogChange`` rows the same way.
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+
+from .models import (
+    AboutUs, Choice, Country, JournalCategory, JournalPost, LuckyDrawEntry, Poll,
+    PollQuestion, PrivacyPolicy, Question, Survey, SurveyCategory,
+)
+from . import catalog_changes, search
+from .page_cache import invalidate_page_cache
+from .versioning import CATALOG, bump_version
+
+# Survey/poll content: featured pools, catalog payloads and the pages that list them
+CATALOG_MODELS = (Country, SurveyCategory, Survey, Question, Choice, Poll, PollQuestion)
+
+# Content that only appears on cached public pages
+PAGE_MODELS = (JournalCategory, JournalPost, PrivacyPolicy, AboutUs)
+
+
+def _bump_catalog_and_pages():
+    bump_version(CATALOG)
+    invalidate_page_cache()
+
+
+def bump_catalog_version(sender, **kwargs):
+    transaction.on_commit(_bump_catalog_and_pages)
+
+
+def bump_catalog_version_on_m2m(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_catalog_version(sender)
+
+
+def invalidate_pages(sender, **kwargs):
+    transaction.on_commit(invalidate_page_cache)
+
+
+def invalidate_pages_for_winner(sender, instance, **kwargs):
+    # The home page lists recent winners; ordinary entries don't change any public page
+    if instance.is_winner:
+        transaction.on_commit(invalidate_page_cache)
+
+
+def update_search_index(sender, instance, **kwargs):
+    search.reindex_instance(instance)
+
+
+def remember_search_dependents(sender, instance, **kwargs):
+    # Cascade deletes drop the survey/question links before post_delete, so capture them now
+    if isinstance(instance, Survey):
+        instance._search_question_ids = list(instance.questions.values_list('id', flat=True))
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    search.reindex_instance(instance)
+    question_ids = getattr(instance, '_search_question_ids', None)
+    if question_ids:
+        search.reindex_questions(question_ids)
+
+
+def update_question_search_on_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        if reverse:
+            instance._search_question_ids = list(instance.questions.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        search.reindex_questions([instance.pk])
+        return
+    question_ids = set(pk_set or ()) | set(getattr(instance, '_search_question_ids', ()))
+    search.reindex_questions(question_ids)
+
+
+def remember_catalog_countries(sender, instance, raw=False, **kwargs):
+    if not raw:
+        catalog_changes.remember_countries(instance)
+
+
+def log_catalog_upsert(sender, instance, raw=False, **kwargs):
+    if not raw:
+        catalog_changes.record_upsert(instance)
+
+
+def log_catalog_delete(sender, instance, **kwargs):
+    catalog_changes.record_delete(instance)
+
+
+def log_question_surveys_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action.startswith('pre_'):
+        if not reverse:
+            catalog_changes.remember_countries(instance)
+            return
+        questions = list(
+            instance.questions.all() if action == 'pre_clear' else Question.objects.filter(pk__in=pk_set)
+        )
+        for question in questions:
+            catalog_changes.remember_countries(question)
+        instance._catalog_questions = questions
+        return
+    if not reverse:
+        catalog_changes.record_upsert(instance)
+        return
+    for question in getattr(instance, '_catalog_questions', ()):
+        catalog_changes.record_upsert(question)
+    instance._catalog_questions = []
+
+
+def _connect(handler, model, uid):
+    post_save.connect(handler, sender=model, dispatch_uid=f'{uid}.save')
+    post_delete.connect(handler, sender=model, dispatch_uid=f'{uid}.delete')
+
+
+def connect_signals():
+    for model in CATALOG_MODELS:
+        _connect(bump_catalog_version, model, f'surveys.catalog.{model._meta.model_name}')
+    for model in PAGE_MODELS:
+        _connect(invalidate_pages, model, f'surveys.pages.{model._meta.model_name}')
+    _connect(invalidate_pages_for_winner, LuckyDrawEntry, 'surveys.pages.luckydrawentry')
+    m2m_changed.connect(
+        bump_catalog_version_on_m2m,
+        sender=Question.surveys.through,
+        dispatch_uid='surveys.catalog.question_surveys',
+    )
+
+    for model in catalog_changes.TRACKED:
+        uid = f'surveys.catalog_changes.{model._meta.model_name}'
+        pre_save.connect(remember_catalog_countries, sender=model, dispatch_uid=f'{uid}.pre_save')
+        post_save.connect(log_catalog_upsert, sender=model, dispatch_uid=f'{uid}.save')
+        pre_delete.connect(remember_catalog_countries, sender=model, dispatch_uid=f'{uid}.pre_delete')
+        post_delete.connect(log_catalog_delete, sender=model, dispatch_uid=f'{uid}.delete')
+    m2m_changed.connect(
+        log_question_surveys_change,
+        sender=Question.surveys.through,
+        dispatch_uid='surveys.catalog_changes.question_surveys',
+    )
+
+    for model in search.REINDEXERS:
+        uid = f'surveys.search.{model._meta.model_name}'
+        post_save.connect(update_search_index, sender=model, dispatch_uid=f'{uid}.save')
+        pre_delete.connect(remember_search_dependents, sender=model, dispatch_uid=f'{uid}.pre_delete')
+        post_delete.connect(remove_from_search_index, sender=model, dispatch_uid=f'{uid}.delete')
+    m2m_changed.connect(
+        update_question_search_on_m2m,
+        sender=Question.surveys.through,
+        dispatch_uid='surveys.search.question_surveys',
+    )
@@ -0,0 +1,127 @@
+"""Sparse fieldsets (``?fields=``) and relation expansion (``?expand=``) for the REST API.
+
+Without either parameter a serializer renders its full, usual representation.
+``?fields=id,name`` renders only the listed fields. A nested relation named in
+``fields`` is rendered as primary keys, and ``?expand=questions`` renders it
+nested. A relation named only in ``expand`` is added to the sparse field list;
+``expand`` on its own changes nothing, since the full representation already
+nests every relation.
+
+``SparseFieldsetsViewSetMixin`` shapes the read queryset to match the fields
+being rendered. It selects only their columns with ``only()``,
+``select_related``s expanded foreign keys, and prefetches to-many relations
+only when they are rendered. Expanded to-many relations use the viewset's
+``expand_prefetches`` entry, so their own nested relations come in the same
+batch.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+SAFE_ACTIONS = ('list', 'retrieve')
+
+
+def _names(request, param):
+    if request is None:
+        return set()
+    value = request.query_params.get(param, '')
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def requested_fieldset(request):
+    """``(fields, expand)`` from the query string, as sets of top-level field names."""
+    return _names(request, 'fields'), _names(request, 'expand')
+
+
+def is_sparse(request):
+    return bool(_names(request, 'fields'))
+
+
+def _nested(field):
+    if isinstance(field, serializers.ListSerializer):
+        return field.child, True
+    if isinstance(field, serializers.BaseSerializer):
+        return field, False
+    return None, False
+
+
+class SparseFieldsetsMixin:
+    """Serializer mixin that honours ``?fields=`` and ``?expand=`` on the top-level serializer."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Only the serializer built by the view gets the request; nested ones keep every field
+        fields, expand = requested_fieldset(kwargs.get('context', {}).get('request'))
+        if not fields:
+            return
+        wanted = fields | expand
+        for name, field in list(self.fields.items()):
+            if field.write_only:
+                continue
+            if name not in wanted:
+                self.fields.pop(name)
+                continue
+            nested, many = _nested(field)
+            if nested is not None and name not in expand:
+                extra = {} if field.source == name else {'source': field.source}
+                self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, many=many, **extra)
+
+
+class SparseFieldsetsViewSetMixin:
+    """Restrict list/retrieve querysets to the columns and relations the serializer renders."""
+
+    # {field name: lookup or Prefetch} used instead of a plain prefetch when the field is expanded
+    expand_prefetches = {}
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in SAFE_ACTIONS or not is_sparse(self.request):
+            return queryset
+        return self.apply_fieldset(queryset)
+
+    def apply_fieldset(self, queryset):
+        # Drop the full representation's joins and prefetches; only rendered relations come back
+        queryset = queryset.select_related(None).prefetch_related(None)
+        opts = queryset.model._meta
+        _, expand = requested_fieldset(self.request)
+        columns = {opts.pk.name}
+        select, prefetch = [], []
+        columns_known = True
+
+        for name, field in self.get_serializer().fields.items():
+            if field.write_only:
+                continue
+            source = field.source.split('.')[0]
+            if source == '*':
+                columns_known = False
+                continue
+            try:
+                model_field = opts.get_field(source)
+            except FieldDoesNotExist:
+                # Properties and methods may read any column
+                columns_known = False
+                continue
+
+            if model_field.many_to_many or model_field.one_to_many:
+                if name in expand and name in self.expand_prefetches:
+                    prefetch.append(self.expand_prefetches[name])
+                else:
+                    prefetch.append(Prefetch(source))
+            elif model_field.is_relation:
+                columns.add(source)
+                if name in expand and _nested(field)[0] is not None:
+                    select.append(source)
+            else:
+                columns.add(source)
+
+        ordering = getattr(self, 'cursor_ordering', None) or queryset.query.order_by
+        columns.update(
+            term.lstrip('-').split('__')[0] for term in ordering if isinstance(term, str)
+        )
+        if columns_known:
+            queryset = queryset.only(*columns)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
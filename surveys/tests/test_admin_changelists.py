@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from surveys.models import Country, LuckyDrawEntry, Poll, PollQuestion, Question, Survey, SurveyCategory
+
+
+class AnnotatedChangelistTests(TestCase):
+    def setUp(self):
+        admin_user = get_user_model().objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret123',
+        )
+        self.client.force_login(admin_user)
+        self.country = Country.objects.create(name='India', code='IN')
+        self.category = SurveyCategory.objects.create(name='Health', slug='health', country=self.country)
+
+    def add_survey(self, name, questions):
+        survey = Survey.objects.create(name=name, category=self.category, level=1, is_active=True)
+        for index in range(questions):
+            question = Question.objects.create(question_text=f'{name} question {index}', question_type='text')
+            question.surveys.add(survey)
+        return survey
+
+    def count_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_survey_changelist_query_count_is_constant(self):
+        url = reverse('admin:surveys_survey_changelist')
+        self.add_survey('First', 1)
+        baseline = self.count_queries(url)
+
+        for index in range(5):
+            self.add_survey(f'Extra {index}', 3)
+
+        self.assertEqual(self.count_queries(url), baseline)
+
+    def test_survey_changelist_sorts_by_question_count(self):
+        self.add_survey('Few', 1)
+        self.add_survey('Many', 3)
+        # question_count is the fifth list_display column
+        response = self.client.get(reverse('admin:surveys_survey_changelist'), {'o': '-5'})
+
+        surveys = list(response.context['cl'].result_list)
+        self.assertEqual([survey.name for survey in surveys], ['Many', 'Few'])
+        self.assertEqual([survey.questions_count for survey in surveys], [3, 1])
+
+    def test_poll_changelist_counts_do_not_multiply(self):
+        poll = Poll.objects.create(title='Morning', country=self.country)
+        for index in range(3):
+            PollQuestion.objects.create(poll=poll, question_text=f'Q{index}', question_type='text')
+
+        response = self.client.get(reverse('admin:surveys_poll_changelist'))
+
+        poll = response.context['cl'].result_list[0]
+        self.assertEqual((poll.questions_count, poll.responses_count), (3, 0))
+
+    def test_category_changelist_query_count_is_constant(self):
+        url = reverse('admin:surveys_surveycategory_changelist')
+        baseline = self.count_queries(url)
+
+        for index in range(5):
+            category = SurveyCategory.objects.create(name=f'C{index}', slug=f'c{index}', country=self.country)
+            Survey.objects.create(name=f'S{index}', category=category, level=1)
+
+        self.assertEqual(self.count_queries(url), baseline)
+
+    def test_lucky_draw_changelist_sorts_by_source_title(self):
+        survey = self.add_survey('Zebra survey', 0)
+        poll = Poll.objects.create(title='Alpha poll', country=self.country)
+        user = get_user_model().objects.create_user(username='player', password='secret123')
+        common = {'user': user, 'guessed_number': 1, 'winning_number': 2, 'surveys_at_play': 0}
+        LuckyDrawEntry.objects.create(draw_type=LuckyDrawEntry.DRAW_TYPE_SURVEY, survey=survey, **common)
+        LuckyDrawEntry.objects.create(draw_type=LuckyDrawEntry.DRAW_TYPE_POLL, poll=poll, **common)
+
+        # source_title is the third list_display column
+        response = self.client.get(reverse('admin:surveys_luckydrawentry_changelist'), {'o': '3'})
+
+        titles = [entry.source_name for entry in response.context['cl'].result_list]
+        self.assertEqual(titles, ['Alpha poll', 'Zebra survey'])
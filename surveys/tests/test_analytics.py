@@ -0,0 +1,102 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from surveys.analytics import compute_survey_results, get_survey_results, rating_summary
+from surveys.models import Answer, Choice, Country, Question, Survey, SurveyCategory, SurveyResponse
+
+
+class SurveyAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        country = Country.objects.create(name='India', code='IN')
+        category = SurveyCategory.objects.create(name='Health', slug='health', country=country)
+        self.survey = Survey.objects.create(name='Sleep', category=category, level=1)
+
+        self.pick = Question.objects.create(question_text='When?', question_type='multiple_choice', order=1)
+        self.rate = Question.objects.create(question_text='How well?', question_type='rating', order=2)
+        self.why = Question.objects.create(question_text='Why?', question_type='text', order=3)
+        for question in (self.pick, self.rate, self.why):
+            question.surveys.add(self.survey)
+        self.night = Choice.objects.create(question=self.pick, choice_text='Night')
+        self.noon = Choice.objects.create(question=self.pick, choice_text='Noon')
+
+        answers = [
+            ([self.night], None, 5, 'Work'),
+            ([self.night, self.noon], 'Commute', 4, 'work '),
+            ([], 'commute', 2, 'Kids'),
+        ]
+        for index, (choices, other, rating, reason) in enumerate(answers):
+            user = User.objects.create_user(username=f'member{index}', password='secret123')
+            response = SurveyResponse.objects.create(
+                user=user, survey=self.survey, completed_at=timezone.now() if index else None,
+            )
+            picked = Answer.objects.create(response=response, question=self.pick, text_answer=other)
+            picked.selected_choices.set(choices)
+            Answer.objects.create(response=response, question=self.rate, rating_value=rating)
+            Answer.objects.create(response=response, question=self.why, text_answer=reason)
+
+    def question(self, results, question):
+        return next(item for item in results['questions'] if item['id'] == question.id)
+
+    def test_counts_and_distributions(self):
+        results = compute_survey_results(self.survey)
+
+        self.assertEqual((results['responses'], results['completed']), (3, 2))
+        self.assertEqual(results['completion_rate'], 66.7)
+
+        pick = self.question(results, self.pick)
+        self.assertEqual(pick['answered'], 3)
+        self.assertEqual(
+            [(choice['text'], choice['count'], choice['percent']) for choice in pick['choices']],
+            [('Night', 2, 66.7), ('Noon', 1, 33.3)],
+        )
+        self.assertEqual(pick['other']['count'], 2)
+        self.assertEqual(pick['other']['top'], [{'text': 'commute', 'count': 2}])
+
+        why = self.question(results, self.why)
+        self.assertEqual(why['top_answers'][0], {'text': 'work', 'count': 2})
+
+    def test_rating_statistics(self):
+        rating = self.question(compute_survey_results(self.survey), self.rate)['rating']
+
+        self.assertEqual(rating['count'], 3)
+        self.assertEqual(rating['mean'], 3.67)
+        self.assertEqual(rating['stddev'], 1.25)
+        self.assertEqual([bucket['count'] for bucket in rating['histogram']], [0, 1, 0, 1, 1])
+
+    def test_empty_rating_histogram(self):
+        summary = rating_summary({})
+        self.assertEqual((summary['count'], summary['mean'], summary['stddev']), (0, None, None))
+
+    def test_query_count_does_not_grow_with_answers(self):
+        # Six grouped aggregates plus one top-answers query per question with text
+        with self.assertNumQueries(8):
+            compute_survey_results(self.survey)
+
+    def test_results_are_cached(self):
+        get_survey_results(self.survey)
+        with self.assertNumQueries(0):
+            get_survey_results(self.survey)
+
+    def test_admin_view_and_json_endpoint(self):
+        admin_user = get_user_model().objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret123',
+        )
+        self.client.force_login(admin_user)
+
+        page = self.client.get(reverse('admin:survey-results', args=[self.survey.pk]))
+        self.assertContains(page, 'Night')
+
+        data = self.client.get(reverse('survey-results', args=[self.survey.pk])).json()
+        self.assertEqual(data['responses'], 3)
+
+    def test_json_endpoint_requires_staff(self):
+        member = get_user_model().objects.get(username='member0')
+        self.client.force_login(member)
+        response = self.client.get(reverse('survey-results', args=[self.survey.pk]))
+        # The 403 is turned into a redirect home by ExceptionRedirectMiddleware
+        self.assertRedirects(response, reverse('surveys:home'), fetch_redirect_response=False)
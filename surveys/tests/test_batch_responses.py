@@ -0,0 +1,156 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from surveys import batch_responses
+from surveys.models import (
+    Answer, Choice, Country, Question, Survey, SurveyCategory, SurveyResponse, UserSurveyProgress,
+)
+
+
+@override_settings(SURVEY_CONFIG={'DEFAULT_COOLDOWN_DAYS': 2, 'MAX_BATCH_RESPONSES': 5})
+class BatchResponseSubmissionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username='mobile', password='secret123', date_joined=timezone.now() - timedelta(days=30),
+        )
+        self.client.force_login(self.user)
+        country = Country.objects.create(name='India', code='IN')
+        self.category = SurveyCategory.objects.create(name='Health', slug='health', country=country)
+        self.level1 = Survey.objects.create(name='Health 1', category=self.category, level=1)
+        self.level2 = Survey.objects.create(name='Health 2', category=self.category, level=2)
+        self.questions = {}
+        for survey in (self.level1, self.level2):
+            choice_question = Question.objects.create(question_text='Smoke?', question_type='single_choice')
+            rating_question = Question.objects.create(question_text='Rate', question_type='rating')
+            choice_question.surveys.add(survey)
+            rating_question.surveys.add(survey)
+            yes = Choice.objects.create(question=choice_question, choice_text='Yes')
+            Choice.objects.create(question=choice_question, choice_text='No')
+            self.questions[survey.pk] = (choice_question, rating_question, yes)
+        self.url = reverse('surveyresponse-batch')
+
+    def item(self, survey, completed_at=None, **extra):
+        choice_question, rating_question, yes = self.questions[survey.pk]
+        item = {
+            'survey_id': survey.pk,
+            'answers': [
+                {'question_id': choice_question.pk, 'selected_choices': [yes.pk]},
+                {'question_id': rating_question.pk, 'rating_value': 4},
+            ],
+            **extra,
+        }
+        if completed_at is not None:
+            item['completed_at'] = completed_at.isoformat()
+        return item
+
+    def post(self, items):
+        return self.client.post(self.url, json.dumps({'responses': items}), content_type='application/json')
+
+    def test_offline_sequence_is_accepted_in_order(self):
+        earlier = timezone.now() - timedelta(hours=3)
+        response = self.post([
+            self.item(self.level1, earlier, client_id='a'),
+            self.item(self.level2, client_id='b'),
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['created', 'created'])
+        self.assertEqual([r['client_id'] for r in results], ['a', 'b'])
+        self.assertEqual(SurveyResponse.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(Answer.objects.filter(response__user=self.user).count(), 4)
+        first = SurveyResponse.objects.get(pk=results[0]['id'])
+        self.assertEqual((first.started_at, first.completed_at), (earlier, earlier))
+        self.assertEqual(
+            list(first.answers.filter(rating_value__isnull=True).values_list('selected_choices__choice_text', flat=True)),
+            ['Yes'],
+        )
+        self.assertEqual(
+            dict(UserSurveyProgress.objects.filter(user=self.user).values_list('level', 'completed_count')),
+            {1: 1, 2: 1},
+        )
+
+    def test_locks_and_invalid_items_are_rejected_individually(self):
+        choice_question, _, _ = self.questions[self.level1.pk]
+        bad = self.item(self.level1)
+        bad['answers'] = [{'question_id': choice_question.pk, 'selected_choices': [999999]}]
+
+        response = self.post([
+            self.item(self.level2),  # level 1 not done yet
+            bad,
+            self.item(self.level1),
+            self.item(self.level1),  # cooldown
+        ])
+
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['rejected', 'rejected', 'created', 'rejected'])
+        self.assertIn("Complete 'Health 1' (Level 1) to unlock", results[0]['errors'])
+        self.assertEqual(len(results[1]['errors']), 2)  # unknown choice, missing rating
+        self.assertIn('cooldown', results[3]['errors'][0])
+        self.assertEqual(SurveyResponse.objects.filter(user=self.user).count(), 1)
+
+    def test_completed_at_is_bounded(self):
+        response = self.post([
+            self.item(self.level1, timezone.now() - timedelta(days=31)),  # before the account existed
+            self.item(self.level1, timezone.now() - timedelta(days=2)),  # older than the cooldown
+            self.item(self.level1, timezone.now() + timedelta(hours=1)),
+        ])
+
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['rejected'] * 3)
+        self.assertIn('before the account was created', results[0]['errors'][0])
+        self.assertIn('within the last 2 days', results[1]['errors'][0])
+        self.assertFalse(SurveyResponse.objects.exists())
+
+    def test_backdated_items_cannot_repeat_a_survey_within_one_batch(self):
+        start = timezone.now() - timedelta(days=2) + timedelta(minutes=1)
+        items = [self.item(self.level1, start + timedelta(days=i)) for i in range(2)]
+
+        results = self.post(items).json()['results']
+
+        self.assertEqual([r['status'] for r in results], ['created', 'rejected'])
+        self.assertIn('cooldown', results[1]['errors'][0])
+
+    def test_locks_are_checked_against_completions_committed_meanwhile(self):
+        original = batch_responses.completion_state
+
+        def completion_state(user, survey_ids):
+            # Another request from the same user finished first
+            SurveyResponse.objects.create(user=user, survey=self.level1, completed_at=timezone.now())
+            return original(user, survey_ids)
+
+        with mock.patch.object(batch_responses, 'completion_state', completion_state):
+            results = self.post([self.item(self.level1)]).json()['results']
+
+        self.assertEqual(results[0]['status'], 'rejected')
+        self.assertIn('cooldown', results[0]['errors'][0])
+        self.assertEqual(SurveyResponse.objects.count(), 1)
+
+    def test_warm_batch_query_count_does_not_grow_with_batch_size(self):
+        self.post([self.item(self.level1), self.item(self.level2)])
+        SurveyResponse.objects.all().delete()
+        UserSurveyProgress.objects.all().delete()
+
+        start = timezone.now() - timedelta(hours=9)
+        items = [self.item(self.level1, start), self.item(self.level2, start + timedelta(hours=3))]
+        # session, user, user lock, completions, 3 bulk inserts, started_at update,
+        # progress read/insert, 2 milestone counts, session save, savepoints
+        with self.assertNumQueries(17):
+            response = self.post(items)
+
+        self.assertEqual([r['status'] for r in response.json()['results']], ['created'] * 2)
+        self.assertEqual(UserSurveyProgress.objects.filter(user=self.user).count(), 2)
+
+    def test_batch_size_is_limited(self):
+        response = self.post([self.item(self.level1)] * 6)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(SurveyResponse.objects.exists())
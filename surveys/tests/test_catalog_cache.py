@@ -0,0 +1,81 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from surveys.models import Choice, Country, Question, Survey, SurveyCategory
+from surveys.versioning import CATALOG, get_version
+
+
+class CatalogApiCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        country = Country.objects.create(name='India', code='IN')
+        self.category = SurveyCategory.objects.create(name='Health', slug='health', country=country)
+        self.surveys = []
+        for index in range(12):
+            survey = Survey.objects.create(
+                name=f'Health {index}', category=self.category, level=1, is_active=True
+            )
+            for order in (2, 1):
+                question = Question.objects.create(
+                    question_text=f'Question {order}', question_type='single_choice', order=order
+                )
+                question.surveys.add(survey)
+                Choice.objects.create(question=question, choice_text='Yes')
+                Choice.objects.create(question=question, choice_text='No')
+            self.surveys.append(survey)
+        self.url = reverse('survey-list')
+
+    def test_list_matches_serializer_output(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['count'], 12)
+        self.assertIsNotNone(data['next'])
+        self.assertEqual([item['id'] for item in data['results']], [s.id for s in self.surveys[:10]])
+        first = data['results'][0]
+        self.assertEqual(first['category']['name'], 'Health')
+        self.assertEqual([q['question_text'] for q in first['questions']], ['Question 1', 'Question 2'])
+        self.assertEqual([c['choice_text'] for c in first['questions'][0]['choices']], ['Yes', 'No'])
+
+    def test_cold_list_query_count_does_not_grow_with_page_size(self):
+        # validator, page of ids, surveys + category, questions, choices
+        with self.assertNumQueries(5):
+            self.client.get(self.url)
+
+    def test_warm_list_needs_two_queries(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(json.loads(response.content)['results']), 10)
+
+    def test_question_edit_invalidates_fragments(self):
+        survey = self.surveys[0]
+        url = reverse('survey-detail', args=[survey.pk])
+        self.client.get(url)
+
+        question = survey.questions.get(order=1)
+        version = get_version(CATALOG)
+        with self.captureOnCommitCallbacks(execute=True):
+            question.question_text = 'Reworded'
+            question.save()
+            # Until commit, requests must keep using (and filling) the old version
+            self.assertEqual(get_version(CATALOG), version)
+
+        data = json.loads(self.client.get(url).content)
+        self.assertEqual(data['questions'][0]['question_text'], 'Reworded')
+
+    def test_retrieve_hides_inactive_survey(self):
+        survey = self.surveys[0]
+        url = reverse('survey-detail', args=[survey.pk])
+        self.client.get(url)
+        survey.is_active = False
+        survey.save()
+
+        # ExceptionRedirectMiddleware turns the 404 into a redirect home
+        self.assertRedirects(self.client.get(url), reverse('surveys:home'), fetch_redirect_response=False)
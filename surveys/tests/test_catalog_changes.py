@@ -0,0 +1,142 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from surveys.catalog_changes import changes_since, latest_version
+from surveys.models import (
+    CatalogChange, Choice, Country, Poll, PollChoice, PollQuestion, Question, Survey, SurveyCategory,
+)
+
+
+def keys(entries):
+    return {(entry['type'], entry['id']) for entry in entries}
+
+
+@override_settings(CATALOG_CHANGES={'SAFETY_LAG_SECONDS': 0})
+class CatalogChangeLogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.india = Country.objects.create(name='India', code='IN')
+        self.nepal = Country.objects.create(name='Nepal', code='NP')
+        self.health = SurveyCategory.objects.create(name='Health', slug='health', country=self.india)
+        self.travel = SurveyCategory.objects.create(name='Travel', slug='travel', country=self.nepal)
+        self.survey = Survey.objects.create(name='Health 1', category=self.health)
+        self.question = Question.objects.create(question_text='Smoke?', question_type='single_choice')
+        self.question.surveys.add(self.survey)
+        self.choice = Choice.objects.create(question=self.question, choice_text='Yes')
+
+    def test_changes_are_scoped_to_country_and_collapsed(self):
+        since = latest_version()
+        self.survey.name = 'Health basics'
+        self.survey.save()
+        self.survey.name = 'Health basics (v2)'
+        self.survey.save()
+
+        india = changes_since(since, self.india.pk)
+        self.assertEqual(india['upserts'], [{
+            'type': 'survey', 'id': self.survey.pk,
+            'data': {
+                'id': self.survey.pk, 'name': 'Health basics (v2)', 'description': '', 'is_active': True,
+                'category': self.health.pk, 'level': 1,
+            },
+        }])
+        self.assertEqual(india['version'], latest_version())
+        self.assertEqual(changes_since(since, self.nepal.pk)['upserts'], [])
+
+    def test_question_joining_another_country_brings_its_choices(self):
+        since = latest_version()
+        other = Survey.objects.create(name='Travel 1', category=self.travel)
+        self.question.surveys.add(other)
+
+        nepal = changes_since(since, self.nepal.pk)
+        self.assertEqual(
+            keys(nepal['upserts']),
+            {('survey', other.pk), ('question', self.question.pk), ('choice', self.choice.pk)},
+        )
+        question = next(entry for entry in nepal['upserts'] if entry['type'] == 'question')
+        self.assertEqual(question['data']['surveys'], sorted([self.survey.pk, other.pk]))
+
+        since = latest_version()
+        other.questions.remove(self.question)
+        nepal = changes_since(since, self.nepal.pk)
+        self.assertEqual(keys(nepal['deletes']), {('question', self.question.pk), ('choice', self.choice.pk)})
+        self.assertEqual(keys(changes_since(since, self.india.pk)['upserts']), {('question', self.question.pk)})
+
+    def test_delete_is_logged_with_countries_captured_before_the_cascade(self):
+        since = latest_version()
+        question_id, choice_id = self.question.pk, self.choice.pk
+        self.question.delete()
+
+        india = changes_since(since, self.india.pk)
+        self.assertEqual(keys(india['deletes']), {('question', question_id), ('choice', choice_id)})
+        self.assertEqual(india['upserts'], [])
+
+    def test_polls_are_logged(self):
+        since = latest_version()
+        poll = Poll.objects.create(title='Tea or coffee?', country=self.nepal)
+        question = PollQuestion.objects.create(poll=poll, question_text='Pick one', question_type='single_choice')
+        PollChoice.objects.create(question=question, choice_text='Tea')
+
+        self.assertEqual(
+            [entry['type'] for entry in changes_since(since, self.nepal.pk)['upserts']],
+            ['poll', 'poll_question', 'poll_choice'],
+        )
+
+    def test_reordering_questions_is_logged(self):
+        since = latest_version()
+        self.survey.reorder_questions([self.question.pk])
+
+        self.assertEqual(
+            changes_since(since, self.india.pk)['upserts'][0]['data']['order'], 1,
+        )
+
+
+@override_settings(CATALOG_CHANGES={'SAFETY_LAG_SECONDS': 0})
+class CatalogChangesApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.create(name='India', code='IN')
+        SurveyCategory.objects.create(name='Health', slug='health', country=self.country)
+        self.url = reverse('catalog-change-list')
+
+    def test_sync_uses_one_query_and_returns_next_version(self):
+        version = CatalogChange.objects.latest('pk').pk
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'since': 0, 'country': self.country.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['version'], version)
+        self.assertEqual(keys(response.json()['upserts']), {('category', self.country.categories.get().pk)})
+
+        empty = self.client.get(self.url, {'since': version, 'country': self.country.pk}).json()
+        self.assertEqual((empty['version'], empty['upserts'], empty['deletes']), (version, [], []))
+
+    def test_pages_are_capped(self):
+        for number in range(3):
+            SurveyCategory.objects.create(name=f'Topic {number}', slug=f'topic-{number}', country=self.country)
+        versions = list(CatalogChange.objects.order_by('pk').values_list('pk', flat=True))
+
+        with self.settings(CATALOG_CHANGES={'SAFETY_LAG_SECONDS': 0, 'PAGE_SIZE': 3}):
+            first = self.client.get(self.url, {'since': 0, 'country': self.country.pk}).json()
+            second = self.client.get(self.url, {'since': first['version'], 'country': self.country.pk}).json()
+
+        self.assertEqual((first['version'], first['has_more'], len(first['upserts'])), (versions[2], True, 3))
+        self.assertEqual((second['version'], second['has_more'], len(second['upserts'])), (versions[3], False, 1))
+
+    def test_recent_changes_wait_for_the_safety_lag(self):
+        settled = CatalogChange.objects.get()
+        CatalogChange.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        SurveyCategory.objects.create(name='Travel', slug='travel', country=self.country)
+
+        with self.settings(CATALOG_CHANGES={'SAFETY_LAG_SECONDS': 60}):
+            data = self.client.get(self.url, {'since': 0, 'country': self.country.pk}).json()
+
+        self.assertEqual((data['version'], data['has_more']), (settled.pk, False))
+        self.assertEqual(keys(data['upserts']), {('category', settled.object_id)})
+
+    def test_country_is_required_for_anonymous_clients(self):
+        self.assertEqual(self.client.get(self.url, {'since': 0}).status_code, 400)
@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from surveys.models import Country, JournalPost, PrivacyPolicy, Survey, SurveyCategory
+
+
+class ConditionalPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='reader', password='secret123')
+        self.post = JournalPost.objects.create(title='Saving tips', content='<p>Save more.</p>')
+        self.url = reverse('surveys:journal_detail', kwargs={'slug': self.post.slug})
+
+    def test_revisit_with_matching_etag_returns_304(self):
+        self.client.force_login(self.user)
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b'')
+
+    def test_edit_changes_etag(self):
+        self.client.force_login(self.user)
+        etag = self.client.get(self.url)['ETag']
+
+        self.post.content = '<p>Save even more.</p>'
+        self.post.save()
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_differs_per_user(self):
+        anonymous_etag = self.client.get(self.url)['ETag']
+        self.client.force_login(self.user)
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=anonymous_etag).status_code, 200)
+
+    def test_cached_anonymous_page_revalidates_without_queries(self):
+        PrivacyPolicy.objects.create(content='Policy')
+        url = reverse('surveys:privacy_policy')
+        first = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(second.status_code, 304)
+
+
+class ConditionalCatalogApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        country = Country.objects.create(name='India', code='IN')
+        category = SurveyCategory.objects.create(name='Health', slug='health', country=country)
+        self.survey = Survey.objects.create(name='Health 1', category=category, level=1, is_active=True)
+        self.url = '/api/api/surveys/'
+
+    def test_unchanged_list_returns_304(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(second.status_code, 304)
+
+    def test_survey_change_invalidates_etag(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.survey.name = 'Health 1 (updated)'
+        self.survey.save()
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_retrieve_supports_if_none_match(self):
+        url = f'{self.url}{self.survey.pk}/'
+        etag = self.client.get(url)['ETag']
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
@@ -0,0 +1,105 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from surveys.crosstab import CrosstabError, age_band_expression, crosstab, get_crosstab
+from surveys.models import Answer, Choice, Country, Question, Survey, SurveyCategory, SurveyResponse, UserProfile
+
+TODAY = date(2026, 6, 15)
+
+
+class CrosstabTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('surveys.crosstab.timezone.localdate', return_value=TODAY)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.india = Country.objects.create(name='India', code='IN')
+        self.nepal = Country.objects.create(name='Nepal', code='NP')
+        category = SurveyCategory.objects.create(name='Health', slug='health', country=self.india)
+        self.survey = Survey.objects.create(name='Sleep', category=category, level=1)
+        self.question = Question.objects.create(question_text='When?', question_type='multiple_choice')
+        self.question.surveys.add(self.survey)
+        self.night = Choice.objects.create(question=self.question, choice_text='Night')
+        self.noon = Choice.objects.create(question=self.question, choice_text='Noon')
+
+        respondents = [
+            ('asha', self.india, date(2005, 1, 1), [self.night]),               # 21 -> 18-24
+            ('bina', self.india, date(1990, 6, 15), [self.night, self.noon]),   # 36 -> 35-44
+            ('chet', self.nepal, date(2001, 6, 16), [self.noon]),               # 24, turns 25 tomorrow -> 18-24
+            ('dev', None, None, []),                                            # unknown, picked "Other"
+        ]
+        for username, country, born, choices in respondents:
+            user = get_user_model().objects.create_user(username=username, password='secret123')
+            profile, _ = UserProfile.objects.get_or_create(user=user)
+            UserProfile.objects.filter(pk=profile.pk).update(country=country, date_of_birth=born)
+            response = SurveyResponse.objects.create(user=user, survey=self.survey, completed_at=timezone.now())
+            answer = Answer.objects.create(response=response, question=self.question, text_answer=None if choices else 'Dawn')
+            answer.selected_choices.set(choices)
+
+    def test_answers_by_age_band(self):
+        table = crosstab(self.survey, 'answer', 'age_band', question=self.question)
+
+        self.assertEqual(table['row_labels'], ['Night', 'Noon', 'Other'])
+        self.assertEqual(table['column_labels'], ['18-24', '35-44', 'Unknown'])
+        self.assertEqual(table['counts'], [[1, 1, 0], [1, 1, 0], [0, 0, 1]])
+        self.assertEqual(table['row_percentages'][0], [50.0, 50.0, 0.0])
+        self.assertEqual(table['column_totals'], [2, 2, 1])
+
+    def test_demographics_without_question_count_responses(self):
+        table = crosstab(self.survey, 'country', 'age_band')
+
+        self.assertEqual(table['row_labels'], ['India', 'Nepal', 'Unknown'])
+        self.assertEqual(table['counts'], [[1, 1, 0], [1, 0, 0], [0, 0, 1]])
+        self.assertEqual(table['total'], 4)
+
+    def test_filters(self):
+        table = crosstab(
+            self.survey, 'answer', 'country', question=self.question, filters={'age_band': ['18-24']},
+        )
+        self.assertEqual(table['row_labels'], ['Night', 'Noon'])
+        self.assertEqual(table['counts'], [[1, 0], [0, 1]])
+
+    def test_invalid_dimensions(self):
+        with self.assertRaises(CrosstabError):
+            crosstab(self.survey, 'country', 'country')
+        with self.assertRaises(CrosstabError):
+            crosstab(self.survey, 'answer', 'country')
+        with self.assertRaises(CrosstabError):
+            crosstab(self.survey, 'shoe_size', 'country')
+
+    def test_age_band_boundaries(self):
+        expression = age_band_expression('date_of_birth', TODAY)
+        cutoffs = {when.result.value: when.condition.children[0][1] for when in expression.cases[1:]}
+        self.assertEqual(cutoffs['18-24'], date(2008, 6, 15))
+        self.assertEqual(cutoffs['65+'], date(1961, 6, 15))
+
+    def test_results_are_cached_per_filter(self):
+        get_crosstab(self.survey, 'country', 'age_band')
+        with self.assertNumQueries(0):
+            get_crosstab(self.survey, 'country', 'age_band')
+        with self.assertNumQueries(1):
+            get_crosstab(self.survey, 'country', 'age_band', filters={'country': ['India']})
+
+    def test_api_and_admin_page(self):
+        admin_user = get_user_model().objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret123',
+        )
+        self.client.force_login(admin_user)
+        params = {'rows': 'answer', 'columns': 'country', 'question': self.question.pk, 'country': ['India']}
+
+        data = self.client.get(reverse('survey-crosstab', args=[self.survey.pk]), params).json()
+        self.assertEqual(data['column_labels'], ['India'])
+        self.assertEqual(data['counts'], [[2], [1]])
+
+        bad = self.client.get(reverse('survey-crosstab', args=[self.survey.pk]), {'rows': 'answer', 'columns': 'city'})
+        self.assertEqual(bad.status_code, 400)
+
+        page = self.client.get(reverse('admin:survey-crosstab', args=[self.survey.pk]), params)
+        self.assertContains(page, 'Night')
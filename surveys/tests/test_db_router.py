@@ -0,0 +1,78 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.cache.backends.db import DatabaseCache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from surveys.db_router import ReadReplicaRouter, track_request_writes, use_read_replica
+from surveys.middleware import ReplicaPinningMiddleware
+from surveys.models import Survey
+
+REPLICA_SETTINGS = {'ALIASES': ['replica_1'], 'PIN_SECONDS': 10, 'PIN_COOKIE_NAME': 'primary_pin'}
+
+
+@override_settings(READ_REPLICA=REPLICA_SETTINGS)
+class ReadReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReadReplicaRouter()
+
+    def test_reads_stay_on_primary_without_hint(self):
+        self.assertIsNone(self.router.db_for_read(Survey))
+
+    def test_hinted_reads_go_to_replica(self):
+        with use_read_replica():
+            self.assertEqual(self.router.db_for_read(Survey), 'replica_1')
+
+    def test_sessions_never_read_from_replica(self):
+        with use_read_replica():
+            self.assertIsNone(self.router.db_for_read(Session))
+
+    def test_database_cache_stays_on_primary_without_pinning(self):
+        cache_entry = DatabaseCache('surveys_cache', {}).cache_model_class
+
+        with track_request_writes() as state, use_read_replica():
+            self.assertIsNone(self.router.db_for_read(cache_entry))
+            self.assertEqual(self.router.db_for_write(cache_entry), 'default')
+
+        self.assertEqual(state, {'pinned': False, 'wrote': False})
+
+    def test_write_pins_rest_of_request_to_primary(self):
+        with track_request_writes() as state, use_read_replica():
+            self.assertEqual(self.router.db_for_write(Survey), 'default')
+            self.assertIsNone(self.router.db_for_read(Survey))
+
+        self.assertTrue(state['wrote'])
+
+    def test_pinned_request_reads_from_primary(self):
+        with track_request_writes(pinned=True), use_read_replica():
+            self.assertIsNone(self.router.db_for_read(Survey))
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica_1', 'surveys'))
+        self.assertIsNone(self.router.allow_migrate('default', 'surveys'))
+
+
+@override_settings(READ_REPLICA=REPLICA_SETTINGS)
+class ReplicaPinningMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = ReplicaPinningMiddleware(lambda request: HttpResponse('ok'))
+
+    def test_post_sets_short_lived_pin_cookie(self):
+        response = self.middleware(self.factory.post('/surveys/1/'))
+
+        cookie = response.cookies['primary_pin']
+        self.assertEqual(cookie['max-age'], 10)
+        self.assertGreater(int(cookie.value), time.time())
+
+    def test_plain_get_does_not_pin(self):
+        response = self.middleware(self.factory.get('/'))
+
+        self.assertNotIn('primary_pin', response.cookies)
+
+    def test_unexpired_cookie_pins_request(self):
+        request = self.factory.get('/')
+        request.COOKIES['primary_pin'] = str(int(time.time()) + 5)
+
+        self.assertTrue(ReplicaPinningMiddleware.is_pinned(request, REPLICA_SETTINGS))
@@ -0,0 +1,199 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from docx import Document
+
+from surveys.catalog_changes import changes_since, latest_version
+from surveys.docx_import import parse_document, parse_lines
+from surveys.import_manifest import file_hash
+from surveys.journal_import import parse_docx
+from surveys.models import (
+    Choice, Country, ImportManifest, Poll, PollQuestion, Question, SearchEntry, Survey, SurveyCategory,
+    question_text_hash,
+)
+from surveys.parallel_parse import parse_files
+
+HEALTH = [
+    'Health questionnaire',
+    'Section 1: Habits',
+    'How often do you exercise?',
+    '* Daily',
+    '* Weekly',
+    'Which sports do you play? Select up to 3',
+    '* Tennis',
+    'On a scale of 1-10, how healthy are you?',
+    '2. Section 2: Diet',
+    'What do you usually eat for breakfast?',
+    'Open text',
+    'How often do you exercise?',
+    'Never',
+]
+
+
+def write_docx(directory, filename, lines):
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(os.path.join(directory, filename))
+
+
+class ParseLinesTests(SimpleTestCase):
+    def test_sections_questions_and_options(self):
+        sections = parse_lines(HEALTH)
+
+        self.assertEqual([section['name'] for section in sections], ['Section 1: Habits', '2. Section 2: Diet'])
+        self.assertEqual(sections[0]['questions'], [
+            {'text': 'How often do you exercise?', 'type': 'single_choice', 'options': ['Daily', 'Weekly']},
+            {'text': 'Which sports do you play? Select up to 3', 'type': 'multiple_choice', 'options': []},
+            {'text': 'On a scale of 1-10, how healthy are you?', 'type': 'rating', 'options': []},
+        ])
+        self.assertEqual(sections[1]['questions'], [
+            {'text': 'What do you usually eat for breakfast?', 'type': 'text', 'options': []},
+            {'text': 'How often do you exercise?', 'type': 'single_choice', 'options': ['Never']},
+        ])
+
+
+class QuestionTextHashTests(TestCase):
+    def test_hash_is_kept_in_step_with_the_text(self):
+        question = Question.objects.create(question_text='How often do you exercise?', question_type='text')
+        self.assertEqual(question.text_hash, question_text_hash('How often do you exercise?'))
+
+        question.question_text = 'How often  do you\nexercise ?'
+        question.save(update_fields=['question_text'])
+        question.refresh_from_db()
+        self.assertEqual(question.text_hash, question_text_hash('How often do you exercise ?'))
+
+        poll = Poll.objects.create(title='Tea or coffee?', country=Country.objects.create(name='India', code='IN'))
+        poll_question = PollQuestion.objects.create(poll=poll, question_text=' Pick one ', question_type='text')
+        self.assertEqual(
+            list(PollQuestion.objects.filter(text_hash=question_text_hash('Pick  one'))), [poll_question],
+        )
+
+
+class ParallelParseTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_workers_return_results_in_input_order(self):
+        paths = []
+        for number in range(4):
+            write_docx(self.directory.name, f'HL.{number} - Topic {number}.docx', HEALTH[:number + 3])
+            paths.append(os.path.join(self.directory.name, f'HL.{number} - Topic {number}.docx'))
+
+        parallel, stats = parse_files(parse_document, paths, jobs=2)
+
+        self.assertEqual(parallel, parse_files(parse_document, paths, jobs=1)[0])
+        self.assertEqual([document['category'] for document in parallel], [f'Topic {n}' for n in range(4)])
+        self.assertEqual((stats['documents'], stats['jobs']), (4, 2))
+
+    def test_journal_posts_parse_in_workers(self):
+        document = Document()
+        document.add_paragraph('Sleep and focus')
+        document.add_paragraph('Why it matters')
+        document.add_paragraph('Most adults need seven hours of sleep.')
+        document.add_table(rows=2, cols=1).cell(1, 0).text = 'Summary'
+        path = os.path.join(self.directory.name, 'sleep.docx')
+        document.save(path)
+        write_docx(self.directory.name, 'notes.docx', ['No summary table here.'])
+
+        posts, _ = parse_files(parse_docx, [path, os.path.join(self.directory.name, 'notes.docx')], jobs=2)
+
+        title, excerpt, content = posts[0]
+        self.assertEqual((title, excerpt), ('Sleep and focus', 'Most adults need seven hours of sleep.'))
+        self.assertIn('<h2>Why it matters</h2>', content)
+        self.assertIsNone(posts[1])
+
+
+@override_settings(CATALOG_CHANGES={'SAFETY_LAG_SECONDS': 0})
+class ImportSurveyDocxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.create(name='India', code='IN')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        write_docx(self.directory.name, 'HL.1 - Health.docx', HEALTH)
+        write_docx(self.directory.name, 'TR.2 - Travel.docx', [
+            'Section 1: Trips', 'How often do you exercise?', '* Daily', '* Monthly',
+        ])
+        self.report = os.path.join(self.directory.name, 'report.json')
+
+    def run_import(self, *args):
+        call_command('import_survey_docx', 'in', self.directory.name, '--report', self.report, '--jobs', '2',
+                     *args, stdout=io.StringIO())
+        with open(self.report, encoding='utf-8') as report:
+            return json.load(report)
+
+    def test_import_writes_catalog_and_report(self):
+        existing = Question.objects.create(question_text='What do you usually  eat for breakfast?',
+                                           question_type='single_choice')
+        since = latest_version()
+
+        report = self.run_import()
+
+        self.assertEqual(report['country'], 'IN')
+        self.assertEqual(report['documents'][0], {
+            'file': 'HL.1 - Health.docx', 'category': 'Health',
+            'sections': {'Section 1: Habits': 3, '2. Section 2: Diet': 2}, 'total_questions': 5,
+            'user_confirmed': True, 'status': 'committed',
+        })
+        self.assertEqual(
+            set(SurveyCategory.objects.filter(country=self.country).values_list('name', flat=True)),
+            {'Health', 'Travel'},
+        )
+        self.assertEqual(Survey.objects.count(), 3)
+        self.assertEqual(Question.objects.count(), 4)
+        existing.refresh_from_db()
+        self.assertEqual(existing.question_type, 'text')
+
+        exercise = Question.objects.get(question_text='How often do you exercise?')
+        self.assertEqual(exercise.surveys.count(), 3)
+        self.assertEqual(
+            sorted(exercise.choices.values_list('choice_text', flat=True)), ['Daily', 'Monthly', 'Never', 'Weekly'],
+        )
+        self.assertEqual(Choice.objects.count(), 4)
+
+        upserts = changes_since(since, self.country.pk)['upserts']
+        self.assertEqual(sum(entry['type'] == 'choice' for entry in upserts), 4)
+        self.assertTrue(SearchEntry.objects.filter(object_type=SearchEntry.TYPE_QUESTION,
+                                                   object_id=exercise.pk).exists())
+
+    def test_reimport_reuses_existing_rows(self):
+        self.run_import()
+        counts = (Survey.objects.count(), Question.objects.count(), Choice.objects.count(),
+                  Question.surveys.through.objects.count())
+        since = latest_version()
+
+        self.run_import('--force')
+
+        self.assertEqual(
+            (Survey.objects.count(), Question.objects.count(), Choice.objects.count(),
+             Question.surveys.through.objects.count()),
+            counts,
+        )
+        self.assertEqual(latest_version(), since)
+
+    def test_unchanged_documents_are_skipped_and_changes_are_diffed(self):
+        self.run_import()
+        travel = ImportManifest.objects.get(source='IN/TR.2 - Travel.docx')
+        self.assertEqual(travel.object_ids['surveys'], [Survey.objects.get(name='Section 1: Trips').pk])
+        write_docx(self.directory.name, 'TR.2 - Travel.docx', [
+            'Section 1: Trips', 'How often do you exercise?', '* Daily', '* Yearly',
+        ])
+        since = latest_version()
+
+        report = self.run_import()
+
+        self.assertEqual(report['documents'][0], {'file': 'HL.1 - Health.docx', 'status': 'unchanged'})
+        self.assertEqual(report['documents'][1]['status'], 'committed')
+        self.assertEqual(
+            [(entry['type'], entry['data']['choice_text']) for entry in changes_since(since, self.country.pk)['upserts']],
+            [('choice', 'Yearly')],
+        )
+        travel.refresh_from_db()
+        self.assertEqual(travel.content_hash, file_hash(os.path.join(self.directory.name, 'TR.2 - Travel.docx')))
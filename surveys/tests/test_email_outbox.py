@@ -0,0 +1,133 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from surveys.email_outbox import claim_due, get_config, purge_sent, queue_email, retry_delay, send_pending
+from surveys.emails import send_email_verification_email, send_login_otp_email
+from surveys.models import EmailOutbox
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    EMAIL_OUTBOX={'MAX_ATTEMPTS': 2, 'RETRY_BASE_SECONDS': 60, 'RETRY_MAX_SECONDS': 90},
+)
+class EmailOutboxTests(TestCase):
+    def test_emails_are_queued_on_commit_and_sent_by_the_worker(self):
+        user = get_user_model().objects.create_user(username='otp', email='otp@example.com', first_name='Ola')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            send_login_otp_email(user, 'otp@example.com', '123456')
+            queue_email('Hello', 'Plain', ['a@example.com'], html_body='<p>Hello</p>')
+            self.assertFalse(EmailOutbox.objects.exists())
+
+        self.assertEqual(mail.outbox, [])
+        with mock.patch('surveys.email_outbox.get_connection', wraps=get_connection) as connect:
+            self.assertEqual(send_pending(), (2, 0))
+
+        connect.assert_called_once()
+        self.assertEqual([message.to for message in mail.outbox], [['otp@example.com'], ['a@example.com']])
+        self.assertIn('Your login code is: 123456', mail.outbox[0].body)
+        self.assertEqual(mail.outbox[1].alternatives, [('<p>Hello</p>', 'text/html')])
+        self.assertEqual(
+            set(EmailOutbox.objects.values_list('status', flat=True)), {EmailOutbox.STATUS_SENT},
+        )
+        self.assertEqual(send_pending(), (0, 0))
+
+    def test_verification_email_escapes_the_name(self):
+        user = get_user_model().objects.create_user(
+            username='new', email='new@example.com', first_name='<script>x</script>',
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            send_email_verification_email(user, 'https://example.com/verify/abc/')
+
+        html = EmailOutbox.objects.get().html_body
+        self.assertIn('Hello &lt;script&gt;x&lt;/script&gt;,', html)
+        self.assertNotIn('<script>', html)
+        self.assertIn('href="https://example.com/verify/abc/"', html)
+        self.assertIn('Thank you for registering', html)
+
+    def test_failed_sends_back_off_then_give_up(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_email('Hello', 'Plain', ['a@example.com'])
+
+        with mock.patch.object(EmailMultiAlternatives, 'send', side_effect=OSError('timed out')):
+            self.assertEqual(send_pending(), (0, 1))
+            row = EmailOutbox.objects.get()
+            self.assertEqual((row.status, row.attempts, row.last_error), (EmailOutbox.STATUS_PENDING, 1, 'timed out'))
+            self.assertGreater(row.next_attempt_at, timezone.now() + timedelta(seconds=50))
+            self.assertEqual(send_pending(), (0, 0))  # not due yet
+
+            EmailOutbox.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(send_pending(), (0, 1))
+
+        self.assertEqual(EmailOutbox.objects.get().status, EmailOutbox.STATUS_FAILED)
+        self.assertEqual((retry_delay(1).seconds, retry_delay(2).seconds, retry_delay(5).seconds), (60, 90, 90))
+
+    def test_worker_command_drains_the_outbox(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for number in range(3):
+                queue_email(f'Hello {number}', 'Plain', ['a@example.com'])
+        out = io.StringIO()
+
+        call_command('run_email_worker', '--once', '--batch-size', '2', stdout=out)
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertIn('Done: sent 3, failed 0.', out.getvalue())
+
+    def test_claimed_rows_wait_for_their_claim_to_expire(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_email('Hello', 'Plain', ['a@example.com'])
+
+        # A worker that claimed the row and died before sending
+        self.assertEqual(len(claim_due(10, timezone.now(), get_config())), 1)
+        self.assertEqual(EmailOutbox.objects.get().status, EmailOutbox.STATUS_SENDING)
+        self.assertEqual(send_pending(), (0, 0))
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        with mock.patch.object(EmailMultiAlternatives, 'send', side_effect=OSError('timed out')):
+            self.assertEqual(send_pending(), (0, 1))
+        self.assertEqual(EmailOutbox.objects.get().status, EmailOutbox.STATUS_PENDING)
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_pending(), (1, 0))
+        self.assertEqual(EmailOutbox.objects.get().status, EmailOutbox.STATUS_SENT)
+
+    def test_slow_batches_renew_their_claim(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for number in range(2):
+                queue_email(f'Hello {number}', 'Plain', ['a@example.com'])
+        expiries = []
+
+        def send(message):
+            # Each message takes longer than half the claim
+            clock[0] += 200
+            expiries.append(EmailOutbox.objects.filter(status=EmailOutbox.STATUS_SENDING)
+                            .values_list('next_attempt_at', flat=True).order_by('id').last())
+            return 1
+
+        clock = [1000.0]
+        with mock.patch('surveys.email_outbox.time.monotonic', side_effect=lambda: clock[0]), \
+                mock.patch.object(EmailMultiAlternatives, 'send', send):
+            self.assertEqual(send_pending(), (2, 0))
+
+        self.assertGreater(expiries[1], expiries[0])
+
+    def test_old_sent_rows_are_purged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for number in range(3):
+                queue_email(f'Hello {number}', 'Plain', ['a@example.com'])
+        send_pending()
+        old, recent, pending = EmailOutbox.objects.order_by('id')
+        EmailOutbox.objects.filter(pk=old.pk).update(sent_at=timezone.now() - timedelta(days=31))
+        EmailOutbox.objects.filter(pk=pending.pk).update(status=EmailOutbox.STATUS_PENDING, sent_at=None)
+
+        self.assertEqual(purge_sent(), 1)
+        self.assertEqual(list(EmailOutbox.objects.order_by('id')), [recent, pending])
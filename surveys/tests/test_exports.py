@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date, datetime
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from surveys.exports import HEADERS, export_queryset, stream_export
+from surveys.models import Answer, Choice, Country, Question, Survey, SurveyCategory, SurveyResponse
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class AnswerExportTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='member', password='secret123')
+        country = Country.objects.create(name='India', code='IN')
+        category = SurveyCategory.objects.create(name='Health', slug='health', country=country)
+        self.survey = Survey.objects.create(name='Sleep', category=category, level=1)
+        self.other = Survey.objects.create(name='Diet', category=category, level=2)
+
+        self.text = Question.objects.create(question_text='Why?', question_type='text', order=1)
+        self.rating = Question.objects.create(question_text='How well?', question_type='rating', order=2)
+        self.multi = Question.objects.create(question_text='When?', question_type='multiple_choice', order=3)
+        for question in (self.text, self.rating, self.multi):
+            question.surveys.add(self.survey, self.other)
+        self.night = Choice.objects.create(question=self.multi, choice_text='Night')
+        self.noon = Choice.objects.create(question=self.multi, choice_text='Noon')
+
+        self.response = self.respond(self.survey, datetime(2026, 3, 10, 12, 0))
+        self.respond(self.other, datetime(2026, 5, 1, 12, 0))
+
+    def respond(self, survey, completed_at):
+        response = SurveyResponse.objects.create(
+            user=self.user, survey=survey, completed_at=timezone.make_aware(completed_at),
+        )
+        Answer.objects.create(response=response, question=self.text, text_answer='Too busy, "really"')
+        Answer.objects.create(response=response, question=self.rating, rating_value=4)
+        answer = Answer.objects.create(response=response, question=self.multi)
+        answer.selected_choices.set([self.night, self.noon])
+        return response
+
+    def rows(self, **filters):
+        return [dict(zip(HEADERS, row)) for row in export_queryset(**filters)]
+
+    def test_one_row_per_answer_with_choices_joined(self):
+        rows = self.rows(survey=self.survey)
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row['survey'] for row in rows}, {'Sleep'})
+        by_question = {row['question_id']: row for row in rows}
+        self.assertEqual(by_question[self.text.pk]['text_answer'], 'Too busy, "really"')
+        self.assertEqual(by_question[self.rating.pk]['rating'], 4)
+        self.assertEqual(sorted(by_question[self.multi.pk]['choices'].split('; ')), ['Night', 'Noon'])
+        self.assertIsNone(by_question[self.text.pk]['choices'])
+        self.assertEqual(by_question[self.text.pk]['country'], 'India')
+
+    def test_filters_by_completion_date_range(self):
+        self.assertEqual(len(self.rows(start=date(2026, 3, 10), end=date(2026, 3, 10))), 3)
+        self.assertEqual(len(self.rows(start=date(2026, 3, 11))), 3)
+        self.assertEqual(len(self.rows(end=date(2026, 12, 31))), 6)
+        self.assertEqual(len(self.rows(end=date(2026, 3, 9))), 0)
+
+    def test_csv_export_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            payload = b''.join(stream_export('csv', export_queryset(), batch_size=2))
+
+        rows = list(csv.DictReader(io.StringIO(payload.decode('utf-8'))))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(tuple(rows[0]), HEADERS)
+        self.assertIn('Too busy, "really"', {row['text_answer'] for row in rows})
+
+    def test_ndjson_export(self):
+        payload = b''.join(stream_export('ndjson', export_queryset(survey=self.survey)))
+
+        rows = [json.loads(line) for line in payload.decode('utf-8').splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row['response_id'] for row in rows}, {self.response.pk})
+        self.assertTrue(rows[0]['completed_at'].startswith('2026-03-10'))
+
+    @skipUnless(pq, 'pyarrow is not installed')
+    def test_parquet_export(self):
+        payload = b''.join(stream_export('parquet', export_queryset(), batch_size=4))
+
+        table = pq.read_table(io.BytesIO(payload))
+        self.assertEqual(table.num_rows, 6)
+        self.assertEqual(tuple(table.column_names), HEADERS)
+        self.assertEqual(sorted(value for value in table.column('rating').to_pylist() if value), [4, 4])
+
+    def test_admin_export_view_streams_csv(self):
+        admin_user = get_user_model().objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret123',
+        )
+        self.client.force_login(admin_user)
+        url = reverse('admin:surveys_surveyresponse_export')
+
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.get(url, {'format': 'csv', 'survey': self.other.pk})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="survey-answers.csv"')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        self.assertEqual({row['survey'] for row in rows}, {'Diet'})
+
+    def test_management_command_writes_file(self):
+        output = io.StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'answers.ndjson')
+            call_command('export_responses', format='ndjson', output=path, survey=self.survey.pk, stderr=output)
+            with open(path, encoding='utf-8') as exported:
+                self.assertEqual(len(exported.read().splitlines()), 3)
+        self.assertIn('Wrote', output.getvalue())
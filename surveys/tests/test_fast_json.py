@@ -0,0 +1,94 @@
+import io
+import json
+import uuid
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import skipIf
+
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from surveys.fast_json import FastJSONParser, FastJSONRenderer, FastJsonResponse, backend, dumps, orjson
+
+PAYLOAD = {
+    'amount': Decimal('1234.50'),
+    'created_at': datetime(2026, 3, 14, 9, 26, 53, 589793, tzinfo=dt_timezone.utc),
+    'day': date(2026, 3, 14),
+    'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'label': gettext_lazy('Wallet'),
+    'currency': '₹',
+    'counts': {1: 2},
+    'items': [None, True, 1.5],
+}
+
+
+def reference_json(data):
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class FastJsonTests(SimpleTestCase):
+    def test_stdlib_backend_matches_reference_encoding(self):
+        self.assertEqual(dumps(PAYLOAD, 'json'), reference_json(PAYLOAD))
+
+    @skipIf(orjson is None, 'orjson is not installed')
+    def test_orjson_backend_matches_stdlib_output(self):
+        self.assertEqual(dumps(PAYLOAD, 'orjson'), reference_json(PAYLOAD))
+        self.assertIn(b'"amount":"1234.50"', dumps(PAYLOAD, 'orjson'))
+        self.assertIn(b'"created_at":"2026-03-14T09:26:53.589Z"', dumps(PAYLOAD, 'orjson'))
+
+    def test_output_matches_drf_renderer_not_json_response(self):
+        data = {'name': 'Priyā', 'counts': [1, 2], 'active': True}
+
+        self.assertEqual(dumps(data), JSONRenderer().render(data))
+        self.assertNotEqual(dumps(data), JsonResponse(data).content)
+        self.assertEqual(json.loads(dumps(data)), json.loads(JsonResponse(data).content))
+
+    def test_line_separators_and_non_finite_floats_follow_drf(self):
+        data = {'text': 'one\u2028two\u2029three'}
+        for name in ('json', 'orjson') if orjson is not None else ('json',):
+            self.assertEqual(dumps(data, name), JSONRenderer().render(data))
+            self.assertEqual(json.loads(dumps(data, name)), data)
+
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({'score': float('nan')})
+        with self.assertRaises(ValueError):
+            dumps({'score': float('nan')}, 'json')
+        if orjson is not None:
+            self.assertEqual(dumps({'score': float('nan')}, 'orjson'), b'{"score":null}')
+
+    @override_settings(FAST_JSON={'BACKEND': 'json'})
+    def test_backend_can_be_pinned(self):
+        self.assertEqual(backend(), 'json')
+
+    def test_response_requires_dict_unless_unsafe(self):
+        with self.assertRaises(TypeError):
+            FastJsonResponse([1, 2])
+
+        response = FastJsonResponse([1, 2], safe=False, status=201)
+        self.assertEqual((response.status_code, response['Content-Type'], response.content),
+                         (201, 'application/json', b'[1,2]'))
+
+    def test_renderer_and_parser_round_trip(self):
+        body = FastJSONRenderer().render({'amount': Decimal('2.00'), 'name': 'Priyā'})
+
+        self.assertEqual(body, '{"amount":"2.00","name":"Priyā"}'.encode('utf-8'))
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), {'amount': '2.00', 'name': 'Priyā'})
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{broken'))
+
+    def test_renderer_defers_indented_output_to_drf(self):
+        body = FastJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+
+        self.assertEqual(body, b'{\n  "a": 1\n}')
+
+    def test_benchmark_command_reports_each_payload(self):
+        out = io.StringIO()
+        call_command('benchmark_json', '--number', '1', '--repeat', '1', stdout=out)
+
+        for name in ('catalog_page', 'wallet_history', 'export_rows'):
+            self.assertIn(name, out.getvalue())
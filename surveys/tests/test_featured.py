@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from surveys.featured import get_featured_categories
+from surveys.models import Country, Survey, SurveyCategory
+
+
+class FeaturedCategoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.india = Country.objects.create(name='India', code='IN')
+        self.usa = Country.objects.create(name='United States', code='US')
+
+        self.health = SurveyCategory.objects.create(name='Health', slug='health', country=self.india)
+        self.travel = SurveyCategory.objects.create(name='Travel', slug='travel', country=self.usa)
+        self.empty = SurveyCategory.objects.create(name='Empty', slug='empty', country=self.india)
+
+        Survey.objects.create(name='Health 1', category=self.health, level=1, is_active=True)
+        Survey.objects.create(name='Health 2', category=self.health, level=1, is_active=True)
+        Survey.objects.create(name='Travel 1', category=self.travel, level=1, is_active=True)
+
+    def test_samples_only_categories_with_active_surveys(self):
+        featured = get_featured_categories(limit=6)
+
+        self.assertCountEqual(featured, [self.health, self.travel])
+
+    def test_filters_by_country(self):
+        self.assertEqual(get_featured_categories(self.usa.id, limit=6), [self.travel])
+
+    def test_cached_pool_costs_a_single_fetch(self):
+        get_featured_categories(limit=6)
+
+        with self.assertNumQueries(1):
+            get_featured_categories(limit=6)
+
+    def test_content_change_refreshes_pool(self):
+        get_featured_categories(limit=6)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Survey.objects.create(name='Empty 1', category=self.empty, level=1, is_active=True)
+
+        self.assertIn(self.empty, get_featured_categories(limit=6))
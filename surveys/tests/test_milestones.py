@@ -3,6 +3,7 @@ from django.core import mail
 from django.test import TestCase, override_settings
 from django.utils import timezone
 
+from surveys.email_outbox import send_pending
 from surveys.milestones import check_and_award_milestones
 from surveys.models import (
     Country, MilestoneAchievement, Poll, PollResponse, Survey, SurveyCategory,
@@ -57,6 +58,13 @@ class MilestoneAchievementTests(TestCase):
             is_active=True,
         )
 
+    def _award(self):
+        # Emails are queued on commit and delivered by the outbox worker
+        with self.captureOnCommitCallbacks(execute=True):
+            awarded = check_and_award_milestones(self.user)
+        send_pending()
+        return awarded
+
     def _create_completed_surveys(self, count):
         responses = [
             SurveyResponse(
@@ -91,7 +99,7 @@ class MilestoneAchievementTests(TestCase):
     def test_awards_200_surveys_milestone_once(self):
         self._create_completed_surveys(200)
 
-        awarded = check_and_award_milestones(self.user)
+        awarded = self._award()
 
         self.assertEqual(len(awarded), 1)
         achievement = awarded[0]
@@ -106,7 +114,7 @@ class MilestoneAchievementTests(TestCase):
         self.assertEqual(mail.outbox[0].to, [self.user.email])
         self.assertEqual(mail.outbox[1].to, ['admin@sudraw.com'])
 
-        awarded_again = check_and_award_milestones(self.user)
+        awarded_again = self._award()
         self.assertEqual(awarded_again, [])
         self.assertEqual(MilestoneAchievement.objects.count(), 1)
         self.assertEqual(WalletTransaction.objects.count(), 1)
@@ -115,7 +123,7 @@ class MilestoneAchievementTests(TestCase):
     def test_awards_200_polls_wallet_milestone_once(self):
         self._create_completed_polls(200)
 
-        awarded = check_and_award_milestones(self.user)
+        awarded = self._award()
 
         self.assertEqual(len(awarded), 1)
         achievement = awarded[0]
@@ -127,7 +135,7 @@ class MilestoneAchievementTests(TestCase):
         self.assertEqual(WalletTransaction.objects.count(), 1)
         self.assertEqual(len(mail.outbox), 2)
 
-        awarded_again = check_and_award_milestones(self.user)
+        awarded_again = self._award()
         self.assertEqual(awarded_again, [])
         self.assertEqual(WalletTransaction.objects.count(), 1)
         self.assertEqual(len(mail.outbox), 2)
@@ -135,7 +143,7 @@ class MilestoneAchievementTests(TestCase):
     def test_awards_repeating_200_survey_wallet_milestones(self):
         self._create_completed_surveys(400)
 
-        awarded = check_and_award_milestones(self.user)
+        awarded = self._award()
 
         survey_awards = [
             achievement for achievement in awarded
@@ -149,7 +157,7 @@ class MilestoneAchievementTests(TestCase):
     def test_awards_2200_points_milestone_once(self):
         self._create_completed_surveys(220)
 
-        awarded = check_and_award_milestones(self.user)
+        awarded = self._award()
 
         self.assertEqual(len(awarded), 2)
         self.assertTrue(
@@ -169,7 +177,7 @@ class MilestoneAchievementTests(TestCase):
         self.assertEqual(mail.outbox[2].to, [self.user.email])
         self.assertEqual(mail.outbox[3].to, ['admin@sudraw.com'])
 
-        awarded_again = check_and_award_milestones(self.user)
+        awarded_again = self._award()
         self.assertEqual(awarded_again, [])
         self.assertEqual(MilestoneAchievement.objects.count(), 2)
         self.assertEqual(len(mail.outbox), 4)
@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from surveys.models import PrivacyPolicy
+from surveys.page_cache import is_cacheable_response, page_cache_key
+
+
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('surveys:privacy_policy')
+
+    def test_second_anonymous_request_is_served_without_queries(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first['X-Page-Cache'], 'miss')
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+
+        self.assertEqual(second['X-Page-Cache'], 'hit')
+        self.assertEqual(second.content, first.content)
+
+    def test_authenticated_requests_bypass_cache(self):
+        user = get_user_model().objects.create_user(username='member', password='secret123')
+        self.client.get(self.url)
+        self.client.force_login(user)
+
+        response = self.client.get(self.url)
+
+        self.assertNotIn('X-Page-Cache', response)
+
+    def test_content_change_invalidates_cached_pages(self):
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PrivacyPolicy.objects.create(content='Updated policy')
+
+        self.assertEqual(self.client.get(self.url)['X-Page-Cache'], 'miss')
+
+    def test_key_varies_on_query_and_country_hint(self):
+        factory = RequestFactory()
+        keys = {
+            page_cache_key(factory.get(self.url)),
+            page_cache_key(factory.get(self.url, {'page': 2})),
+            page_cache_key(factory.get(self.url, HTTP_CF_IPCOUNTRY='in')),
+        }
+
+        self.assertEqual(len(keys), 3)
+
+    def test_responses_issuing_a_csrf_token_are_not_stored(self):
+        request = RequestFactory().get(self.url)
+        request.META['CSRF_COOKIE_NEEDS_UPDATE'] = True
+
+        self.assertFalse(is_cacheable_response(request, HttpResponse('form')))
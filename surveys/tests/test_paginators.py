@@ -0,0 +1,53 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from surveys.models import Country, Survey, SurveyCategory, SurveyResponse
+from surveys.paginators import EstimatedCountPaginator
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='member', password='secret123')
+        country = Country.objects.create(name='India', code='IN')
+        category = SurveyCategory.objects.create(name='Health', slug='health', country=country)
+        self.survey = Survey.objects.create(name='Sleep', category=category, level=1)
+        for _ in range(3):
+            SurveyResponse.objects.create(user=self.user, survey=self.survey)
+
+    def test_small_counts_are_exact_and_cached(self):
+        queryset = SurveyResponse.objects.filter(survey=self.survey).order_by('pk')
+        self.assertEqual(EstimatedCountPaginator(queryset, 2).count, 3)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(EstimatedCountPaginator(queryset, 2).count, 3)
+
+    def test_estimate_above_threshold_replaces_count(self):
+        queryset = SurveyResponse.objects.order_by('pk')
+        with mock.patch.object(EstimatedCountPaginator, 'estimate_count', return_value=5_000_000):
+            with self.assertNumQueries(0):
+                paginator = EstimatedCountPaginator(queryset, 100)
+                self.assertEqual(paginator.count, 5_000_000)
+                self.assertEqual(paginator.num_pages, 50_000)
+
+    def test_estimate_below_threshold_falls_back_to_exact_count(self):
+        queryset = SurveyResponse.objects.order_by('pk')
+        with mock.patch.object(EstimatedCountPaginator, 'estimate_count', return_value=40):
+            self.assertEqual(EstimatedCountPaginator(queryset, 100).count, 3)
+
+    def test_response_changelist_skips_full_count(self):
+        admin_user = get_user_model().objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret123',
+        )
+        self.client.force_login(admin_user)
+
+        response = self.client.get(reverse('admin:surveys_surveyresponse_changelist'))
+
+        changelist = response.context['cl']
+        self.assertIsInstance(changelist.paginator, EstimatedCountPaginator)
+        self.assertEqual(changelist.result_count, 3)
+        self.assertIsNone(changelist.full_result_count)
@@ -0,0 +1,65 @@
+from django.test import TestCase, override_settings
+
+from surveys.instrumentation import QueryBudgetExceeded, fingerprint
+
+
+def instrumentation_settings(**overrides):
+    config = {'ENABLED': True, 'RAISE_ON_BUDGET': True, 'DUPLICATE_THRESHOLD': 3}
+    config.update(overrides)
+    return override_settings(
+        ROOT_URLCONF='surveys.tests.test_query_instrumentation_urls',
+        QUERY_INSTRUMENTATION=config,
+    )
+
+
+class FingerprintTests(TestCase):
+    def test_in_lists_and_literals_collapse(self):
+        first = fingerprint('SELECT * FROM "auth_user" WHERE "id" IN (%s, %s) LIMIT 21')
+        second = fingerprint('SELECT * FROM "auth_user" WHERE "id" IN (%s, %s, %s, %s)  LIMIT 5')
+
+        self.assertEqual(first, second)
+        self.assertIn('IN (...)', first)
+
+
+class QueryInstrumentationMiddlewareTests(TestCase):
+    @override_settings(
+        ROOT_URLCONF='surveys.tests.test_query_instrumentation_urls',
+        QUERY_INSTRUMENTATION={'ENABLED': False},
+    )
+    def test_disabled_by_default(self):
+        response = self.client.get('/unbudgeted/')
+
+        self.assertNotIn('Server-Timing', response)
+
+    @instrumentation_settings()
+    def test_server_timing_reports_queries_and_duplicates(self):
+        with self.assertLogs('surveys.instrumentation', level='INFO') as logs:
+            response = self.client.get('/unbudgeted/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('db-dup;', response['Server-Timing'])
+        self.assertTrue(any('"queries": 4' in line for line in logs.output))
+
+    @instrumentation_settings()
+    def test_decorated_function_view_budget_raises(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/budgeted/')
+
+    @instrumentation_settings()
+    def test_decorated_class_view_budget_raises(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/budgeted-class/')
+
+    @instrumentation_settings(BUDGETS={'test_unbudgeted': 1})
+    def test_settings_budget_by_url_name(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/unbudgeted/')
+
+    @instrumentation_settings(RAISE_ON_BUDGET=False)
+    def test_budget_overrun_is_logged_when_not_raising(self):
+        with self.assertLogs('surveys.instrumentation', level='WARNING') as logs:
+            response = self.client.get('/budgeted/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(any('Query budget exceeded' in line for line in logs.output))
@@ -0,0 +1,36 @@
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.urls import path
+from django.views import View
+
+from surveys.instrumentation import query_budget
+
+
+def run_queries(count):
+    for _ in range(count):
+        list(User.objects.filter(pk__in=[1, 2, 3]))
+
+
+def test_unbudgeted_view(request):
+    run_queries(4)
+    return HttpResponse("ok")
+
+
+@query_budget(2)
+def test_budgeted_view(request):
+    run_queries(4)
+    return HttpResponse("ok")
+
+
+@query_budget(2)
+class TestBudgetedClassView(View):
+    def get(self, request):
+        run_queries(4)
+        return HttpResponse("ok")
+
+
+urlpatterns = [
+    path('unbudgeted/', test_unbudgeted_view, name='test_unbudgeted'),
+    path('budgeted/', test_budgeted_view, name='test_budgeted'),
+    path('budgeted-class/', TestBudgetedClassView.as_view(), name='test_budgeted_class'),
+]
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from surveys.models import Country, Question, Survey, SurveyCategory
+from surveys.versioning import CATALOG, get_version
+
+
+class QuestionReorderingTests(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='India', code='IN')
+        category = SurveyCategory.objects.create(name='Health', slug='health', country=country)
+        self.survey = Survey.objects.create(name='Sleep', category=category, level=1)
+        self.other = Survey.objects.create(name='Diet', category=category, level=2)
+        self.questions = []
+        for index in range(200):
+            question = Question.objects.create(question_text=f'Question {index}', question_type='text', order=index)
+            question.surveys.add(self.survey)
+            self.questions.append(question)
+
+    def test_reorder_is_a_single_update(self):
+        ids = [question.pk for question in reversed(self.questions)]
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.survey.reorder_questions(ids), 200)
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        ordered = list(self.survey.questions.order_by('order').values_list('pk', flat=True))
+        self.assertEqual(ordered, ids)
+
+    def test_ignores_questions_of_other_surveys(self):
+        stranger = Question.objects.create(question_text='Elsewhere', question_type='text', order=7)
+        stranger.surveys.add(self.other)
+
+        self.survey.reorder_questions([stranger.pk, self.questions[1].pk, self.questions[0].pk])
+
+        stranger.refresh_from_db()
+        self.assertEqual(stranger.order, 7)
+        self.assertEqual(
+            list(Question.objects.filter(pk__in=[self.questions[0].pk, self.questions[1].pk])
+                 .order_by('order').values_list('pk', flat=True)),
+            [self.questions[1].pk, self.questions[0].pk],
+        )
+
+    def test_bumps_catalog_version_once_on_commit(self):
+        before = get_version(CATALOG)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.survey.reorder_questions([question.pk for question in self.questions])
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertNotEqual(get_version(CATALOG), before)
+
+    def test_admin_view_questions_reorders_in_bulk(self):
+        admin_user = get_user_model().objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret123',
+        )
+        self.client.force_login(admin_user)
+        url = reverse('admin:survey-questions', args=[self.survey.pk])
+        order = ','.join(str(question.pk) for question in reversed(self.questions))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {'question_order': order})
+
+        self.assertEqual(response.status_code, 302)
+        question_updates = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('UPDATE "surveys_question"')
+        ]
+        self.assertEqual(len(question_updates), 1)
+        self.assertEqual(self.survey.questions.order_by('order').first(), self.questions[-1])
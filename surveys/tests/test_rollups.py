@@ -0,0 +1,141 @@
+import io
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from surveys.analytics import daily_report
+from surveys.models import (
+    Country, DailyLuckyDrawStats, DailyPollStats, DailySurveyStats, DailyWalletStats,
+    LuckyDrawEntry, Poll, PollResponse, Survey, SurveyCategory, SurveyResponse, UserProfile,
+    WalletTransaction,
+)
+from surveys.rollups import Rollup, rollup_incremental, rollup_range
+
+DAY = date(2026, 3, 10)
+
+
+def at(day, hour=12):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()).replace(hour=hour))
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.country = Country.objects.create(name='India', code='IN')
+        self.category = SurveyCategory.objects.create(name='Health', slug='health', country=self.country)
+        self.survey = Survey.objects.create(name='Sleep', category=self.category, level=1)
+        self.poll = Poll.objects.create(title='Morning', country=self.country)
+        self.alice = User.objects.create_user(username='alice', password='secret123')
+        self.bob = User.objects.create_user(username='bob', password='secret123')
+
+        for user, day in ((self.alice, DAY), (self.alice, DAY), (self.bob, DAY), (self.bob, DAY + timedelta(days=1))):
+            SurveyResponse.objects.create(user=user, survey=self.survey, completed_at=at(day))
+        # Unfinished responses are not completions
+        SurveyResponse.objects.create(user=self.bob, survey=self.survey)
+
+        PollResponse.objects.filter(pk=PollResponse.objects.create(user=self.alice, poll=self.poll).pk).update(
+            submitted_at=at(DAY),
+        )
+
+        entries = [
+            LuckyDrawEntry(user=self.alice, survey=self.survey, is_winner=True, guessed_number=7,
+                           winning_number=7, surveys_at_play=2),
+            LuckyDrawEntry(user=self.bob, survey=self.survey, guessed_number=3, winning_number=7, surveys_at_play=2),
+            LuckyDrawEntry(user=self.bob, poll=self.poll, draw_type=LuckyDrawEntry.DRAW_TYPE_POLL,
+                           guessed_number=1, winning_number=9, surveys_at_play=0, polls_at_play=1),
+        ]
+        LuckyDrawEntry.objects.bulk_create(entries)
+        LuckyDrawEntry.objects.update(created_at=at(DAY))
+
+        profile, _ = UserProfile.objects.get_or_create(user=self.alice)
+        UserProfile.objects.filter(pk=profile.pk).update(country=self.country)
+        for kind, amount in (('credit', '5.00'), ('credit', '2.50'), ('debit', '4.00')):
+            WalletTransaction.objects.create(
+                profile=profile, transaction_type=kind, amount=Decimal(amount), currency_code='INR',
+                description='test', balance_after=Decimal('0'),
+            )
+        WalletTransaction.objects.update(created_at=at(DAY))
+
+    def test_rollup_builds_daily_facts(self):
+        written = rollup_range(DAY, DAY + timedelta(days=1))
+
+        self.assertEqual(written['surveys'], 2)
+        first = DailySurveyStats.objects.get(date=DAY)
+        self.assertEqual(
+            (first.survey_id, first.category_id, first.country_id),
+            (self.survey.pk, self.category.pk, self.country.pk),
+        )
+        self.assertEqual((first.completions, first.unique_users), (3, 2))
+        self.assertEqual(DailySurveyStats.objects.get(date=DAY + timedelta(days=1)).completions, 1)
+
+        self.assertEqual(DailyPollStats.objects.get(date=DAY).responses, 1)
+
+        survey_draws = DailyLuckyDrawStats.objects.get(date=DAY, draw_type=LuckyDrawEntry.DRAW_TYPE_SURVEY)
+        self.assertEqual((survey_draws.plays, survey_draws.wins, survey_draws.unique_users), (2, 1, 2))
+        self.assertEqual(survey_draws.country_id, self.country.pk)
+        poll_draws = DailyLuckyDrawStats.objects.get(date=DAY, draw_type=LuckyDrawEntry.DRAW_TYPE_POLL)
+        self.assertEqual((poll_draws.poll_id, poll_draws.country_id, poll_draws.wins), (self.poll.pk, self.country.pk, 0))
+
+        credits = DailyWalletStats.objects.get(date=DAY, transaction_type='credit')
+        self.assertEqual((credits.transactions, credits.amount, credits.country_id), (2, Decimal('7.50'), self.country.pk))
+
+    def test_unaliased_columns_are_refused(self):
+        # A plain values() field has no alias in the compiled SELECT, so its position can't be checked
+        rollup = Rollup(
+            'broken', DailySurveyStats, SurveyResponse, 'completed_at',
+            lambda rows: rows.values('day', 'survey_id').annotate(completions=Count('pk')),
+            {'day': 'date', 'survey_id': 'survey', 'completions': 'completions'},
+        )
+
+        with self.assertRaises(ImproperlyConfigured):
+            rollup.run(DAY, DAY + timedelta(days=1))
+        self.assertFalse(DailySurveyStats.objects.exists())
+
+    def test_rerun_is_idempotent(self):
+        rollup_range(DAY, DAY)
+        rollup_range(DAY, DAY)
+
+        self.assertEqual(DailySurveyStats.objects.filter(date=DAY).count(), 1)
+        self.assertEqual(DailyWalletStats.objects.filter(date=DAY).count(), 2)
+
+    def test_incremental_continues_from_last_rolled_up_day(self):
+        rollup_incremental(today=DAY)
+        self.assertFalse(DailySurveyStats.objects.filter(date__gt=DAY).exists())
+
+        SurveyResponse.objects.create(user=self.alice, survey=self.survey, completed_at=at(DAY))
+        rollup_incremental(today=DAY + timedelta(days=1))
+
+        self.assertEqual(DailySurveyStats.objects.get(date=DAY).completions, 4)
+        self.assertEqual(DailySurveyStats.objects.get(date=DAY + timedelta(days=1)).completions, 1)
+
+    @override_settings(SURVEY_CONFIG={'DEFAULT_COOLDOWN_DAYS': 5})
+    def test_incremental_picks_up_backdated_completions(self):
+        rollup_incremental(today=DAY + timedelta(days=1))
+
+        # A batch submission synced later, completed offline on DAY
+        SurveyResponse.objects.create(user=self.alice, survey=self.survey, completed_at=at(DAY))
+        rollup_incremental(today=DAY + timedelta(days=4))
+
+        self.assertEqual(DailySurveyStats.objects.get(date=DAY).completions, 4)
+
+    def test_command_and_report_endpoint(self):
+        call_command('rollup_daily_stats', '--since', '2026-03-10', '--until', '2026-03-11', stdout=io.StringIO())
+
+        report = daily_report(DAY, DAY + timedelta(days=1), self.country.pk)
+        self.assertEqual([day['survey_completions'] for day in report['days']], [3, 1])
+        self.assertEqual(report['days'][0]['wallet'], {'INR': {'credits': '7.50', 'debits': '4.00'}})
+
+        admin_user = get_user_model().objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret123',
+        )
+        self.client.force_login(admin_user)
+        data = self.client.get(reverse('daily-report-list'), {'start': '2026-03-10', 'end': '2026-03-10'}).json()
+        self.assertEqual(data['days'][0]['lucky_draw_plays'], 3)
+        self.assertEqual(data['days'][0]['lucky_draw_wins'], 1)
@@ -0,0 +1,67 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from surveys import instrumentation
+from surveys.models import Country, SurveyCategory
+from surveys.search_cache import ResultCache, get_cached_results, normalize_query, result_cache
+
+
+class ResultCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        lru = ResultCache(max_entries=2, timeout=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+
+    def test_entries_expire(self):
+        lru = ResultCache(max_entries=2, timeout=-1)
+        lru.set('a', 1)
+
+        self.assertIsNone(lru.get('a'))
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query('  Health   SURVEY '), 'health survey')
+
+
+class SearchViewCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        result_cache.clear()
+        instrumentation.reset_counters()
+        self.country = Country.objects.create(name='India', code='IN')
+        SurveyCategory.objects.create(name='Health', slug='health', country=self.country)
+        self.url = reverse('surveys:search')
+
+    def test_repeated_query_is_served_from_cache(self):
+        self.client.get(self.url, {'q': 'Health'})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'q': ' health '})
+
+        self.assertEqual([result['title'] for result in response.context['results']], ['Health'])
+        self.assertEqual(instrumentation.get_counters(), {'search_cache.miss': 1, 'search_cache.hit': 1})
+
+    def test_results_are_computed_from_the_normalized_query(self):
+        queries = []
+
+        def compute(query):
+            queries.append(query)
+            return [query]
+
+        self.assertEqual(get_cached_results('  HEALTH  Survey', 1, False, compute), ['health survey'])
+        self.assertEqual(get_cached_results('health survey', 1, False, compute), ['health survey'])
+        self.assertEqual(queries, ['health survey'])
+
+    def test_catalog_change_invalidates_results(self):
+        self.client.get(self.url, {'q': 'heal'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            SurveyCategory.objects.create(name='Healthy eating', slug='healthy-eating', country=self.country)
+
+        response = self.client.get(self.url, {'q': 'heal'})
+        self.assertEqual(len(response.context['results']), 2)
@@ -0,0 +1,71 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from surveys.models import Country, Poll, PollQuestion, Question, SearchEntry, Survey, SurveyCategory
+
+
+class SearchIndexMaintenanceTests(TestCase):
+    def setUp(self):
+        self.country = Country.objects.create(name='India', code='IN')
+        self.category = SurveyCategory.objects.create(name='Health', slug='health', country=self.country)
+        self.survey = Survey.objects.create(name='Sleep habits', category=self.category, level=1, is_active=True)
+        self.question = Question.objects.create(question_text='How many hours do you sleep?', question_type='text')
+        self.question.surveys.add(self.survey)
+
+    def entries(self, object_type):
+        return SearchEntry.objects.filter(object_type=object_type)
+
+    def test_saves_create_entries(self):
+        self.assertEqual(self.entries(SearchEntry.TYPE_CATEGORY).get().title, 'Health')
+        self.assertEqual(self.entries(SearchEntry.TYPE_SURVEY).get().keywords, 'Health')
+        question_entry = self.entries(SearchEntry.TYPE_QUESTION).get()
+        self.assertEqual(question_entry.description, 'Sleep habits')
+        self.assertEqual(question_entry.country, self.country)
+
+    def test_deactivating_survey_removes_it_and_its_questions(self):
+        self.survey.is_active = False
+        self.survey.save()
+
+        self.assertFalse(self.entries(SearchEntry.TYPE_SURVEY).exists())
+        self.assertFalse(self.entries(SearchEntry.TYPE_QUESTION).exists())
+
+    def test_removing_question_from_survey_updates_entry(self):
+        self.survey.questions.clear()
+
+        self.assertFalse(self.entries(SearchEntry.TYPE_QUESTION).exists())
+
+    def test_deleting_category_cascades_entries(self):
+        self.category.delete()
+
+        self.assertFalse(SearchEntry.objects.exists())
+
+    def test_poll_entries_are_public(self):
+        poll = Poll.objects.create(title='Morning routine', country=self.country)
+        PollQuestion.objects.create(poll=poll, question_text='Coffee or tea?', question_type='single_choice')
+
+        self.assertTrue(self.entries(SearchEntry.TYPE_POLL).get().is_public)
+        self.assertFalse(self.entries(SearchEntry.TYPE_POLL_QUESTION).get().is_public)
+
+    def test_rebuild_command_recreates_entries(self):
+        SearchEntry.objects.all().delete()
+        out = StringIO()
+
+        call_command('rebuild_search_index', stdout=out)
+
+        self.assertEqual(SearchEntry.objects.count(), 3)
+        self.assertIn('Indexed 3 entries.', out.getvalue())
+
+
+class SearchViewFallbackTests(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='India', code='IN')
+        SurveyCategory.objects.create(name='Health', slug='health', country=country)
+
+    def test_sqlite_uses_icontains_fallback(self):
+        response = self.client.get(reverse('surveys:search'), {'q': 'heal'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['title'] for result in response.context['results']], ['Health'])
@@ -0,0 +1,92 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from surveys.models import (
+    Answer, Choice, Country, LuckyDrawEntry, Question, Survey, SurveyCategory, SurveyResponse,
+)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='reader', password='secret123')
+        self.client.force_login(self.user)
+        country = Country.objects.create(name='India', code='IN')
+        category = SurveyCategory.objects.create(name='Health', slug='health', country=country)
+        for index in range(3):
+            survey = Survey.objects.create(name=f'Health {index}', category=category, level=1)
+            question = Question.objects.create(question_text='Smoke?', question_type='single_choice')
+            question.surveys.add(survey)
+            Choice.objects.create(question=question, choice_text='Yes')
+            response = SurveyResponse.objects.create(user=self.user, survey=survey, completed_at=timezone.now())
+            Answer.objects.create(response=response, question=question).selected_choices.set(
+                question.choices.all()
+            )
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_fields_limit_output_and_relations_render_as_keys(self):
+        data = self.get(reverse('survey-list'), fields='id,name,category,questions')
+
+        first = data['results'][0]
+        self.assertEqual(set(first), {'id', 'name', 'category', 'questions'})
+        self.assertIsInstance(first['category'], int)
+        self.assertEqual(len(first['questions']), 1)
+        self.assertIsInstance(first['questions'][0], int)
+
+    def test_expand_nests_relations(self):
+        data = self.get(reverse('survey-list'), fields='id', expand='category,questions')
+
+        first = data['results'][0]
+        self.assertEqual(first['category']['name'], 'Health')
+        self.assertEqual(first['questions'][0]['choices'][0]['choice_text'], 'Yes')
+
+    def test_unrequested_relations_are_not_queried(self):
+        # session, user, validator, count, page, session save (+ savepoints)
+        with self.assertNumQueries(8) as captured:
+            self.get(reverse('survey-list'), fields='id,name')
+        page_sql = captured.captured_queries[4]['sql']
+        self.assertNotIn('"description"', page_sql)
+        self.assertNotIn('surveys_question', page_sql)
+
+    def test_expanded_responses_prefetch_answers_in_batches(self):
+        url = reverse('surveyresponse-list')
+        # session, user, page, answers, selected choices, session save (+ savepoints)
+        with self.assertNumQueries(8):
+            data = self.get(url, fields='id,completed_at', expand='answers')
+        self.assertEqual(len(data['results']), 3)
+        self.assertEqual(len(data['results'][0]['answers'][0]['selected_choices']), 1)
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='player', password='secret123')
+        self.client.force_login(self.user)
+        now = timezone.now()
+        for index in range(5):
+            entry = LuckyDrawEntry.objects.create(
+                user=self.user, guessed_number=index + 1, winning_number=40, surveys_at_play=index,
+            )
+            LuckyDrawEntry.objects.filter(pk=entry.pk).update(created_at=now - timedelta(minutes=index))
+
+    def test_pages_follow_created_at_without_count(self):
+        url = reverse('luckydrawentry-list')
+        first = self.client.get(url, {'page_size': 2}).json()
+
+        self.assertNotIn('count', first)
+        self.assertEqual([item['guessed_number'] for item in first['results']], [1, 2])
+
+        second = self.client.get(first['next']).json()
+        third = self.client.get(second['next']).json()
+        self.assertEqual([item['guessed_number'] for item in second['results']], [3, 4])
+        self.assertEqual([item['guessed_number'] for item in third['results']], [5])
+        self.assertIsNone(third['next'])
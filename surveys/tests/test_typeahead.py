@@ -0,0 +1,125 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from surveys.models import Country, Poll, Question, Survey, SurveyCategory, UserProfile
+from surveys import typeahead
+from surveys.typeahead import ALL, PUBLIC, TypeaheadIndex
+
+
+class TypeaheadIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.india = Country.objects.create(name='India', code='IN')
+        self.usa = Country.objects.create(name='United States', code='US')
+        health = SurveyCategory.objects.create(name='Health', slug='health', country=self.india)
+        SurveyCategory.objects.create(name='Healthy Travel', slug='healthy-travel', country=self.usa)
+        survey = Survey.objects.create(name='Sleep habits', category=health, level=1, is_active=True)
+        question = Question.objects.create(question_text='How healthy is your diet?', question_type='text')
+        question.surveys.add(survey)
+        Poll.objects.create(title='Health check', country=self.india)
+
+    def titles(self, suggestions):
+        return [suggestion['title'] for suggestion in suggestions]
+
+    def test_prefix_lookup_ranks_categories_first(self):
+        # 'Sleep habits' matches through its category name, indexed as a keyword
+        suggestions, completions = TypeaheadIndex.build().lookup('heal', ALL)
+
+        self.assertEqual(
+            self.titles(suggestions),
+            ['Health', 'Healthy Travel', 'Sleep habits', 'Health check', 'How healthy is your diet?'],
+        )
+        self.assertEqual(set(completions), {'health', 'healthy'})
+
+    def test_all_tokens_must_match(self):
+        suggestions, _ = TypeaheadIndex.build().lookup('heal trav', ALL)
+
+        self.assertEqual(self.titles(suggestions), ['Healthy Travel'])
+
+    def test_partitions_by_country_and_visibility(self):
+        index = TypeaheadIndex.build()
+
+        self.assertNotIn('Healthy Travel', self.titles(index.lookup('heal', self.india.id)[0]))
+        self.assertNotIn('How healthy is your diet?', self.titles(index.lookup('heal', PUBLIC)[0]))
+
+    def test_stats_report_memory(self):
+        stats = TypeaheadIndex.build().stats()
+
+        self.assertEqual(stats['documents'], 5)
+        self.assertGreater(stats['memory_bytes'], 0)
+
+
+class AutocompleteEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.create(name='India', code='IN')
+        category = SurveyCategory.objects.create(name='Health', slug='health', country=self.country)
+        Survey.objects.create(name='Sleep habits', category=category, level=1, is_active=True)
+        self.url = reverse('surveys:search_autocomplete')
+        # Versions are seeded from the clock, so an index left by another test could look current
+        typeahead._index = None
+
+    def test_anonymous_visitors_only_get_public_results(self):
+        data = self.client.get(self.url, {'q': 'sl'}).json()
+
+        self.assertEqual(data['results'], [])
+
+    def test_members_get_results_for_their_country(self):
+        user = get_user_model().objects.create_user(username='member', password='secret123')
+        UserProfile.objects.update_or_create(user=user, defaults={'country': self.country})
+        self.client.force_login(user)
+
+        data = self.client.get(self.url, {'q': 'sl'}).json()
+
+        self.assertEqual(data['results'][0]['title'], 'Sleep habits')
+        self.assertEqual(data['completions'], ['sleep'])
+
+    @override_settings(TYPEAHEAD={'BACKGROUND_REBUILD': False})
+    def test_index_is_reused_until_entries_change(self):
+        self.client.get(self.url, {'q': 'he'})
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url, {'q': 'hea'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            SurveyCategory.objects.create(name='Hobbies', slug='hobbies', country=self.country)
+
+        data = self.client.get(self.url, {'q': 'hob'}).json()
+        self.assertEqual(data['results'][0]['title'], 'Hobbies')
+
+    def test_stale_index_is_served_while_rebuilt_in_the_background(self):
+        self.client.get(self.url, {'q': 'he'})
+        with self.captureOnCommitCallbacks(execute=True):
+            SurveyCategory.objects.create(name='Hobbies', slug='hobbies', country=self.country)
+
+        with mock.patch('surveys.typeahead.threading.Thread') as thread:
+            data = self.client.get(self.url, {'q': 'hob'}).json()
+            self.client.get(self.url, {'q': 'hob'})
+
+        self.assertEqual(data['results'], [])
+        thread.assert_called_once()
+        # Run the rebuild in this thread: a real one could not see the test's uncommitted rows
+        typeahead._rebuild(*thread.call_args.kwargs['args'])
+        self.assertEqual(self.client.get(self.url, {'q': 'hob'}).json()['results'][0]['title'], 'Hobbies')
+
+    @override_settings(TYPEAHEAD={'MAX_AGE': 60, 'BACKGROUND_REBUILD': False})
+    def test_index_expires_without_a_version_bump(self):
+        index = typeahead.get_index()
+
+        self.assertIs(typeahead.get_index(), index)
+        with mock.patch('surveys.typeahead.time.monotonic', return_value=index.built_at + 61):
+            self.assertIsNot(typeahead.get_index(), index)
+
+    def test_rebuild_command_reports_size(self):
+        out = StringIO()
+
+        call_command('rebuild_typeahead_index', stdout=out)
+
+        self.assertIn('memory', out.getvalue())
+        self.assertIn('documents    2', out.getvalue())
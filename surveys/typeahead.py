@@ -0,0 +1,263 @@
+"""In-process inverted index for search-as-you-type.
+
+The index is built from ``SearchEntry`` rows (see ``surveys.search``) into
+per-partition structures: one partition per country, a ``public`` partition
+with what anonymous visitors may see, and an ``all`` partition for members
+without a country. Each partition holds a sorted term array (prefix lookups are
+a ``bisect`` plus a short scan) and compact posting lists of document ids.
+
+Every worker keeps its own copy, stamped with the ``search`` version and its
+build time. The version is bumped on commit whenever search entries change and
+lives in the shared cache (``surveys.versioning``), so a change made in one
+worker becomes visible to the others through that store. A copy is stale once
+the stamp moves or it is older than ``TYPEAHEAD['MAX_AGE']`` (which bounds how
+long a missed bump, e.g. after a cache flush, can go unnoticed).
+
+A stale copy keeps answering lookups while a background thread builds its
+replacement and swaps it in, so request threads never pay for a rebuild; only
+the very first lookup in a process builds inline (``warm_index()`` does that at
+startup). ``manage.py rebuild_typeahead_index`` reports the index size and can
+make every worker rebuild.
+"""
+import logging
+import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from .models import SearchEntry
+from .versioning import SEARCH, bump_version, get_version
+
+logger = logging.getLogger(__name__)
+
+PUBLIC = 'public'
+ALL = 'all'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Lower sorts first when ranking suggestions
+TYPE_PRIORITY = {
+    SearchEntry.TYPE_CATEGORY: 0,
+    SearchEntry.TYPE_SURVEY: 1,
+    SearchEntry.TYPE_POLL: 2,
+    SearchEntry.TYPE_QUESTION: 3,
+    SearchEntry.TYPE_POLL_QUESTION: 4,
+}
+
+TYPE_LABELS = dict(SearchEntry.OBJECT_TYPES)
+
+DEFAULT_CONFIG = {
+    'MAX_AGE': 60 * 10,
+    'BACKGROUND_REBUILD': True,
+}
+
+# Prefixes this short match too many terms to be useful; cap the posting lists scanned
+MAX_TERMS_PER_PREFIX = 200
+
+
+def get_config():
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'TYPEAHEAD', {}) or {})
+    return config
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class Partition:
+    __slots__ = ('terms', 'postings')
+
+    def __init__(self, term_postings):
+        self.terms = sorted(term_postings)
+        # array('I') of doc ids, sorted so the best-ranked documents come first
+        self.postings = [array('I', sorted(term_postings[term])) for term in self.terms]
+
+    def prefix_range(self, prefix):
+        start = bisect_left(self.terms, prefix)
+        end = start
+        limit = min(len(self.terms), start + MAX_TERMS_PER_PREFIX)
+        while end < limit and self.terms[end].startswith(prefix):
+            end += 1
+        return start, end
+
+    def match(self, prefix):
+        start, end = self.prefix_range(prefix)
+        matched = set()
+        for position in range(start, end):
+            matched.update(self.postings[position])
+        return matched
+
+    def completions(self, prefix, limit):
+        start, end = self.prefix_range(prefix)
+        ranked = sorted(range(start, end), key=lambda position: -len(self.postings[position]))
+        return [self.terms[position] for position in ranked[:limit]]
+
+
+class TypeaheadIndex:
+    def __init__(self, docs, partitions, version):
+        # docs[i] = (object_type, title, url); ids are assigned in rank order
+        self.docs = docs
+        self.partitions = partitions
+        self.version = version
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls, version=None):
+        entries = SearchEntry.objects.values_list(
+            'object_type', 'title', 'keywords', 'url', 'country_id', 'is_public',
+        )
+        rows = sorted(set(entries), key=lambda row: (TYPE_PRIORITY[row[0]], len(row[1]), row[1]))
+
+        docs = []
+        doc_ids = {}
+        partitions = {}
+        for object_type, title, keywords, url, country_id, is_public in rows:
+            key = (object_type, title, url)
+            doc_id = doc_ids.get(key)
+            if doc_id is None:
+                doc_id = doc_ids[key] = len(docs)
+                docs.append(key)
+            names = [country_id, ALL] + ([PUBLIC] if is_public else [])
+            for term in set(tokenize(f'{title} {keywords}')):
+                for name in names:
+                    partitions.setdefault(name, {}).setdefault(term, set()).add(doc_id)
+
+        return cls(
+            docs,
+            {name: Partition(term_postings) for name, term_postings in partitions.items()},
+            version,
+        )
+
+    def is_stale(self, version, max_age):
+        return self.version != version or time.monotonic() - self.built_at > max_age
+
+    def lookup(self, query, partition=ALL, limit=8, completion_limit=5):
+        """Return ``(suggestions, completions)`` for a partially typed query."""
+        tokens = tokenize(query)
+        part = self.partitions.get(partition)
+        if not tokens or part is None:
+            return [], []
+
+        matched = None
+        for token in sorted(tokens, key=len, reverse=True):
+            hits = part.match(token)
+            matched = hits if matched is None else matched & hits
+            if not matched:
+                return [], part.completions(tokens[-1], completion_limit)
+
+        suggestions = [
+            {
+                'type': TYPE_LABELS[self.docs[doc_id][0]],
+                'title': self.docs[doc_id][1],
+                'url': self.docs[doc_id][2],
+            }
+            for doc_id in sorted(matched)[:limit]
+        ]
+        return suggestions, part.completions(tokens[-1], completion_limit)
+
+    def stats(self):
+        """Term/posting counts and an approximate memory footprint in bytes."""
+        size = sys.getsizeof(self.docs) + sum(
+            sys.getsizeof(doc) + sum(sys.getsizeof(value) for value in doc) for doc in self.docs
+        )
+        terms = postings = 0
+        for part in self.partitions.values():
+            terms += len(part.terms)
+            postings += sum(len(posting) for posting in part.postings)
+            size += sys.getsizeof(part.terms) + sum(sys.getsizeof(term) for term in part.terms)
+            size += sys.getsizeof(part.postings) + sum(sys.getsizeof(posting) for posting in part.postings)
+        return {
+            'version': self.version,
+            'documents': len(self.docs),
+            'partitions': len(self.partitions),
+            'terms': terms,
+            'postings': postings,
+            'memory_bytes': size,
+        }
+
+
+_index = None
+_lock = threading.Lock()
+_rebuilding = False
+
+
+def _rebuild(version):
+    """Build a fresh index and swap it in for this process."""
+    global _index, _rebuilding
+    try:
+        _index = TypeaheadIndex.build(version)
+    except DatabaseError:
+        logger.exception("Could not rebuild the search type-ahead index")
+    finally:
+        _rebuilding = False
+
+
+def _rebuild_in_background(version):
+    try:
+        _rebuild(version)
+    finally:
+        # The thread opened its own connections; don't leave them to the server's idle timeout
+        connections.close_all()
+
+
+def get_index():
+    """
+    Return this process's index.
+
+    A stale index is returned as is while its replacement is built in a
+    background thread; only a process without any index builds inline.
+    """
+    global _index, _rebuilding
+    config = get_config()
+    version = get_version(SEARCH)
+    index = _index
+    if index is not None and not index.is_stale(version, config['MAX_AGE']):
+        return index
+
+    with _lock:
+        if _index is None:
+            _index = TypeaheadIndex.build(version)
+            return _index
+        if _rebuilding or not _index.is_stale(version, config['MAX_AGE']):
+            return _index
+        if not config['BACKGROUND_REBUILD']:
+            _index = TypeaheadIndex.build(version)
+            return _index
+        _rebuilding = True
+        threading.Thread(
+            target=_rebuild_in_background, args=(version,), name='typeahead-rebuild', daemon=True,
+        ).start()
+        return _index
+
+
+def warm_index():
+    """Build the index at process start so the first keystroke doesn't pay for it."""
+    try:
+        stats = get_index().stats()
+    except DatabaseError:
+        logger.exception("Could not build the search type-ahead index at startup")
+        return None
+    logger.info("Search type-ahead index ready: %s", stats)
+    return stats
+
+
+def invalidate_index():
+    """Make every worker start rebuilding its index on its next lookup."""
+    return bump_version(SEARCH)
+
+
+def partition_for(user):
+    if not user.is_authenticated:
+        return PUBLIC
+    profile = getattr(user, 'profile', None)
+    return profile.country_id if profile and profile.country_id else ALL
+
+
+def autocomplete(query, user, limit=8):
+    return get_index().lookup(query, partition_for(user), limit=limit)
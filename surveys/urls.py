@@ -17,6 +17,7 @@ from .views_frontend import (
     WalletTransactionHistoryView,
     WalletWithdrawalRequestView,
     SearchView,
+    search_autocomplete,
     poll_detail,
     poll_question,
     poll_list,
@@ -39,6 +40,7 @@ urlpatterns = [
     path('wallet/', WalletTransactionHistoryView.as_view(), name='wallet_history'),
     path('wallet/withdraw/', WalletWithdrawalRequestView.as_view(), name='wallet_withdrawal_request'),
     path('search/', SearchView.as_view(), name='search'),
+    path('search/autocomplete/', search_autocomplete, name='search_autocomplete'),
     path('features/', FeaturesPageView.as_view(), name='features'),
     path('contact/', ContactPageView.as_view(), name='contact'),
     path('faq/', FAQPageView.as_view(), name='faq'),
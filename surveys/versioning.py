@@ -0,0 +1,45 @@
+"""Cache-backed version counters for derived data.
+
+Cached artefacts (featured pools, rendered pages, search results, serialized
+catalog payloads) embed a version number in their cache keys. Bumping the
+version is how content changes invalidate them: old keys simply stop being read
+and expire on their own, so nothing has to enumerate or delete cache entries.
+
+Versions live in the default cache, which settings point at a shared backend
+(Redis when ``REDIS_URL`` is set, otherwise the ``surveys_cache`` database
+table), so every worker process and dyno reads the same value. A per-process
+cache such as ``LocMemCache`` would let each worker invalidate only itself. A
+missing counter is seeded from the clock, which keeps a cache flush from
+reusing a version number that older entries could still be stored under.
+"""
+import time
+
+from django.core.cache import cache
+
+CATALOG = 'catalog'
+SEARCH = 'search'
+
+VERSION_KEY = 'surveys:version:{}'
+
+
+def _seed():
+    return int(time.time() * 1000)
+
+
+def get_version(name=CATALOG):
+    key = VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _seed(), None)
+        version = cache.get(key) or _seed()
+    return version
+
+
+def bump_version(name=CATALOG):
+    key = VERSION_KEY.format(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _seed()
+        cache.set(key, version, None)
+        return version
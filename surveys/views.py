@@ -10,7 +10,6 @@ from django.http import JsonResponse, Http404, HttpResponse
 from django.views.generic import ListView
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
-import json
 from .models import (
     SurveyCategory, Survey, Question, 
     Choice, SurveyResponse, Answer, LuckyDrawEntry, PollResponse, WalletTransaction
@@ -21,6 +20,7 @@ from django.conf import settings
 from django.views.decorators.clickjacking import xframe_options_sameorigin
 from django.views.decorators.cache import never_cache
 from .milestones import check_and_award_milestones
+from .fast_json import FastJsonResponse, loads
 from django.contrib.auth import logout
 
 
@@ -59,10 +59,10 @@ def should_show_advertisement(request):
 @csrf_exempt
 def survey_ad_shown(request):
     if not request.user.is_authenticated:
-        return JsonResponse({'status': 'error', 'message': 'Not authenticated'}, status=401)
+        return FastJsonResponse({'status': 'error', 'message': 'Not authenticated'}, status=401)
 
     try:
-        data = json.loads(request.body)
+        data = loads(request.body)
         reset_counter = data.get('reset', False)
         
         if reset_counter:
@@ -71,17 +71,17 @@ def survey_ad_shown(request):
             # Clear the redirect URL after using it
             redirect_url = request.session.pop('redirect_after_ad', {}).get('url', '')
             request.session.modified = True
-            return JsonResponse({
+            return FastJsonResponse({
                 'status': 'success',
                 'redirect_url': redirect_url or None
             })
         else:
             # Just acknowledge the ad was shown
-            return JsonResponse({'status': 'success'})
+            return FastJsonResponse({'status': 'success'})
             
     except Exception as e:
         print(f"DEBUG: survey_ad_shown - Error: {str(e)}")
-        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+        return FastJsonResponse({'status': 'error', 'message': str(e)}, status=400)
 
 def survey_list(request):
     # ... your existing code ...
@@ -8,6 +8,11 @@ from django.conf import settings  # Add this import
 from .views import should_show_advertisement
 from django.utils import timezone
 from django.db.models import Sum
+from django.utils.decorators import method_decorator
+from .db_router import read_only_view
+
+
+@method_decorator(read_only_view, name='dispatch')
 class CategoryListView(ListView):
     model = SurveyCategory
     template_name = 'surveys/category_list.html'
@@ -70,6 +75,7 @@ class CategoryListView(ListView):
         return context
         
 
+@method_decorator(read_only_view, name='dispatch')
 class CategoryDetailView(DetailView):
     model = SurveyCategory
     template_name = 'surveys/category_detail.html'
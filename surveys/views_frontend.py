@@ -1,4 +1,5 @@
 from decimal import Decimal
+from functools import lru_cache
 from django.shortcuts import render, redirect, reverse, get_object_or_404
 from django.views.generic import TemplateView, CreateView, FormView, ListView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -12,8 +13,6 @@ from .models import (
     JournalPost, JournalCategory, PrivacyPolicy, AboutUs
 )
 from django.http import JsonResponse, HttpResponseRedirect
-from django.core.mail import send_mail
-from django.conf import settings
 from django.contrib import messages
 from django.db import models
 from django.urls import reverse_lazy
@@ -30,23 +29,81 @@ from django.urls import reverse_lazy
 from django.contrib.auth.views import LoginView
 from django.http import HttpResponseRedirect
 from .forms import UserRegistrationForm, UserRegisterForm, PollResponseForm, WalletWithdrawalRequestForm
+from .featured import get_featured_categories, get_featured_polls
+from .page_cache import cache_anonymous_page
+from .db_router import read_only_view
+from .search import search_entries, uses_search_index
+from .typeahead import autocomplete
+from .search_cache import get_cached_results
+from .conditional import (
+    about_us_stamp, conditional_page, journal_detail_stamp, journal_list_stamp, privacy_policy_stamp,
+)
 
 from django.contrib.auth.views import LoginView as BaseLoginView
 from django.contrib.auth import authenticate, login as auth_login
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.cache import never_cache
+from django.utils.decorators import method_decorator
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.shortcuts import redirect, render
 from django.http import HttpResponseRedirect, JsonResponse
 import logging
 from django.conf import settings as django_settings
-from .emails import send_withdrawal_request_admin_notification
+from .emails import (
+    send_email_verification_email, send_login_otp_email, send_withdrawal_request_admin_notification,
+)
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 
+STATIC_SEARCH_PAGES = (
+    {
+        'title': 'Home',
+        'description': 'Sudraw surveys, polls, categories, and rewards.',
+        'url_name': 'surveys:home',
+        'keywords': 'home sudraw survey surveys polls rewards lucky draw',
+    },
+    {
+        'title': 'FAQ',
+        'description': 'Answers about surveys, polls, rewards, privacy, and account questions.',
+        'url_name': 'surveys:faq',
+        'keywords': 'faq help questions surveys polls rewards privacy account',
+    },
+    {
+        'title': 'Features',
+        'description': 'Sudraw features and platform information.',
+        'url_name': 'surveys:features',
+        'keywords': 'features platform survey polls rewards',
+    },
+    {
+        'title': 'Contact Us',
+        'description': 'Contact Sudraw support.',
+        'url_name': 'surveys:contact',
+        'keywords': 'contact support email help',
+    },
+)
+
+
+@lru_cache(maxsize=None)
+def get_static_search_pages():
+    """(lowercased haystack, result) pairs for STATIC_SEARCH_PAGES, built once per process."""
+    return tuple(
+        (
+            f"{page['title']} {page['description']} {page['keywords']}".lower(),
+            {
+                'type': 'Page',
+                'title': page['title'],
+                'description': page['description'],
+                'url': reverse(page['url_name']),
+            },
+        )
+        for page in STATIC_SEARCH_PAGES
+    )
+
+
+@method_decorator(read_only_view, name='dispatch')
 class SearchView(TemplateView):
     template_name = 'surveys/search_results.html'
     min_query_length = 2
@@ -58,10 +115,13 @@ class SearchView(TemplateView):
         results = []
 
         if len(query) >= self.min_query_length:
-            if self.request.user.is_authenticated:
-                results = self.get_search_results(query)
-            else:
-                results = self.get_public_search_results(query)
+            user_country = self.get_user_country()
+            results = get_cached_results(
+                query,
+                user_country.id if user_country else None,
+                self.request.user.is_authenticated,
+                self.get_results,
+            )
 
         context.update({
             'query': query,
@@ -72,6 +132,25 @@ class SearchView(TemplateView):
         })
         return context
 
+    def get_results(self, query):
+        if uses_search_index():
+            return self.get_indexed_search_results(query)
+        if self.request.user.is_authenticated:
+            return self.get_search_results(query)
+        return self.get_public_search_results(query)
+
+    def get_indexed_search_results(self, query):
+        """Ranked results from the Postgres full-text index (see surveys.search)."""
+        user_country = self.get_user_country()
+        results = search_entries(
+            query,
+            country_id=user_country.id if user_country else None,
+            public_only=not self.request.user.is_authenticated,
+            limit=50,
+        )
+        results.extend(self.get_static_page_results(query))
+        return results[:50]
+
     def get_public_search_results(self, query):
         results = []
 
@@ -184,45 +263,26 @@ class SearchView(TemplateView):
         return getattr(profile, 'country', None)
 
     def get_static_page_results(self, query):
-        page_results = []
         normalized_query = query.lower()
-        pages = (
-            {
-                'title': 'Home',
-                'description': 'Sudraw surveys, polls, categories, and rewards.',
-                'url': reverse('surveys:home'),
-                'keywords': 'home sudraw survey surveys polls rewards lucky draw',
-            },
-            {
-                'title': 'FAQ',
-                'description': 'Answers about surveys, polls, rewards, privacy, and account questions.',
-                'url': reverse('surveys:faq'),
-                'keywords': 'faq help questions surveys polls rewards privacy account',
-            },
-            {
-                'title': 'Features',
-                'description': 'Sudraw features and platform information.',
-                'url': reverse('surveys:features'),
-                'keywords': 'features platform survey polls rewards',
-            },
-            {
-                'title': 'Contact Us',
-                'description': 'Contact Sudraw support.',
-                'url': reverse('surveys:contact'),
-                'keywords': 'contact support email help',
-            },
-        )
-
-        for page in pages:
-            haystack = f"{page['title']} {page['description']} {page['keywords']}".lower()
-            if normalized_query in haystack:
-                page_results.append({
-                    'type': 'Page',
-                    'title': page['title'],
-                    'description': page['description'],
-                    'url': page['url'],
-                })
-        return page_results
+        return [
+            dict(result)
+            for haystack, result in get_static_search_pages()
+            if normalized_query in haystack
+        ]
+
+
+@read_only_view
+def search_autocomplete(request):
+    """Type-ahead suggestions for the search box, served from the in-process index."""
+    query = request.GET.get('q', '').strip()
+    suggestions, completions = [], []
+    if query:
+        suggestions, completions = autocomplete(query, request.user)
+    return JsonResponse({
+        'query': query,
+        'results': suggestions,
+        'completions': completions,
+    })
 
 
 class CustomLoginView(BaseLoginView):
@@ -620,40 +680,36 @@ class WalletWithdrawalRequestView(LoginRequiredMixin, CreateView):
         return reverse_lazy('surveys:wallet_history')
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
+@method_decorator(read_only_view, name='dispatch')
 class HomePageView(TemplateView):
     template_name = 'frontpage/index.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        categories = SurveyCategory.objects.filter(
-            surveys__is_active=True,
-            country__is_active=True,
-        ).distinct()
-
+        profile = None
         if self.request.user.is_authenticated:
             profile = getattr(self.request.user, 'profile', None)
-            if profile and profile.country_id:
-                categories = categories.filter(country_id=profile.country_id)
+        country_id = profile.country_id if profile else None
 
-        context['featured_categories'] = categories.order_by('?')[:6]
-
-        polls = Poll.objects.filter(
-            is_active=True,
-            country__is_active=True,
-            questions__isnull=False,
-        ).select_related('country').prefetch_related('questions').distinct()
+        context['featured_categories'] = get_featured_categories(country_id, limit=6)
 
         if self.request.user.is_authenticated:
-            profile = getattr(self.request.user, 'profile', None)
-            if profile and profile.country_id:
-                polls = polls.filter(country_id=profile.country_id)
+            polls = Poll.objects.filter(
+                is_active=True,
+                country__is_active=True,
+                questions__isnull=False,
+            ).select_related('country').prefetch_related('questions').distinct()
+
+            if country_id:
+                polls = polls.filter(country_id=country_id)
             else:
                 polls = polls.none()
 
             context['featured_polls'] = polls.order_by('order', '-created_at')[:4]
         else:
-            context['featured_polls'] = polls.order_by('?')[:5]
+            context['featured_polls'] = get_featured_polls(limit=5)
         
         # Get the number of most recent winners to show from settings
         winners_display_count = getattr(django_settings, 'LUCKY_DRAW_CONFIG', {}).get('WINNERS_DISPLAY_COUNT', 50)
@@ -863,10 +919,15 @@ def _poll_answers_to_post_data(poll, answers):
             data[field_name] = str(answer_value)
     return data
 
+@method_decorator(cache_anonymous_page, name='dispatch')
+@method_decorator(read_only_view, name='dispatch')
 class FeaturesPageView(TemplateView):
     template_name = 'frontpage/features.html'
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
+@method_decorator(read_only_view, name='dispatch')
+@method_decorator(conditional_page(journal_list_stamp), name='dispatch')
 class JournalListView(ListView):
     model = JournalPost
     template_name = 'surveys/journal_list.html'
@@ -892,6 +953,9 @@ class JournalListView(ListView):
         return context
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
+@method_decorator(read_only_view, name='dispatch')
+@method_decorator(conditional_page(journal_detail_stamp), name='dispatch')
 class JournalDetailView(DetailView):
     model = JournalPost
     template_name = 'surveys/journal_detail.html'
@@ -911,10 +975,15 @@ class JournalDetailView(DetailView):
         return context
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
+@method_decorator(read_only_view, name='dispatch')
 class FAQPageView(TemplateView):
     template_name = 'frontpage/faq.html'
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
+@method_decorator(read_only_view, name='dispatch')
+@method_decorator(conditional_page(privacy_policy_stamp), name='dispatch')
 class PrivacyPolicyView(TemplateView):
     template_name = 'frontpage/privacy-policy.html'
 
@@ -924,6 +993,9 @@ class PrivacyPolicyView(TemplateView):
         return context
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
+@method_decorator(read_only_view, name='dispatch')
+@method_decorator(conditional_page(about_us_stamp), name='dispatch')
 class AboutUsView(TemplateView):
     template_name = 'frontpage/about-us.html'
 
@@ -1097,50 +1169,9 @@ class SignUpView(CreateView):
                 reverse_lazy('surveys:verify_email', kwargs={'token': email_verification.token})
             )
             
-            subject = 'Verify Your Email - Sudraw'
-            message = f'''
-Hello {user.first_name or user.username},
-
-Thank you for registering with Sudraw! 
-
-Please verify your email address by clicking the link below:
-
-{verification_url}
-
-This link will expire in 24 hours.
-
-If you didn't create this account, please ignore this email.
-
-Best regards,
-Sudraw Team
-            '''
-            
-            html_message = f'''
-<html>
-<body>
-<p>Hello {user.first_name or user.username},</p>
-<p>Thank you for registering with Sudraw!</p>
-<p>Please verify your email address by clicking the link below:</p>
-<p><a href="{verification_url}">Verify Email</a></p>
-<p>This link will expire in 24 hours.</p>
-<p>If you didn't create this account, please ignore this email.</p>
-<p>Best regards,<br/>Sudraw Team</p>
-</body>
-</html>
-            '''
-            
-            print(f'DEBUG: Sending verification email to {user.email} with token {email_verification.token}')
+            send_email_verification_email(user, verification_url)
             
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                html_message=html_message,
-                fail_silently=False,
-            )
-            
-            logger.info(f'Verification email sent to {user.email}')
+            logger.info(f'Verification email queued for {user.email}')
             
         except Exception as e:
             logger.error(f'Failed to send verification email to {user.email}: {e}')
@@ -1172,28 +1203,7 @@ def send_otp(request):
                 print(f'OTP generated: {otp.code}')
                 # Send email
                 try:
-                    subject = 'Your Login Code - Sudraw'
-                    message = f'''
-                                Hello {user.first_name or user.username},
-
-                                Your login code is: {otp.code}
-
-                                This code will expire in 10 minutes.
-
-                                If you didn't request this code, please ignore this email.
-
-                                Best regards,
-                                Sudraw Team
-                    '''
-                    print(f'DEBUG: Sending email to {email} with OTP code {otp.code} ..from  {settings.DEFAULT_FROM_EMAIL}')  # Debug
-                    
-                    send_mail(
-                        subject,
-                        message,
-                        settings.DEFAULT_FROM_EMAIL,
-                        [email],
-                        fail_silently=False,
-                    )
+                    send_login_otp_email(user, email, otp.code)
                     
                     return JsonResponse({
                         'success': True,
@@ -1302,43 +1312,7 @@ class PendingVerificationView(TemplateView):
                 reverse_lazy('surveys:verify_email', kwargs={'token': email_verification.token})
             )
             
-            subject = 'Verify Your Email - Sudraw'
-            message = f'''
-Hello {user.first_name or user.username},
-
-Please verify your email address by clicking the link below:
-
-{verification_url}
-
-This link will expire in 24 hours.
-
-If you didn't create this account, please ignore this email.
-
-Best regards,
-Sudraw Team
-            '''
-            
-            html_message = f'''
-<html>
-<body>
-<p>Hello {user.first_name or user.username},</p>
-<p>Please verify your email address by clicking the link below:</p>
-<p><a href="{verification_url}">Verify Email</a></p>
-<p>This link will expire in 24 hours.</p>
-<p>If you didn't create this account, please ignore this email.</p>
-<p>Best regards,<br/>Sudraw Team</p>
-</body>
-</html>
-            '''
-            
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                html_message=html_message,
-                fail_silently=False,
-            )
+            send_email_verification_email(user, verification_url, welcome=False)
             
             messages.success(request, f'Verification email resent to {email}. Please check your inbox.')
             return self.get(request, *args, **kwargs)
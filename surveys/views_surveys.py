@@ -10,7 +10,6 @@ from django.forms import inlineformset_factory
 from django.http import JsonResponse
 from django.conf import settings
 from django.template.loader import render_to_string
-from django.core.mail import send_mail, EmailMultiAlternatives
 from django.utils.html import strip_tags
 
 from .models import Survey, SurveyCategory, Question, UserSurveyProgress, SurveyResponse, Answer, LuckyDrawEntry
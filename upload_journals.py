@@ -3,12 +3,11 @@
 Standalone script to import Journal posts from .docx files.
 
 Reads every .docx file in the `Journals/` directory and creates a
-JournalPost for each one:
-  - the first "Heading 2" paragraph becomes the title
-  - subsequent "Heading 2" paragraphs become <h2> section headings
-  - normal paragraphs become <p> (bold/italic runs preserved)
-  - tables become HTML <table>s
-  - the excerpt is auto-derived from the first body paragraph
+JournalPost for each one (see `surveys/journal_import.py` for how a file
+becomes a post). Files are parsed in parallel worker processes; the posts
+are then written from the main process in a single transaction. Files whose
+content is unchanged since their last import are skipped without parsing
+(see `surveys/import_manifest.py`), and --update only saves posts that differ.
 
 Usage (run from the project root, with the venv active):
     python upload_journals.py                 # import new posts
@@ -16,9 +15,10 @@ Usage (run from the project root, with the venv active):
     python upload_journals.py --update         # overwrite posts that already exist (matched by title)
     python upload_journals.py --dir "Journals" # custom source directory
     python upload_journals.py --unpublished    # create posts with is_published=False
+    python upload_journals.py --jobs 4         # parse with 4 worker processes (default: one per CPU)
+    python upload_journals.py --force          # also re-import files unchanged since the last import
 """
 import argparse
-import html
 import os
 import sys
 
@@ -28,133 +28,15 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'survey_app.settings')
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 django.setup()
 
-from docx import Document  # noqa: E402  (must come after django.setup())
-
-from surveys.models import JournalPost  # noqa: E402
-
-EXCERPT_MAX_LEN = 300
-HEADING_MAX_WORDS = 12
-
-
-def run_to_html(run):
-    text = html.escape(run.text)
-    if not text:
-        return ''
-    if run.bold:
-        text = f'<strong>{text}</strong>'
-    if run.italic:
-        text = f'<em>{text}</em>'
-    if run.underline:
-        text = f'<u>{text}</u>'
-    return text
-
-
-def paragraph_to_html(paragraph, tag='p'):
-    inner = ''.join(run_to_html(r) for r in paragraph.runs).strip()
-    if not inner:
-        return ''
-    return f'<{tag}>{inner}</{tag}>'
-
-
-def is_heading_paragraph(paragraph):
-    """
-    The source .docx files mostly use no real Word heading style at all --
-    every section title is just a short plain paragraph. Detect them by shape
-    instead: a single run, no trailing sentence punctuation, not a bullet
-    ("**Term**: description"), not a decorative/ASCII-art line, and short.
-    """
-    text = paragraph.text.strip()
-    if not text or not any(c.isalpha() for c in text):
-        return False
-
-    if paragraph.style.name.startswith('Heading'):
-        return True
-
-    runs = paragraph.runs
-    is_bullet = len(runs) >= 2 and bool(runs[0].bold)
-    has_arrow = '--->' in text
-    ends_with_sentence_punct = text.endswith(('.', '!', '?'))
-    word_count = len(text.split())
-
-    return (
-        not is_bullet
-        and not has_arrow
-        and not ends_with_sentence_punct
-        and word_count <= HEADING_MAX_WORDS
-    )
-
-
-def table_to_html(table):
-    rows_html = []
-    for i, row in enumerate(table.rows):
-        cell_tag = 'th' if i == 0 else 'td'
-        cells = ''.join(
-            f'<{cell_tag}>{html.escape(cell.text.strip())}</{cell_tag}>'
-            for cell in row.cells
-        )
-        rows_html.append(f'<tr>{cells}</tr>')
-    return '<table border="1" cellpadding="6" cellspacing="0">' + ''.join(rows_html) + '</table>'
-
-
-def iter_body_blocks(document):
-    """Yield ('paragraph', paragraph) / ('table', table) in document order."""
-    body = document.element.body
-    paragraphs = {p._p: p for p in document.paragraphs}
-    tables = {t._tbl: t for t in document.tables}
-    for child in body:
-        if child.tag.endswith('}p') and child in paragraphs:
-            yield 'paragraph', paragraphs[child]
-        elif child.tag.endswith('}tbl') and child in tables:
-            yield 'table', tables[child]
-
-
-def parse_docx(path):
-    """Return (title, excerpt, content_html) or None if the file isn't a well-formed journal post.
-
-    Every genuine journal post in this batch ends with a summary table; files
-    without one (e.g. leftover scratch/notes docs) are treated as not importable.
-    """
-    document = Document(path)
-
-    if not document.tables:
-        return None
-
-    title = None
-    excerpt = ''
-    content_parts = []
-
-    for kind, block in iter_body_blocks(document):
-        if kind == 'table':
-            content_parts.append(table_to_html(block))
-            continue
+from django.db import transaction  # noqa: E402  (must come after django.setup())
 
-        paragraph = block
-        text = paragraph.text.strip()
-        if not text:
-            continue
+from surveys import import_manifest  # noqa: E402
+from surveys.journal_import import IMPORTER_VERSION, parse_docx  # noqa: E402
+from surveys.models import ImportManifest, JournalPost  # noqa: E402
+from surveys.parallel_parse import default_jobs, format_stats, parse_files  # noqa: E402
 
-        if title is None:
-            title = text
-            continue
 
-        if is_heading_paragraph(paragraph):
-            content_parts.append(f'<h2>{html.escape(text)}</h2>')
-            continue
-
-        piece = paragraph_to_html(paragraph, tag='p')
-        if not piece:
-            continue
-        content_parts.append(piece)
-        if not excerpt:
-            excerpt = text[:EXCERPT_MAX_LEN]
-
-    if title is None:
-        return None
-
-    return title, excerpt, '\n'.join(content_parts)
-
-
-def import_journals(source_dir, dry_run=False, update=False, publish=True):
+def import_journals(source_dir, dry_run=False, update=False, publish=True, jobs=None, force=False):
     created, updated, skipped = 0, 0, 0
 
     filenames = sorted(f for f in os.listdir(source_dir) if f.lower().endswith('.docx'))
@@ -162,43 +44,69 @@ def import_journals(source_dir, dry_run=False, update=False, publish=True):
         print(f'No .docx files found in "{source_dir}".')
         return
 
-    for filename in filenames:
-        path = os.path.join(source_dir, filename)
-        parsed = parse_docx(path)
-        if parsed is None:
-            print(f'[skip]    {filename} -- no summary table found (not a well-formed journal post)')
-            skipped += 1
-            continue
-
-        title, excerpt, content = parsed
-        existing = JournalPost.objects.filter(title=title).first()
-
-        if existing and not update:
-            print(f'[exists]  {filename} -> "{title}" (use --update to overwrite)')
-            skipped += 1
-            continue
-
-        if dry_run:
-            action = 'update' if existing else 'create'
-            print(f'[dry-run] would {action}: "{title}" ({len(content)} chars content)')
-            continue
-
-        if existing:
-            existing.excerpt = excerpt
-            existing.content = content
-            existing.is_published = publish
-            existing.save()
-            print(f'[updated] {filename} -> "{title}"')
-            updated += 1
-        else:
-            JournalPost.objects.create(
-                title=title,
-                excerpt=excerpt,
-                content=content,
-                is_published=publish,
-            )
-            print(f'[created] {filename} -> "{title}"')
-            created += 1
+    changed, unchanged = import_manifest.split_unchanged(
+        ImportManifest.IMPORTER_JOURNAL, IMPORTER_VERSION,
+        {filename: os.path.join(source_dir, filename) for filename in filenames},
+        force=force,
+    )
+    for filename in unchanged:
+        print(f'[same]    {filename} -- unchanged since the last import (use --force to re-import)')
+        skipped += 1
+
+    # Parse in worker processes; all database writes stay in this process
+    parsed_files, stats = parse_files(parse_docx, [path for path, _ in changed.values()], jobs=jobs)
+    print(format_stats(stats))
+
+    titles = {parsed[0] for parsed in parsed_files if parsed is not None}
+    existing_posts = {}
+    for post in JournalPost.objects.filter(title__in=titles).order_by('-pk'):
+        existing_posts[post.title] = post  # oldest first, as .first() picked it
+
+    manifests = {}
+    with transaction.atomic():
+        for (filename, (_, content_hash)), parsed in zip(changed.items(), parsed_files):
+            if parsed is None:
+                print(f'[skip]    {filename} -- no summary table found (not a well-formed journal post)')
+                manifests[filename] = (content_hash, {'posts': []})
+                skipped += 1
+                continue
+
+            title, excerpt, content = parsed
+            existing = existing_posts.get(title)
+
+            if existing and not update:
+                print(f'[exists]  {filename} -> "{title}" (use --update to overwrite)')
+                skipped += 1
+                continue
+
+            if dry_run:
+                action = 'update' if existing else 'create'
+                print(f'[dry-run] would {action}: "{title}" ({len(content)} chars content)')
+                continue
+
+            if existing and (existing.excerpt, existing.content, existing.is_published) == (excerpt, content, publish):
+                print(f'[same]    {filename} -> "{title}" (post already up to date)')
+                skipped += 1
+            elif existing:
+                existing.excerpt = excerpt
+                existing.content = content
+                existing.is_published = publish
+                existing.save()
+                print(f'[updated] {filename} -> "{title}"')
+                updated += 1
+            else:
+                existing = existing_posts[title] = JournalPost.objects.create(
+                    title=title,
+                    excerpt=excerpt,
+                    content=content,
+                    is_published=publish,
+                )
+                print(f'[created] {filename} -> "{title}"')
+                created += 1
+            manifests[filename] = (content_hash, {'posts': [existing.pk]})
+
+        if not dry_run:
+            import_manifest.record(ImportManifest.IMPORTER_JOURNAL, IMPORTER_VERSION, manifests)
 
     print(f'\nDone. created={created} updated={updated} skipped={skipped}')
 
@@ -213,6 +121,13 @@ def main():
     parser.add_argument('--dry-run', action='store_true', help='Preview without writing to the database.')
     parser.add_argument('--update', action='store_true', help='Overwrite posts that already exist (matched by title).')
     parser.add_argument('--unpublished', action='store_true', help='Create posts with is_published=False.')
+    parser.add_argument(
+        '--force', action='store_true', help='Re-import files even when unchanged since the last import.',
+    )
+    parser.add_argument(
+        '--jobs', type=int, default=default_jobs(),
+        help='Worker processes for parsing the .docx files (default: one per CPU)',
+    )
     args = parser.parse_args()
 
     if not os.path.isdir(args.dir):
@@ -224,6 +139,8 @@ def main():
         dry_run=args.dry_run,
         update=args.update,
         publish=not args.unpublished,
+        jobs=args.jobs,
+        force=args.force,
     )
 
 